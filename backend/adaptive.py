@@ -0,0 +1,428 @@
+import time
+import heapq
+import atexit
+import logging
+import threading
+from collections import OrderedDict, namedtuple, defaultdict
+from flask import current_app
+from sqlalchemy import select, text
+from events import broker
+from models import (db, Course, Module, LearningContent, StudentContentProgress, AssessmentAttempt, QuizBestScore,
+                    StudentMastery)
+
+# Adaptive next-item selection
+# Per student, in memory: a mastery estimate per tag (0 to 1) and a heap of the items to
+# do next, updated from the course change feed (events.py). Quiz scores move mastery by
+# rate = max(1/(evidence + 1), MIN_RATE); completing other content nudges it towards
+# COMPLETION_LEVEL. The neediest item (1 - mastery of its weakest tag) comes first.
+# Changed priorities are pushed again and the old entries skipped as stale.
+#
+# Students are loaded on first use (their snapshot, then what happened since) and
+# snapshotted to student_mastery every ADAPTIVE_SNAPSHOT_SECONDS; past
+# ADAPTIVE_MAX_STUDENTS the least recently used are dropped. With several workers use
+# EVENTS_BACKEND=postgres.
+logger = logging.getLogger('adaptive')
+
+PRIOR = 0.3
+MIN_RATE = 0.2
+COMPLETION_RATE = 0.1
+COMPLETION_LEVEL = 0.6
+PASS_SCORE = 80  # percent; a quiz at or above this is done
+UNTAGGED_NEED = 0.1  # untagged items still come up, after anything with a weak tag
+_COMPACT_SLACK = 32
+_SNAPSHOT_BATCH = 1000
+# Heap entries are single ints, (NEED_SCALE - need in 1/NEED_SCALE units) * _ORDER_SPAN + item
+# order, so the smallest is the neediest item and ties go to the earlier one. Ints take a
+# fraction of the memory tuples would, which matters at 100k students.
+NEED_SCALE = 10000
+_ORDER_SPAN = 1 << 32
+
+Item = namedtuple('Item', 'id course_id order tags type title module_title course_title')
+
+
+def parse_tags(tags):
+    # Same splitting as recommendations.py
+    return tuple(sorted({tag.strip().lower() for tag in (tags or '').split(',') if tag.strip()}))
+
+
+class Catalog:
+    """Every item the engine can suggest, by id, by order and by course and (course, tag)."""
+
+    def __init__(self, items=(), version=0):
+        self.version = version
+        self.items, self.by_order = {}, {}
+        self.course_items = defaultdict(list)
+        self.course_tag_items = defaultdict(lambda: defaultdict(list))
+        for item in items:
+            self.items[item.id] = item
+            self.by_order[item.order] = item
+            self.course_items[item.course_id].append(item)
+            for tag in item.tags:
+                self.course_tag_items[item.course_id][tag].append(item)
+
+
+class _Student:
+    __slots__ = ('mastery', 'evidence', 'courses', 'done', 'keys', 'heap', 'catalog_version', 'dirty')
+
+    def __init__(self):
+        self.mastery, self.evidence = {}, {}
+        self.courses, self.done = set(), set()
+        self.keys = {}  # item order -> current heap key; heap entries that disagree are stale
+        self.heap = []
+        self.catalog_version = None
+        self.dirty = False
+
+
+class AdaptiveEngine:
+    def __init__(self, max_students=100000):
+        self.max_students = max_students
+        self.catalog = Catalog()
+        self._students = OrderedDict()  # least recently used first
+        self._lock = threading.RLock()
+
+    # --- Priorities ---
+
+    def _key(self, student, item):
+        if item.tags:
+            need = 1 - min(student.mastery.get(tag, PRIOR) for tag in item.tags)
+        else:
+            need = UNTAGGED_NEED
+        return (NEED_SCALE - round(need * NEED_SCALE)) * _ORDER_SPAN + item.order
+
+    def _push(self, student, item):
+        key = self._key(student, item)
+        if student.keys.get(item.order) != key:
+            student.keys[item.order] = key
+            heapq.heappush(student.heap, key)
+
+    def _rebuild(self, student):
+        student.keys = {item.order: self._key(student, item)
+                        for course_id in student.courses
+                        for item in self.catalog.course_items.get(course_id, ())
+                        if item.id not in student.done}
+        student.heap = list(student.keys.values())
+        heapq.heapify(student.heap)
+        student.catalog_version = self.catalog.version
+
+    def _reprioritize(self, student, tags):
+        for course_id in student.courses:
+            by_tag = self.catalog.course_tag_items.get(course_id, {})
+            for tag in tags:
+                for item in by_tag.get(tag, ()):
+                    if item.id not in student.done:
+                        self._push(student, item)
+        if len(student.heap) > 2 * len(student.keys) + _COMPACT_SLACK:
+            student.heap = list(student.keys.values())
+            heapq.heapify(student.heap)
+
+    def _loaded(self, student_id):
+        """A loaded student with priorities for the current catalog, or None."""
+        student = self._students.get(student_id)
+        if student is not None and student.catalog_version != self.catalog.version:
+            self._rebuild(student)
+        return student
+
+    def _join_course(self, student, course_id):
+        if course_id not in student.courses:
+            student.courses.add(course_id)
+            for item in self.catalog.course_items.get(course_id, ()):
+                if item.id not in student.done:
+                    self._push(student, item)
+
+    def _finish(self, student, item):
+        student.done.add(item.id)
+        student.keys.pop(item.order, None)  # its heap entries are now stale
+
+    # --- Mastery updates ---
+
+    def _observe_quiz(self, student, tags, score):
+        observed = score / 100
+        for tag in tags:
+            evidence = student.evidence.get(tag, 0)
+            mastery = student.mastery.get(tag, PRIOR)
+            student.mastery[tag] = mastery + max(1 / (evidence + 1), MIN_RATE) * (observed - mastery)
+            student.evidence[tag] = evidence + 1
+
+    def _observe_completion(self, student, tags):
+        for tag in tags:
+            mastery = student.mastery.get(tag, PRIOR)
+            if mastery < COMPLETION_LEVEL:
+                student.mastery[tag] = mastery + COMPLETION_RATE * (COMPLETION_LEVEL - mastery)
+
+    def record_quiz(self, student_id, content_id, score):
+        """Folds a quiz result (percent) into a loaded student's state; unknown students are skipped."""
+        with self._lock:
+            student = self._loaded(student_id)
+            item = self.catalog.items.get(content_id)
+            if student is None or item is None:
+                return
+            self._join_course(student, item.course_id)
+            self._observe_quiz(student, item.tags, score)
+            if score >= PASS_SCORE:
+                self._finish(student, item)
+            self._reprioritize(student, item.tags)
+            student.dirty = True
+
+    def record_completion(self, student_id, content_id):
+        with self._lock:
+            student = self._loaded(student_id)
+            item = self.catalog.items.get(content_id)
+            if student is None or item is None:
+                return
+            self._join_course(student, item.course_id)
+            self._finish(student, item)
+            if item.type != 'quiz':
+                self._observe_completion(student, item.tags)
+                self._reprioritize(student, item.tags)
+                student.dirty = True
+
+    def handle_event(self, course_event):
+        """broker listener: students who aren't loaded will read the change from the database."""
+        if course_event["type"] == 'quiz_submitted':
+            self.record_quiz(course_event["student_id"], course_event["quiz_id"], course_event["score"])
+        elif course_event["type"] == 'content_completed':
+            self.record_completion(course_event["student_id"], course_event["content_id"])
+
+    # --- Students ---
+
+    def add_student(self, student_id, courses=(), done=(), mastery=None, evidence=None, history=()):
+        """
+        Puts a student in memory, starting from a snapshot's `mastery`/`evidence` if there is
+        one, then replaying `history` ((content id, percent or None for a completion), ...):
+        everything without a snapshot, what happened since it otherwise.
+        """
+        student = _Student()
+        student.courses, student.done = set(courses), set(done)
+        if mastery is not None:
+            student.mastery, student.evidence = dict(mastery), dict(evidence or {})
+        for content_id, score in history:
+            item = self.catalog.items.get(content_id)
+            if item is None:
+                continue
+            if score is not None:
+                self._observe_quiz(student, item.tags, score)
+            elif item.type != 'quiz':
+                self._observe_completion(student, item.tags)
+            student.dirty = True
+        with self._lock:
+            self._rebuild(student)
+            self._students[student_id] = student
+            self._students.move_to_end(student_id)
+
+    def next_items(self, student_id, limit):
+        """The `limit` neediest items as [(Item, need, weakest tag, its mastery)], or None if the student isn't loaded."""
+        with self._lock:
+            student = self._loaded(student_id)
+            if student is None:
+                return None
+            self._students.move_to_end(student_id)
+            picked = []
+            while student.heap and len(picked) < limit:
+                key = heapq.heappop(student.heap)
+                order = key % _ORDER_SPAN
+                if student.keys.get(order) != key or (picked and picked[-1] == key):
+                    continue  # stale or a duplicate: dropped for good
+                picked.append(key)
+            for key in picked:
+                heapq.heappush(student.heap, key)
+
+            results = []
+            for key in picked:
+                item = self.catalog.by_order[key % _ORDER_SPAN]
+                need = (NEED_SCALE - key // _ORDER_SPAN) / NEED_SCALE
+                weakest = min(item.tags, key=lambda tag: student.mastery.get(tag, PRIOR)) if item.tags else None
+                results.append((item, need, weakest, student.mastery.get(weakest, PRIOR) if weakest else None))
+            return results
+
+    def mastery(self, student_id):
+        with self._lock:
+            return dict(self._students[student_id].mastery)
+
+    def take_dirty(self):
+        """Rows to snapshot, [(student id, tag, mastery, evidence)]; clears the dirty flags."""
+        rows = []
+        with self._lock:
+            for student_id, student in self._students.items():
+                if student.dirty:
+                    student.dirty = False
+                    rows.extend((student_id, tag, round(value, 4), student.evidence.get(tag, 0))
+                                for tag, value in student.mastery.items())
+        return rows
+
+    def mark_dirty(self, student_ids):
+        with self._lock:
+            for student_id in student_ids:
+                if student_id in self._students:
+                    self._students[student_id].dirty = True
+
+    def trim(self):
+        """Forgets the least recently used students past max_students, skipping unsaved ones."""
+        with self._lock:
+            excess = len(self._students) - self.max_students
+            for student_id in list(self._students)[:max(excess, 0)]:
+                if not self._students[student_id].dirty:
+                    del self._students[student_id]
+
+
+engine = AdaptiveEngine()
+
+# --- Database side: catalog, student loading and snapshots ---
+
+_state = {"catalog_loaded_at": None, "snapshot_thread": None}
+_start_lock = threading.Lock()
+
+
+def load_catalog():
+    rows = db.session.execute(
+        select(LearningContent.id, Module.course_id, LearningContent.tags, LearningContent.type, LearningContent.title,
+               Module.title, Course.title)
+        .join(Module, LearningContent.module_id == Module.id)
+        .join(Course, Module.course_id == Course.id)
+        .where(Course.deletion_requested_at.is_(None))
+        .order_by(Module.course_id, Module.module_order, LearningContent.content_order)
+    ).all()
+    items = [Item(str(content_id), str(course_id), order, parse_tags(tags), content_type, title, module_title, course_title)
+             for order, (content_id, course_id, tags, content_type, title, module_title, course_title) in enumerate(rows)]
+    engine.catalog = Catalog(items, version=engine.catalog.version + 1)
+    _state["catalog_loaded_at"] = time.monotonic()
+
+
+def _history_since(student_id, since):
+    """Quiz results and completions after `since`, oldest first: what a snapshot doesn't include yet."""
+    attempts = db.session.execute(
+        select(AssessmentAttempt.content_id, AssessmentAttempt.score, AssessmentAttempt.submitted_at)
+        .where(AssessmentAttempt.student_id == student_id, AssessmentAttempt.submitted_at > since)
+    ).all()
+    completions = db.session.execute(
+        select(StudentContentProgress.content_id, StudentContentProgress.completed_at)
+        .where(StudentContentProgress.student_id == student_id, StudentContentProgress.completed_at > since)
+    ).all()
+    history = [(at, str(content_id), float(score)) for content_id, score, at in attempts]
+    history += [(at, str(content_id), None) for content_id, at in completions]
+    history.sort(key=lambda entry: entry[0])
+    return [(content_id, score) for _, content_id, score in history]
+
+
+def load_student(student_id):
+    """
+    Reads one student's snapshot, finished items and started courses (three queries), plus
+    what happened since the snapshot: events for students who weren't loaded never reached it.
+    """
+    snapshot = db.session.execute(
+        select(StudentMastery.tag, StudentMastery.mastery, StudentMastery.evidence, StudentMastery.updated_at)
+        .where(StudentMastery.student_id == student_id)
+    ).all()
+    progress = db.session.execute(
+        select(StudentContentProgress.content_id, StudentContentProgress.status)
+        .where(StudentContentProgress.student_id == student_id)
+    ).all()
+    best_scores = db.session.execute(
+        select(QuizBestScore.content_id, QuizBestScore.best_score).where(QuizBestScore.student_id == student_id)
+    ).all()
+
+    items = engine.catalog.items
+    touched = [str(content_id) for content_id, _ in progress] + [str(content_id) for content_id, _ in best_scores]
+    courses = {items[content_id].course_id for content_id in touched if content_id in items}
+    done = {str(content_id) for content_id, status in progress if status == 'completed'}
+    done |= {str(content_id) for content_id, score in best_scores if score >= PASS_SCORE}
+    if snapshot:
+        # Every tag is written with each snapshot, so the newest row dates it
+        since = max(updated_at for *_, updated_at in snapshot)
+        engine.add_student(str(student_id), courses, done,
+                           mastery={tag: float(value) for tag, value, _, _ in snapshot},
+                           evidence={tag: evidence for tag, _, evidence, _ in snapshot},
+                           history=_history_since(student_id, since))
+    else:
+        history = [(str(content_id), None) for content_id, status in progress if status == 'completed']
+        history += [(str(content_id), float(score)) for content_id, score in best_scores]
+        history.sort(key=lambda entry: items[entry[0]].order if entry[0] in items else -1)
+        engine.add_student(str(student_id), courses, done, history=history)
+
+
+def snapshot():
+    """Writes changed mastery estimates to student_mastery. Rows of deleted students are skipped."""
+    rows = engine.take_dirty()
+    try:
+        for start in range(0, len(rows), _SNAPSHOT_BATCH):
+            batch = rows[start:start + _SNAPSHOT_BATCH]
+            db.session.execute(text(
+                "INSERT INTO student_mastery (student_id, tag, mastery, evidence, updated_at) "
+                "SELECT v.student_id, v.tag, v.mastery, v.evidence, now() "
+                "FROM unnest(CAST(:students AS uuid[]), CAST(:tags AS text[]), CAST(:masteries AS numeric[]), "
+                "CAST(:evidence AS integer[])) AS v(student_id, tag, mastery, evidence) "
+                "JOIN students s ON s.id = v.student_id "
+                "ON CONFLICT (student_id, tag) DO UPDATE SET mastery = EXCLUDED.mastery, "
+                "evidence = EXCLUDED.evidence, updated_at = EXCLUDED.updated_at"
+            ), {"students": [r[0] for r in batch], "tags": [r[1] for r in batch],
+                "masteries": [r[2] for r in batch], "evidence": [r[3] for r in batch]})
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        engine.mark_dirty({r[0] for r in rows})  # retried next time
+        raise
+    finally:
+        engine.trim()
+    return len(rows)
+
+
+def _snapshot_loop(app, interval):
+    while True:
+        time.sleep(interval)
+        with app.app_context():
+            try:
+                snapshot()
+            except Exception:
+                logger.exception("Mastery snapshot failed")
+            finally:
+                db.session.remove()
+
+
+def _start(app):
+    with _start_lock:
+        if _state["snapshot_thread"] is not None:
+            return
+        broker.start()
+        interval = app.config['ADAPTIVE_SNAPSHOT_SECONDS']
+        thread = threading.Thread(target=_snapshot_loop, args=(app, interval), name='mastery-snapshots', daemon=True)
+        thread.start()
+        _state["snapshot_thread"] = thread
+
+        def final_snapshot():
+            with app.app_context():
+                try:
+                    snapshot()
+                except Exception:
+                    logger.exception("Final mastery snapshot failed")
+        atexit.register(final_snapshot)
+
+
+def init_app(app):
+    engine.max_students = app.config['ADAPTIVE_MAX_STUDENTS']
+    broker.add_listener(engine.handle_event)
+    app.extensions['adaptive'] = engine
+
+
+def next_items(student_id, limit=5):
+    """Suggestions for one student as dicts ready for JSON, loading what's needed on first use."""
+    app = current_app._get_current_object()
+    _start(app)
+    loaded_at = _state["catalog_loaded_at"]
+    if loaded_at is None or time.monotonic() - loaded_at > app.config['ADAPTIVE_CATALOG_SECONDS']:
+        load_catalog()
+    student_id = str(student_id)
+    # Checked and read under the engine's lock: a snapshot's trim() may drop the student in between
+    results = engine.next_items(student_id, limit)
+    if results is None:
+        load_student(student_id)
+        results = engine.next_items(student_id, limit) or []
+    return [{
+        "id": item.id,
+        "title": item.title,
+        "type": item.type,
+        "module_title": item.module_title,
+        "course_title": item.course_title,
+        "course_id": item.course_id,
+        "focus_tag": tag,
+        "mastery": round(mastery, 2) if mastery is not None else None,
+        "need": need
+    } for item, need, tag, mastery in results]
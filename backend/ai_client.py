@@ -0,0 +1,20 @@
+from flask import current_app
+
+# OpenAI client, created on first use.
+# Importing the openai package is slow (it pulls in httpx, pydantic, ...), so it is
+# deferred until an AI route actually needs it instead of slowing every worker boot.
+
+def ai_configured():
+    return bool(current_app.config.get('OPENAI_API_KEY'))
+
+
+def get_openai_client():
+    client = current_app.extensions.get('openai_client')
+    if client is None:
+        import openai
+        client = openai.OpenAI(
+            api_key=current_app.config['OPENAI_API_KEY'],
+            base_url=current_app.config.get('OPENAI_BASE_URL')  # None means the real API
+        )
+        current_app.extensions['openai_client'] = client
+    return client
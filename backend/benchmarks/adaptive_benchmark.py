@@ -0,0 +1,131 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from adaptive import AdaptiveEngine, Catalog, Item
+
+# Adaptive engine benchmark
+# Drives the in-memory engine from adaptive.py directly (no database, no HTTP) with a
+# synthetic catalog and student body, then measures how fast it folds in progress
+# events and serves next-item suggestions, with p50/p99 latencies and peak memory.
+# Usage (from backend/):
+#   python benchmarks/adaptive_benchmark.py [--students 100000] [--updates 500000] [--queries 200000] [--json out.json]
+
+
+def build_catalog(courses, items_per_course, tags, tags_per_item, rng):
+    tag_names = [f"tag{i}" for i in range(tags)]
+    items, order = [], 0
+    for course in range(courses):
+        # Each course draws on its own slice of topics, like a real syllabus
+        course_tags = rng.sample(tag_names, min(len(tag_names), tags_per_item * 4))
+        for position in range(items_per_course):
+            content_type = 'quiz' if position % 4 == 3 else 'article'
+            items.append(Item(f"c{course}-i{position}", f"c{course}", order, tuple(sorted(rng.sample(course_tags, tags_per_item))),
+                              content_type, f"Item {position}", f"Module {position // 8}", f"Course {course}"))
+            order += 1
+    return Catalog(items, version=1)
+
+
+def _percentile(samples, q):
+    return statistics.quantiles(samples, n=100)[q - 1] * 1e6 if len(samples) >= 100 else max(samples) * 1e6
+
+
+def _summary(samples, wall):
+    return {
+        "operations": len(samples),
+        "per_second": round(len(samples) / wall),
+        "p50_us": round(_percentile(samples, 50), 1),
+        "p99_us": round(_percentile(samples, 99), 1),
+    }
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    engine = AdaptiveEngine(max_students=args.students)
+    engine.catalog = build_catalog(args.courses, args.items_per_course, args.tags, args.tags_per_item, rng)
+    course_ids = list(engine.catalog.course_items)
+    student_ids = [f"s{i}" for i in range(args.students)]
+
+    started = time.perf_counter()
+    for student_id in student_ids:
+        engine.add_student(student_id, courses=rng.sample(course_ids, rng.randint(1, args.max_courses)))
+    load_s = time.perf_counter() - started
+
+    # Events go to students' own courses, mostly quizzes, like a busy day
+    student_items = {}
+    events = []
+    for _ in range(args.updates):
+        student_id = rng.choice(student_ids)
+        if student_id not in student_items:
+            student_items[student_id] = [item for course in engine._students[student_id].courses
+                                         for item in engine.catalog.course_items[course]]
+        item = rng.choice(student_items[student_id])
+        if item.type == 'quiz':
+            events.append({"type": 'quiz_submitted', "student_id": student_id, "quiz_id": item.id,
+                           "score": float(rng.randint(0, 100))})
+        else:
+            events.append({"type": 'content_completed', "student_id": student_id, "content_id": item.id})
+
+    update_samples = []
+    started = time.perf_counter()
+    for course_event in events:
+        t0 = time.perf_counter()
+        engine.handle_event(course_event)
+        update_samples.append(time.perf_counter() - t0)
+    update_wall = time.perf_counter() - started
+
+    query_samples = []
+    queried = [rng.choice(student_ids) for _ in range(args.queries)]
+    started = time.perf_counter()
+    for student_id in queried:
+        t0 = time.perf_counter()
+        engine.next_items(student_id, args.limit)
+        query_samples.append(time.perf_counter() - t0)
+    query_wall = time.perf_counter() - started
+
+    return {
+        "students": args.students,
+        "catalog_items": len(engine.catalog.items),
+        "load_students_s": round(load_s, 2),
+        "updates": _summary(update_samples, update_wall),
+        "next_items": _summary(query_samples, query_wall),
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure adaptive engine update and next-item throughput in memory.")
+    parser.add_argument('--students', type=int, default=100000)
+    parser.add_argument('--courses', type=int, default=50)
+    parser.add_argument('--items-per-course', type=int, default=40)
+    parser.add_argument('--max-courses', type=int, default=3, help="Each student has started 1 to this many courses")
+    parser.add_argument('--tags', type=int, default=200)
+    parser.add_argument('--tags-per-item', type=int, default=2)
+    parser.add_argument('--updates', type=int, default=500000)
+    parser.add_argument('--queries', type=int, default=200000)
+    parser.add_argument('--limit', type=int, default=5, help="Items per next-item query")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', dest='json_path', help="Write the results to this file")
+    args = parser.parse_args()
+
+    result = run(args)
+    print(f"students:    {result['students']} over {result['catalog_items']} items (loaded in {result['load_students_s']} s)")
+    for name in ('updates', 'next_items'):
+        row = result[name]
+        print(f"{name + ':':12} {row['per_second']:>9}/s   p50 {row['p50_us']} us   p99 {row['p99_us']} us")
+    print(f"max RSS:     {result['max_rss_mb']} MB")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
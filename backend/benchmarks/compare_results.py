@@ -0,0 +1,52 @@
+import sys
+import json
+import argparse
+
+# Compares two run_benchmarks.py result files endpoint by endpoint.
+# Exits with status 1 if any endpoint's p95 latency or query count regressed by more
+# than --threshold percent, so it can gate a CI job.
+# Usage: python benchmarks/compare_results.py before.json after.json [--threshold 10]
+METRICS = ['p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps', 'queries_per_request']
+GATED = {'p95_ms', 'queries_per_request'}  # metrics where higher is worse and that fail the run
+
+
+def _change(before, after):
+    if not before:
+        return None
+    return (after - before) / before * 100
+
+
+def compare(before, after, threshold):
+    regressions = []
+    for name, new in after['endpoints'].items():
+        old = before['endpoints'].get(name)
+        if old is None:
+            print(f"{name}: new endpoint")
+            continue
+        parts = []
+        for metric in METRICS:
+            change = _change(old[metric], new[metric])
+            label = f"{metric} {old[metric]} -> {new[metric]}"
+            if change is not None:
+                label += f" ({change:+.1f}%)"
+                if metric in GATED and change > threshold:
+                    regressions.append(f"{name}: {metric} {change:+.1f}%")
+            parts.append(label)
+        print(f"{name}\n    " + "\n    ".join(parts))
+
+    print(f"\n{before['meta'].get('revision')} -> {after['meta'].get('revision')}")
+    if regressions:
+        print("Regressions over threshold:\n  " + "\n  ".join(regressions))
+        return 1
+    print("No regressions over threshold.")
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Diff two benchmark result files.")
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=10.0, help="Allowed increase in percent")
+    args = parser.parse_args()
+    with open(args.before) as f_before, open(args.after) as f_after:
+        sys.exit(compare(json.load(f_before), json.load(f_after), args.threshold))
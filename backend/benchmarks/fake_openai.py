@@ -0,0 +1,47 @@
+import time
+import json
+import logging
+import threading
+from flask import Flask, request, jsonify
+from werkzeug.serving import make_server
+
+# Local stand-in for the OpenAI chat completions API.
+# The benchmark harness starts it in a background thread and points OPENAI_BASE_URL
+# at it, so AI routes can be measured without network calls or API costs.
+# `latency_ms` simulates model response time.
+
+FAKE_QUIZ = {"questions": [
+    {"id": f"q{i}", "text": f"Fake question {i}?", "options": ["A", "B", "C"], "correct_answer_index": i % 3}
+    for i in range(1, 4)
+]}
+
+
+def create_fake_openai_app(latency_ms=0):
+    fake = Flask(__name__)
+
+    @fake.route('/v1/chat/completions', methods=['POST'])
+    def chat_completions():
+        data = request.get_json()
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+        wants_json = (data.get('response_format') or {}).get('type') == 'json_object'
+        content = json.dumps(FAKE_QUIZ) if wants_json else "This is a fake answer from the local benchmark server."
+        return jsonify({
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": data.get('model', 'fake'),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        })
+
+    return fake
+
+
+def start_fake_openai(latency_ms=0):
+    """Starts the fake server on a free port. Returns (server, base_url); call server.shutdown() when done."""
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)  # no access log line per request
+    server = make_server('127.0.0.1', 0, create_fake_openai_app(latency_ms), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/v1"
@@ -0,0 +1,174 @@
+import os
+import sys
+import uuid
+import random
+import argparse
+import datetime
+from sqlalchemy import insert, null
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from extensions import bcrypt
+from content_bodies import body_columns
+from partitions import ensure_partitions
+from leaderboards import rebuild
+from models import db, User, UserRole, Student, Teacher, Course, Module, LearningContent, StudentContentProgress, AssessmentAttempt
+
+# Synthetic dataset generator
+# Fills a (local, throwaway) Postgres database with courses, modules, learning content
+# (including quiz_data and tags), students, progress rows and assessment attempts, then
+# builds the leaderboards from those attempts.
+# Every synthetic user gets the password BENCH_PASSWORD and a username starting with
+# --prefix, so the benchmark harness can find them again.
+# Usage (from backend/, after `flask --app app db upgrade`):
+#   python benchmarks/generate_dataset.py --courses 50 --students 10000 --seed 1
+BENCH_PASSWORD = 'benchmark'
+INSERT_CHUNK = 5000
+
+TAGS = ['algebra', 'calculus', 'geometry', 'statistics', 'probability', 'python', 'javascript', 'sql',
+        'databases', 'networks', 'security', 'physics', 'chemistry', 'biology', 'history', 'writing',
+        'grammar', 'economics', 'finance', 'design', 'ethics', 'intro', 'advanced', 'review']
+WORDS = ['learning', 'system', 'student', 'example', 'problem', 'method', 'value', 'function', 'data',
+         'model', 'result', 'process', 'theory', 'practice', 'concept', 'question', 'answer', 'step',
+         'simple', 'complex', 'important', 'general', 'specific', 'first', 'next', 'final', 'basic']
+CONTENT_TYPES = ['article', 'article', 'video', 'quiz', 'exercise', 'assignment']
+
+
+def _sentence(rng, words=10):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def _paragraphs(rng, count):
+    return '\n\n'.join(' '.join(_sentence(rng, rng.randint(8, 16)) for _ in range(5)) for _ in range(count))
+
+
+def _quiz_data(rng, questions):
+    return {"questions": [
+        {"id": f"q{i + 1}", "text": _sentence(rng, 8).rstrip('.') + '?',
+         "options": [_sentence(rng, 3) for _ in range(3)], "correct_answer_index": rng.randint(0, 2)}
+        for i in range(questions)
+    ]}
+
+
+def _bulk_insert(model, rows):
+    for start in range(0, len(rows), INSERT_CHUNK):
+        db.session.execute(insert(model), rows[start:start + INSERT_CHUNK])
+    db.session.commit()
+
+
+def _create_users(prefix, role, count, password_hash, now):
+    """Creates users with their profile and role. Returns the profile ids."""
+    users, profiles, roles = [], [], []
+    profile_model = Student if role == 'student' else Teacher
+    for i in range(count):
+        user_id = uuid.uuid4()
+        users.append({"id": user_id, "username": f"{prefix}_{role}_{i}", "email": f"{prefix}_{role}_{i}@example.com",
+                      "password_hash": password_hash, "created_at": now, "updated_at": now})
+        profile = {"id": uuid.uuid4(), "user_id": user_id, "first_name": role.capitalize(), "last_name": str(i), "created_at": now}
+        if role != 'student':
+            profile['title'] = role.capitalize()
+        profiles.append(profile)
+        roles.append({"user_id": user_id, "role": role, "granted_at": now})
+    _bulk_insert(User, users)
+    _bulk_insert(profile_model, profiles)
+    _bulk_insert(UserRole, roles)
+    return [p['id'] for p in profiles]
+
+
+def _create_catalog(rng, args, teacher_ids, now):
+    """Creates courses, modules and content. Returns (content ids, quiz ids)."""
+    courses, modules, contents = [], [], []
+    quiz_ids = []
+    for c in range(args.courses):
+        course_id = uuid.uuid4()
+        courses.append({"id": course_id, "title": f"Course {c}: {_sentence(rng, 3).rstrip('.')}",
+                        "description": _sentence(rng, 20), "created_by_teacher_id": rng.choice(teacher_ids), "created_at": now})
+        for m in range(args.modules_per_course):
+            module_id = uuid.uuid4()
+            modules.append({"id": module_id, "course_id": course_id, "title": f"Module {m + 1}",
+                            "description": _sentence(rng, 12), "module_order": m + 1, "created_at": now})
+            for i in range(args.contents_per_module):
+                content_id = uuid.uuid4()
+                content_type = rng.choice(CONTENT_TYPES)
+                contents.append({
+                    "id": content_id, "module_id": module_id, "type": content_type,
+                    "title": _sentence(rng, 4).rstrip('.'),
+                    "content_url": f"https://example.com/video/{content_id}" if content_type == 'video' else None,
+                    **body_columns(_paragraphs(rng, args.article_paragraphs) if content_type == 'article' else None),
+                    "content_order": i + 1,
+                    # SQL NULL, not JSON null: quiz lookups filter on quiz_data IS NOT NULL
+                    "quiz_data": _quiz_data(rng, rng.randint(3, 6)) if content_type == 'quiz' else null(),
+                    "tags": ','.join(rng.sample(TAGS, rng.randint(1, 3))),
+                    "created_at": now
+                })
+                if content_type == 'quiz':
+                    quiz_ids.append(content_id)
+    _bulk_insert(Course, courses)
+    _bulk_insert(Module, modules)
+    _bulk_insert(LearningContent, contents)
+    return [c['id'] for c in contents], quiz_ids
+
+
+def _create_activity(rng, args, student_ids, content_ids, quiz_ids, now):
+    """Creates progress rows and quiz attempts, a batch of students at a time to keep memory flat."""
+    progress_count = attempt_count = 0
+    for start in range(0, len(student_ids), 1000):
+        progress, attempts = [], []
+        for student_id in student_ids[start:start + 1000]:
+            for content_id in rng.sample(content_ids, min(args.progress_per_student, len(content_ids))):
+                status = rng.choice(['completed', 'completed', 'completed', 'in_progress'])
+                touched = now - datetime.timedelta(days=rng.randint(0, 365))
+                progress.append({"id": uuid.uuid4(), "student_id": student_id, "content_id": content_id,
+                                 "status": status, "started_at": touched, "last_accessed_at": touched,
+                                 "completed_at": touched if status == 'completed' else None})
+            for content_id in rng.sample(quiz_ids, min(args.quizzes_per_student, len(quiz_ids))):
+                for attempt_number in range(1, rng.randint(1, args.max_attempts) + 1):
+                    attempts.append({"id": uuid.uuid4(), "content_id": content_id, "student_id": student_id,
+                                     "score": round(rng.uniform(0, 100), 2), "max_score": 100.00,
+                                     "attempt_number": attempt_number, "answers": {"q1": rng.randint(0, 2)},
+                                     "submitted_at": now - datetime.timedelta(days=rng.randint(0, 365), seconds=rng.randint(0, 86400))})
+        _bulk_insert(StudentContentProgress, progress)
+        _bulk_insert(AssessmentAttempt, attempts)
+        progress_count += len(progress)
+        attempt_count += len(attempts)
+    return progress_count, attempt_count
+
+
+def generate(args):
+    rng = random.Random(args.seed)
+    now = datetime.datetime.utcnow()
+    with create_app().app_context():
+        # One hash for everyone: hashing per user would dominate the run time
+        password_hash = bcrypt.generate_password_hash(BENCH_PASSWORD).decode('utf-8')
+        teacher_ids = _create_users(args.prefix, 'teacher', args.teachers, password_hash, now)
+        _create_users(args.prefix, 'administrator', 1, password_hash, now)
+        student_ids = _create_users(args.prefix, 'student', args.students, password_hash, now)
+        content_ids, quiz_ids = _create_catalog(rng, args, teacher_ids, now)
+        # Attempts go back a year; give every month its own partition rather than the default one
+        ensure_partitions(db.session, since=now - datetime.timedelta(days=365))
+        db.session.commit()
+        progress_count, attempt_count = _create_activity(rng, args, student_ids, content_ids, quiz_ids, now)
+        # The attempts were inserted directly, so fill the leaderboards from them
+        rebuild()
+        db.session.commit()
+
+    print(f"✅ Created {args.teachers} teachers, {args.students} students, {args.courses} courses, "
+          f"{len(content_ids)} content items ({len(quiz_ids)} quizzes), {progress_count} progress rows "
+          f"and {attempt_count} quiz attempts.")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Populate a local database with synthetic benchmark data.")
+    parser.add_argument('--prefix', default='bench', help="Username prefix for synthetic users")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--teachers', type=int, default=20)
+    parser.add_argument('--students', type=int, default=2000)
+    parser.add_argument('--courses', type=int, default=30)
+    parser.add_argument('--modules-per-course', type=int, default=8)
+    parser.add_argument('--contents-per-module', type=int, default=6)
+    parser.add_argument('--article-paragraphs', type=int, default=6)
+    parser.add_argument('--progress-per-student', type=int, default=40)
+    parser.add_argument('--quizzes-per-student', type=int, default=10)
+    parser.add_argument('--max-attempts', type=int, default=3)
+    generate(parser.parse_args())
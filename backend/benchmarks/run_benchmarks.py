@@ -0,0 +1,205 @@
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+import statistics
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import event, select, func
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token
+from app import create_app
+from models import db, User, UserRole, Student, Module, LearningContent, StudentContentProgress
+from fake_openai import start_fake_openai
+
+# Endpoint benchmark harness
+# Runs every endpoint in-process through the Flask test client against the database
+# in DATABASE_URL (populate it first with generate_dataset.py) and reports p50/p95/p99
+# latency, throughput and SQL queries per request. AI routes talk to a local fake.
+# Results are written as JSON so two runs can be diffed with compare_results.py.
+# Usage (from backend/):
+#   python benchmarks/run_benchmarks.py --requests 200 --concurrency 4 --output before.json
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+ARTICLE_TEXT = "Photosynthesis is the process plants use to turn light into chemical energy. " * 5
+
+# (name, method, path template, role, json body)
+ENDPOINTS = [
+    ("list courses", 'GET', '/api/courses', 'student', None),
+    ("course details", 'GET', '/api/courses/{course_id}', 'student', None),
+    ("course outline", 'GET', '/api/courses/{course_id}?view=outline', 'student', None),
+    ("content body", 'GET', '/api/content/{content_id}/body', 'student', None),
+    ("quiz questions", 'GET', '/api/quizzes/{quiz_id}', 'student', None),
+    ("submit quiz", 'POST', '/api/quizzes/{quiz_id}/submit', 'student', {"answers": {"q1": 0, "q2": 1, "q3": 2}}),
+    ("mark content complete", 'POST', '/api/progress/{content_id}/complete', 'student', None),
+    ("search", 'GET', '/api/search?q=learning%20method', 'student', None),
+    ("recommendations", 'GET', '/api/students/me/recommendations', 'student', None),
+    ("student dashboard", 'GET', '/api/students/me/dashboard', 'student', None),
+    ("next items", 'GET', '/api/students/me/next-items', 'student', None),
+    ("course progress report", 'GET', '/api/courses/{course_id}/progress', 'teacher', None),
+    ("course performance report", 'GET', '/api/courses/{course_id}/performance', 'teacher', None),
+    ("quiz leaderboard", 'GET', '/api/quizzes/{quiz_id}/leaderboard', 'student', None),
+    ("quiz rank", 'GET', '/api/quizzes/{quiz_id}/rank?score=72.5', 'student', None),
+    ("course leaderboard", 'GET', '/api/courses/{course_id}/leaderboard', 'teacher', None),
+    ("course export", 'GET', '/api/courses/{course_id}/export', 'teacher', None),
+    ("admin user list", 'GET', '/api/admin/users', 'administrator', None),
+    ("ai generate quiz", 'POST', '/api/ai/generate-quiz', 'teacher', {"text": ARTICLE_TEXT}),
+    ("ai chatbot", 'POST', '/api/ai/chatbot', 'student', {"question": "What is photosynthesis?", "context": ARTICLE_TEXT}),
+]
+
+
+class QueryCounter:
+    """Counts SQL statements per thread via engine events."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def install(self, engines):
+        for engine in engines:
+            event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self._local.count = getattr(self._local, 'count', 0) + 1
+
+    def reset(self):
+        self._local.count = 0
+
+    @property
+    def count(self):
+        return getattr(self._local, 'count', 0)
+
+
+def _sample_targets(prefix):
+    """Picks the users and ids the endpoints will be called with."""
+    def user_with_role(role):
+        return db.session.scalar(
+            select(User.id).join(UserRole).where(UserRole.role == role, User.username.like(f"{prefix}_%")).limit(1)
+        )
+
+    course_id = db.session.scalar(
+        select(Module.course_id).join(LearningContent).group_by(Module.course_id).order_by(func.count().desc()).limit(1)
+    )
+    content_in_course = select(LearningContent.id).join(Module).where(Module.course_id == course_id)
+    quiz_id = db.session.scalar(content_in_course.where(LearningContent.type == 'quiz').limit(1))
+    content_id = db.session.scalar(content_in_course.where(LearningContent.type != 'quiz').limit(1))
+
+    # The most active student makes the student endpoints do realistic work
+    student_id = db.session.scalar(
+        select(StudentContentProgress.student_id).group_by(StudentContentProgress.student_id)
+        .order_by(func.count().desc()).limit(1)
+    )
+    student_user_id = db.session.scalar(select(Student.user_id).where(Student.id == student_id)) or user_with_role('student')
+
+    ids = {"course_id": course_id, "quiz_id": quiz_id, "content_id": content_id}
+    users = {"student": student_user_id, "teacher": user_with_role('teacher'), "administrator": user_with_role('administrator')}
+    missing = [k for k, v in {**ids, **users}.items() if v is None]
+    if missing:
+        raise SystemExit(f"Dataset is missing {', '.join(missing)} - run generate_dataset.py first.")
+    return ids, users
+
+
+def _percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def bench_endpoint(app, counter, method, path, token, body, requests, warmup, concurrency):
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def call():
+        client = app.test_client()
+        counter.reset()
+        started = time.perf_counter()
+        response = client.open(path, method=method, headers=headers, json=body)
+        response.get_data()  # drain streamed responses
+        return time.perf_counter() - started, counter.count, response.status_code
+
+    for _ in range(warmup):
+        call()
+
+    wall_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = list(executor.map(lambda _: call(), range(requests)))
+    wall = time.perf_counter() - wall_started
+
+    latencies = sorted(s[0] * 1000 for s in samples)
+    return {
+        "method": method,
+        "path": path,
+        "requests": requests,
+        "concurrency": concurrency,
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "p99_ms": round(_percentile(latencies, 99), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "throughput_rps": round(requests / wall, 1),
+        "queries_per_request": round(statistics.fmean(s[1] for s in samples), 1),
+        "errors": sum(1 for s in samples if s[2] >= 400),
+        "status_codes": sorted({s[2] for s in samples}),
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    fake_server, fake_url = start_fake_openai(args.ai_latency_ms)
+    app = create_app({'OPENAI_BASE_URL': fake_url, 'OPENAI_API_KEY': 'fake'})
+    counter = QueryCounter()
+    results = {}
+    try:
+        with app.app_context():
+            counter.install(db.engines.values())
+            ids, users = _sample_targets(args.prefix)
+            tokens = {role: create_access_token(identity=str(user_id)) for role, user_id in users.items()}
+            db.session.remove()
+
+        for name, method, template, role, body in ENDPOINTS:
+            if args.endpoints and not any(f in name for f in args.endpoints):
+                continue
+            path = template.format(**ids)
+            results[name] = bench_endpoint(app, counter, method, path, tokens[role], body,
+                                           args.requests, args.warmup, args.concurrency)
+            r = results[name]
+            print(f"{name:28s} p50 {r['p50_ms']:8.2f} ms  p95 {r['p95_ms']:8.2f} ms  p99 {r['p99_ms']:8.2f} ms  "
+                  f"{r['throughput_rps']:7.1f} req/s  {r['queries_per_request']:6.1f} queries"
+                  + (f"  ({r['errors']} errors)" if r['errors'] else ""))
+    finally:
+        fake_server.shutdown()
+
+    report = {
+        "meta": {
+            "revision": _git_revision(),
+            "timestamp": datetime.datetime.utcnow().isoformat() + 'Z',
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "ai_latency_ms": args.ai_latency_ms,
+        },
+        "endpoints": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['meta']['revision'] or 'run'}-{int(time.time())}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark every API endpoint against a synthetic dataset.")
+    parser.add_argument('--prefix', default='bench', help="Username prefix used by generate_dataset.py")
+    parser.add_argument('--requests', type=int, default=100, help="Measured requests per endpoint")
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--concurrency', type=int, default=1, help="Concurrent client threads")
+    parser.add_argument('--ai-latency-ms', type=int, default=0, help="Simulated latency of the fake AI server")
+    parser.add_argument('--endpoints', nargs='*', help="Only run endpoints whose name contains one of these")
+    parser.add_argument('--output', help="Where to write the JSON results (default: benchmarks/results/)")
+    run(parser.parse_args())
@@ -0,0 +1,179 @@
+import csv
+import uuid
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from sqlalchemy import insert, or_
+from sqlalchemy.exc import IntegrityError
+from models import db, User, Student, Teacher, UserRole
+
+# Bulk user import (CSV)
+# Expected header: username,email,password,first_name,last_name[,role][,title]
+# 'role' defaults to student. Teachers and administrators get a Teacher profile,
+# exactly like create_user_by_admin does for single users.
+REQUIRED_COLUMNS = ['username', 'email', 'password', 'first_name', 'last_name']
+VALID_ROLES = ('student', 'teacher', 'administrator')
+DEFAULT_CHUNK_SIZE = 500
+
+
+def iter_csv_rows(text_stream):
+    """Yields (row_number, row_dict) pairs from a CSV text stream without reading it all into memory."""
+    reader = csv.DictReader(text_stream)
+    missing = [c for c in REQUIRED_COLUMNS if c not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV is missing required columns: {', '.join(missing)}")
+    # Row 1 is the header, so data rows start at 2 (matches what a spreadsheet shows)
+    for row_number, row in enumerate(reader, start=2):
+        yield row_number, {k.strip(): (v or '').strip() for k, v in row.items() if k}
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class UserImporter:
+    """
+    Streams rows into the users/students/teachers/user_roles tables.
+    Each chunk is validated, checked for duplicates with a single query, has its
+    passwords hashed in parallel and is written with one bulk INSERT per table
+    inside its own transaction.
+    """
+
+    def __init__(self, bcrypt, chunk_size=DEFAULT_CHUNK_SIZE, workers=None):
+        self.bcrypt = bcrypt
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.created = 0
+        self.issues = []  # per-row duplicates and errors
+        self._seen_usernames = set()
+        self._seen_emails = set()
+
+    def _report(self, row_number, status, message):
+        self.issues.append({"row": row_number, "status": status, "message": message})
+
+    def _validate(self, chunk):
+        """Drops invalid rows and duplicates inside the file itself, reporting each one."""
+        valid = []
+        for row_number, row in chunk:
+            empty = [c for c in REQUIRED_COLUMNS if not row.get(c)]
+            if empty:
+                self._report(row_number, "error", f"Missing value for: {', '.join(empty)}")
+                continue
+            role = (row.get('role') or 'student').lower()
+            if role not in VALID_ROLES:
+                self._report(row_number, "error", f"Invalid role '{role}'.")
+                continue
+            if row['username'] in self._seen_usernames:
+                self._report(row_number, "duplicate", f"Username '{row['username']}' appears earlier in the file.")
+                continue
+            if row['email'] in self._seen_emails:
+                self._report(row_number, "duplicate", f"Email '{row['email']}' appears earlier in the file.")
+                continue
+            self._seen_usernames.add(row['username'])
+            self._seen_emails.add(row['email'])
+            row['role'] = role
+            valid.append((row_number, row))
+        return valid
+
+    def _drop_existing(self, chunk):
+        """One query per chunk to find usernames/emails that are already taken."""
+        usernames = [row['username'] for _, row in chunk]
+        emails = [row['email'] for _, row in chunk]
+        existing = db.session.query(User.username, User.email).filter(
+            or_(User.username.in_(usernames), User.email.in_(emails))
+        ).all()
+        taken_usernames = {u for u, _ in existing}
+        taken_emails = {e for _, e in existing}
+
+        remaining = []
+        for row_number, row in chunk:
+            if row['username'] in taken_usernames:
+                self._report(row_number, "duplicate", "Username already exists")
+            elif row['email'] in taken_emails:
+                self._report(row_number, "duplicate", "Email already exists")
+            else:
+                remaining.append((row_number, row))
+        return remaining
+
+    def _hash_passwords(self, executor, chunk):
+        # bcrypt releases the GIL while hashing, so threads give a real speed-up here
+        hashes = executor.map(lambda r: self.bcrypt.generate_password_hash(r[1]['password']).decode('utf-8'), chunk)
+        return list(hashes)
+
+    @staticmethod
+    def _build_rows(chunk, hashes):
+        now = datetime.datetime.utcnow()
+        users, students, teachers, roles = [], [], [], []
+        for (_, row), password_hash in zip(chunk, hashes):
+            user_id = uuid.uuid4()
+            users.append({"id": user_id, "username": row['username'], "email": row['email'],
+                          "password_hash": password_hash, "created_at": now, "updated_at": now})
+            profile = {"id": uuid.uuid4(), "user_id": user_id, "first_name": row['first_name'],
+                       "last_name": row['last_name'], "created_at": now}
+            if row['role'] == 'student':
+                students.append(profile)
+            else:
+                profile['title'] = row.get('title') or row['role'].capitalize()
+                teachers.append(profile)
+            roles.append({"user_id": user_id, "role": row['role'], "granted_at": now})
+        return users, students, teachers, roles
+
+    @staticmethod
+    def _insert(users, students, teachers, roles):
+        db.session.execute(insert(User), users)
+        if students:
+            db.session.execute(insert(Student), students)
+        if teachers:
+            db.session.execute(insert(Teacher), teachers)
+        db.session.execute(insert(UserRole), roles)
+
+    def _write_chunk(self, chunk, hashes):
+        users, students, teachers, roles = self._build_rows(chunk, hashes)
+        try:
+            self._insert(users, students, teachers, roles)
+            db.session.commit()
+            self.created += len(users)
+        except IntegrityError:
+            # Someone else created one of these users since our duplicate check.
+            # Retry this chunk row by row so only the conflicting rows are rejected.
+            db.session.rollback()
+            self._write_rows_individually(chunk, hashes)
+
+    def _write_rows_individually(self, chunk, hashes):
+        for (row_number, row), password_hash in zip(chunk, hashes):
+            users, students, teachers, roles = self._build_rows([(row_number, row)], [password_hash])
+            try:
+                self._insert(users, students, teachers, roles)
+                db.session.commit()
+                self.created += 1
+            except IntegrityError as e:
+                db.session.rollback()
+                if 'users_username_key' in str(e.orig): self._report(row_number, "duplicate", "Username already exists")
+                elif 'users_email_key' in str(e.orig): self._report(row_number, "duplicate", "Email already exists")
+                else: self._report(row_number, "error", "A database error occurred.")
+
+    def run(self, rows):
+        """Imports every (row_number, row) pair and returns a summary with per-row issues."""
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for chunk in _chunks(rows, self.chunk_size):
+                chunk = self._validate(chunk)
+                if chunk:
+                    chunk = self._drop_existing(chunk)
+                if not chunk:
+                    continue
+                hashes = self._hash_passwords(executor, chunk)
+                self._write_chunk(chunk, hashes)
+        return self.summary()
+
+    def summary(self):
+        return {
+            "created": self.created,
+            "duplicates": sum(1 for i in self.issues if i['status'] == 'duplicate'),
+            "errors": sum(1 for i in self.issues if i['status'] == 'error'),
+            "issues": sorted(self.issues, key=lambda i: i['row'])
+        }
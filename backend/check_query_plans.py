@@ -0,0 +1,162 @@
+import re
+import sys
+import json
+import argparse
+from contextlib import contextmanager
+from unittest import mock
+from sqlalchemy import select, func, event
+from flask_jwt_extended import create_access_token
+from app import create_app
+from models import db, UserRole, Student, Course, Module, LearningContent, StudentContentProgress
+
+# Query plan check
+# Calls the endpoints through the test client against a seeded database, records every
+# statement they send (the real ORM queries, with their parameters), then EXPLAINs each
+# one and exits non-zero if any of them sequentially scans one of the large tables.
+# Write endpoints run with commit() turned into flush(), and their work is rolled back.
+# Usage: python check_query_plans.py [--prefer-indexes]
+#
+# Judge the planner's real choices on a realistically sized dataset
+# (benchmarks/generate_dataset.py). On a small seed database, where scanning is genuinely
+# cheaper, pass --prefer-indexes to turn enable_seqscan off: Postgres then only scans
+# when no usable index exists, which still catches a missing index.
+LARGE_TABLES = {'student_content_progress', 'assessment_attempts', 'learning_content', 'modules', 'user_roles',
+                'quiz_best_scores', 'course_score_totals', 'student_mastery'}
+# Partitions (assessment_attempts_y2026m10, assessment_attempts_default) count as their parent table
+_PARTITION_SUFFIX = re.compile(r'_(y\d{4}m\d{2}|default)$')
+_CHECKED = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')
+
+
+def _sample():
+    """Real ids from the database, so the plans see realistic parameter values."""
+    course_id = db.session.scalar(
+        select(Module.course_id).join(LearningContent).join(Course).where(Course.deletion_requested_at.is_(None))
+        .group_by(Module.course_id).order_by(func.count().desc()).limit(1)
+    )
+    student = db.session.scalar(
+        select(Student).join(StudentContentProgress).join(LearningContent).join(Module)
+        .where(Module.course_id == course_id).limit(1)
+    ) or db.session.scalar(select(Student).limit(1))
+    teacher_user_id = db.session.scalar(select(UserRole.user_id).where(UserRole.role.in_(['teacher', 'administrator'])).limit(1))
+    quiz_id = db.session.scalar(
+        select(LearningContent.id).join(Module)
+        .where(Module.course_id == course_id, LearningContent.type == 'quiz', LearningContent.quiz_data.isnot(None)).limit(1)
+    )
+    content_id = db.session.scalar(select(LearningContent.id).join(Module).where(Module.course_id == course_id).limit(1))
+    title = db.session.scalar(select(Course.title).where(Course.id == course_id)) or 'course'
+    return {"course": course_id, "quiz": quiz_id, "content": content_id, "student_user": student.user_id,
+            "teacher_user": teacher_user_id, "word": re.findall(r'\w{4,}', title)[:1] or ['course']}
+
+
+def endpoint_requests(ids):
+    """(name, method, url, body, caller) for each endpoint checked."""
+    course, quiz, content, word = ids["course"], ids["quiz"], ids["content"], ids["word"][0]
+    # /api/students/me/next-items is left out: the adaptive engine loads the whole catalog by design
+    return [
+        ("get_courses", 'GET', '/api/courses', None, 'student'),
+        ("get_course_details", 'GET', f'/api/courses/{course}', None, 'student'),
+        ("get_course_details (outline)", 'GET', f'/api/courses/{course}?view=outline', None, 'student'),
+        ("get_content_body", 'GET', f'/api/content/{content}/body', None, 'student'),
+        ("get_quiz_questions", 'GET', f'/api/quizzes/{quiz}', None, 'student'),
+        ("get_course_progress", 'GET', f'/api/courses/{course}/progress', None, 'teacher'),
+        ("get_course_performance", 'GET', f'/api/courses/{course}/performance', None, 'teacher'),
+        ("get_recommendations", 'GET', '/api/students/me/recommendations', None, 'student'),
+        ("get_student_dashboard", 'GET', '/api/students/me/dashboard', None, 'student'),
+        ("search", 'GET', f'/api/search?q={word}', None, 'student'),
+        ("get_quiz_leaderboard", 'GET', f'/api/quizzes/{quiz}/leaderboard', None, 'teacher'),
+        ("get_quiz_rank", 'GET', f'/api/quizzes/{quiz}/rank?score=50', None, 'student'),
+        ("get_course_leaderboard", 'GET', f'/api/courses/{course}/leaderboard', None, 'student'),
+        ("get_course_rank", 'GET', f'/api/courses/{course}/rank?score=50', None, 'teacher'),
+        ("mark_content_complete", 'POST', f'/api/progress/{content}/complete', None, 'student'),
+        ("submit_quiz", 'POST', f'/api/quizzes/{quiz}/submit', {"answers": {}}, 'student'),
+    ]
+
+
+@contextmanager
+def _recording(statements):
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(_CHECKED):
+            statements.append((statement, parameters))
+    engines = list(db.engines.values())
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield
+    finally:
+        for engine in engines:
+            event.remove(engine, 'before_cursor_execute', record)
+
+
+def capture(app, ids):
+    """{endpoint name: [(statement, parameters), ...]} as issued by the real routes."""
+    tokens = {"student": create_access_token(identity=str(ids["student_user"])),
+              "teacher": create_access_token(identity=str(ids["teacher_user"]))}
+    client = app.test_client()
+    captured = {}
+    for name, method, url, body, caller in endpoint_requests(ids):
+        statements = []
+        # Nothing a checked request does is kept
+        with _recording(statements), mock.patch.object(db.session, 'commit', db.session.flush):
+            response = client.open(url, method=method, json=body, headers={"Authorization": f"Bearer {tokens[caller]}"})
+            response.close()
+        if response.status_code >= 400:
+            print(f"WARN  {name}: {method} {url} answered {response.status_code}; its plans may be incomplete")
+        captured[name] = statements
+    return captured
+
+
+def _seq_scans(plan):
+    """Walks an EXPLAIN (FORMAT JSON) plan tree and yields every Seq Scan on a large table."""
+    if plan.get('Node Type') == 'Seq Scan':
+        table = _PARTITION_SUFFIX.sub('', plan.get('Relation Name', ''))
+        if table in LARGE_TABLES:
+            yield plan['Relation Name']
+    for child in plan.get('Plans', []):
+        yield from _seq_scans(child)
+
+
+def explain(connection, statement, parameters):
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']
+
+
+def check_query_plans(prefer_indexes=False):
+    failures, checked = [], 0
+    app = create_app()
+    with app.app_context():
+        ids = _sample()
+        db.session.remove()
+        captured = capture(app, ids)
+        with db.engine.connect() as connection:
+            if prefer_indexes:
+                connection.exec_driver_sql("SET enable_seqscan = off")
+            for name, statements in captured.items():
+                scanned = set()
+                for statement, parameters in statements:
+                    tables = sorted(set(_seq_scans(explain(connection, statement, parameters))))
+                    if tables:
+                        scanned.update(tables)
+                        print(f"      {' '.join(statement.split())[:160]}")
+                checked += 1
+                if scanned:
+                    failures.append(name)
+                    print(f"FAIL  {name}: sequential scan on {', '.join(sorted(scanned))}")
+                else:
+                    print(f"ok    {name} ({len(statements)} statements)")
+            connection.rollback()
+
+    if failures:
+        print(f"\n{len(failures)} of {checked} endpoints scan large tables sequentially.")
+        return 1
+    print(f"\nAll {checked} endpoints use indexes.")
+    return 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Fail if endpoint queries sequentially scan large tables.")
+    parser.add_argument('--prefer-indexes', action='store_true',
+                        help="Turn enable_seqscan off, for small seed databases where scans are genuinely cheaper")
+    args = parser.parse_args()
+    sys.exit(check_query_plans(prefer_indexes=args.prefer_indexes))
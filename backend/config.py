@@ -0,0 +1,91 @@
+import os
+from dotenv import load_dotenv
+from db_routing import REPLICA_BIND
+
+# Application configuration
+# Everything is read from the environment (and backend/.env if present) when
+# create_app() runs, not at import time, so tests can pass their own config.
+
+def _env_bool(name, default):
+    return os.environ.get(name, default).lower() in ('1', 'true', 'yes')
+
+
+def load_env_file():
+    dotenv_path = os.path.join(os.path.dirname(__file__), '.env')
+    if os.path.exists(dotenv_path):
+        load_dotenv(dotenv_path)
+    else:
+        print("Warning: .env file not found.")
+
+
+def config_from_env():
+    """Builds the Flask config dict from environment variables."""
+    config = {
+        'SQLALCHEMY_DATABASE_URI': os.environ.get('DATABASE_URL'),
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        'JWT_SECRET_KEY': os.environ.get('JWT_SECRET_KEY'),
+        'OPENAI_API_KEY': os.environ.get('OPENAI_API_KEY'),
+        'OPENAI_BASE_URL': os.environ.get('OPENAI_BASE_URL'),  # e.g. a local fake for benchmarks
+        'CORS_ORIGINS': os.environ.get('CORS_ORIGINS', 'http://localhost:5173'),
+        # Rows the CSV import endpoint takes; every row is bcrypt-hashed in the request, so larger
+        # files go through import_users.py
+        'USER_IMPORT_MAX_ROWS': int(os.environ.get('USER_IMPORT_MAX_ROWS', 50)),
+        'REPLICA_STICKY_SECONDS': float(os.environ.get('REPLICA_STICKY_SECONDS', 5)),
+        # Request/SQL instrumentation and /metrics (see instrumentation.py)
+        'INSTRUMENTATION_ENABLED': _env_bool('INSTRUMENTATION_ENABLED', 'true'),
+        'SLOW_REQUEST_MS': float(os.environ.get('SLOW_REQUEST_MS', 500)),
+        'N_PLUS_ONE_THRESHOLD': int(os.environ.get('N_PLUS_ONE_THRESHOLD', 10)),
+        'METRICS_DIR': os.environ.get('METRICS_DIR'),  # shared by the workers so /metrics reports all of them (see metrics.py)
+        'METRICS_TOKEN': os.environ.get('METRICS_TOKEN'),  # /metrics requires this bearer token (open without one only in debug mode)
+        # Content bodies at least this big (bytes) are stored gzipped at write time; 0 disables
+        'PRECOMPRESS_BODY_BYTES': int(os.environ.get('PRECOMPRESS_BODY_BYTES', 64 * 1024)),
+        # Courses with more content/progress/attempt rows than this are deleted in the background, in batches
+        'COURSE_DELETE_SYNC_LIMIT': int(os.environ.get('COURSE_DELETE_SYNC_LIMIT', 10000)),
+        'COURSE_DELETE_BATCH_SIZE': int(os.environ.get('COURSE_DELETE_BATCH_SIZE', 2000)),
+        # Live course events for teacher dashboards (see events.py): 'memory' or 'postgres'
+        'EVENTS_BACKEND': os.environ.get('EVENTS_BACKEND', 'memory'),
+        'EVENTS_QUEUE_SIZE': int(os.environ.get('EVENTS_QUEUE_SIZE', 100)),  # per dashboard, before it's told to resync
+        'EVENTS_HEARTBEAT_SECONDS': float(os.environ.get('EVENTS_HEARTBEAT_SECONDS', 15)),
+        'EVENTS_TOKEN_SECONDS': int(os.environ.get('EVENTS_TOKEN_SECONDS', 60)),  # life of a stream token, to open the stream
+        # Open streams per worker; each holds a thread, so keep this below the gthread --threads count
+        'EVENTS_MAX_STREAMS': int(os.environ.get('EVENTS_MAX_STREAMS', 24)),
+        # Adaptive next-item engine (see adaptive.py)
+        'ADAPTIVE_MAX_STUDENTS': int(os.environ.get('ADAPTIVE_MAX_STUDENTS', 100000)),  # kept in memory per worker
+        'ADAPTIVE_SNAPSHOT_SECONDS': float(os.environ.get('ADAPTIVE_SNAPSHOT_SECONDS', 60)),
+        'ADAPTIVE_CATALOG_SECONDS': float(os.environ.get('ADAPTIVE_CATALOG_SECONDS', 300)),
+    }
+
+    # Connection pool settings (per worker process), applied by apply_pool_options()
+    config['DB_POOL_OPTIONS'] = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),  # seconds
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', 'true'),
+    }
+
+    # Optional read replica for the heavy read-only endpoints (see db_routing.py)
+    replica_url = os.environ.get('REPLICA_DATABASE_URL')
+    if replica_url:
+        config['SQLALCHEMY_BINDS'] = {REPLICA_BIND: {'url': replica_url}}
+    return config
+
+
+def apply_pool_options(config):
+    """Adds the pool settings to every server database engine (SQLite manages its own pool)."""
+    pool_options = config.get('DB_POOL_OPTIONS', {})
+    if not str(config.get('SQLALCHEMY_DATABASE_URI')).startswith('sqlite'):
+        config['SQLALCHEMY_ENGINE_OPTIONS'] = {**pool_options, **config.get('SQLALCHEMY_ENGINE_OPTIONS', {})}
+    for bind in config.get('SQLALCHEMY_BINDS', {}).values():
+        if isinstance(bind, dict) and not str(bind.get('url')).startswith('sqlite'):
+            for key, value in pool_options.items():
+                bind.setdefault(key, value)
+
+
+def validate_config(config):
+    if not config.get('SQLALCHEMY_DATABASE_URI'):
+        raise RuntimeError("FATAL ERROR: DATABASE_URL is not set.")
+    if not config.get('JWT_SECRET_KEY'):
+        raise RuntimeError("FATAL ERROR: JWT_SECRET_KEY is not set.")
+    if not config.get('OPENAI_API_KEY'):
+        print("Warning: OPENAI_API_KEY is not set. AI features will be disabled.")
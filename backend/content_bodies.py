@@ -0,0 +1,103 @@
+import gzip
+import hashlib
+from flask import current_app, request, Response
+from sqlalchemy import select
+from models import db, Course, Module, LearningContent
+
+try:
+    import brotli
+except ImportError:  # optional: without it we fall back to gzip
+    brotli = None
+
+# Learning content bodies
+# Course outlines leave bodies out; each body is fetched on its own from
+# /api/content/<id>/body, compressed for the client and cached by version.
+#
+# content_body_etag is a sha256 of the body, set whenever the body is written.
+# Outlines include it as `body_version`, so the client asks for
+# /body?v=<version> and that exact URL can be cached as immutable.
+# Bodies larger than PRECOMPRESS_BODY_BYTES are also stored gzipped at write
+# time and sent as-is to clients that accept gzip.
+MIN_COMPRESS_BYTES = 1024  # below this compression costs more than it saves
+IMMUTABLE_CACHE = 'private, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'private, no-cache'
+
+
+def body_etag(body):
+    return hashlib.sha256(body.encode('utf-8')).hexdigest() if body is not None else None
+
+
+def body_columns(body, threshold=None):
+    """Values for the body columns of a LearningContent row, for ORM constructors and bulk inserts alike."""
+    if threshold is None:
+        threshold = current_app.config['PRECOMPRESS_BODY_BYTES']
+    encoded = body.encode('utf-8') if body is not None else b''
+    return {
+        "content_body": body,
+        "content_body_etag": body_etag(body),
+        "content_body_gzip": gzip.compress(encoded, compresslevel=9) if threshold and len(encoded) >= threshold else None,
+    }
+
+
+def _accepts(encoding):
+    return request.accept_encodings[encoding] > 0
+
+
+def _matching_tag(etag):
+    """The If-None-Match tag naming this version, if any. Any representation (identity, -gzip, -br) counts."""
+    return next((tag for tag in request.if_none_match.as_set() if tag.split('-')[0] == etag), None)
+
+
+def serve_content_body(content_id):
+    """Builds the response for one content body, or returns None if the content doesn't exist."""
+    row = db.session.execute(
+        select(LearningContent.content_body_etag, LearningContent.content_body_gzip.isnot(None))
+        .join(Module, LearningContent.module_id == Module.id)
+        .join(Course, Module.course_id == Course.id)
+        .where(LearningContent.id == content_id, Course.deletion_requested_at.is_(None))
+    ).first()
+    if row is None:
+        return None
+    etag, has_gzip = row
+
+    body = None
+    if etag is None:
+        # Rows written before bodies were versioned; hash on the fly
+        body = db.session.scalar(select(LearningContent.content_body).where(LearningContent.id == content_id)) or ''
+        etag = body_etag(body)
+
+    cache_control = IMMUTABLE_CACHE if request.args.get('v') == etag else REVALIDATE_CACHE
+    matched = _matching_tag(etag)
+    if matched:
+        response = Response(status=304)
+        # The client's own tag: it already carries the encoding suffix the 200 was sent with
+        response.set_etag(matched)
+    elif has_gzip and _accepts('gzip') and not (brotli and _accepts('br')):
+        payload = db.session.scalar(select(LearningContent.content_body_gzip).where(LearningContent.id == content_id))
+        response = _body_response(payload, 'gzip', etag)
+    else:
+        if body is None:
+            body = db.session.scalar(select(LearningContent.content_body).where(LearningContent.id == content_id)) or ''
+        payload = body.encode('utf-8')
+        if len(payload) < MIN_COMPRESS_BYTES:
+            response = _body_response(payload, None, etag)
+        elif brotli and _accepts('br'):
+            response = _body_response(brotli.compress(payload, quality=5), 'br', etag)
+        elif _accepts('gzip'):
+            response = _body_response(gzip.compress(payload, compresslevel=6), 'gzip', etag)
+        else:
+            response = _body_response(payload, None, etag)
+
+    response.headers['Cache-Control'] = cache_control
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+
+def _body_response(payload, encoding, etag):
+    response = Response(payload, mimetype='text/plain')
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    # Strong ETags must differ between encodings of the same body
+    response.set_etag(f"{etag}-{encoding}" if encoding else etag)
+    return response
@@ -0,0 +1,111 @@
+import logging
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from sqlalchemy import select, delete, func, tuple_
+from models import (db, Course, Module, LearningContent, StudentContentProgress, AssessmentAttempt, AssessmentAttemptRollup,
+                    QuizBestScore, CourseScoreTotal)
+
+# Course deletion
+# Small courses go in one DELETE (ON DELETE CASCADE takes the rest). Large ones are
+# marked with deletion_requested_at, which hides them everywhere, and emptied by a
+# background thread in short batches. That thread dies with the worker: schedule
+# purge_deleted_courses.py (e.g. from cron) to finish whatever a restart interrupted.
+#
+# Config:
+#   COURSE_DELETE_SYNC_LIMIT   courses with fewer dependent rows than this are deleted in the request
+#   COURSE_DELETE_BATCH_SIZE   rows per batch in the background
+logger = logging.getLogger('course_deletion')
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='course-deletion')
+
+
+def _course_content_ids(course_id):
+    return select(LearningContent.id).join(Module).where(Module.course_id == course_id)
+
+
+def live_content_or_404(content_id):
+    """The content, unless it doesn't exist or its course is being deleted."""
+    return (LearningContent.query.join(Module).join(Course)
+            .filter(LearningContent.id == content_id, Course.deletion_requested_at.is_(None)).first_or_404())
+
+
+def _capped_count(query, cap):
+    return select(func.count()).select_from(query.limit(cap).subquery()).scalar_subquery()
+
+
+def dependent_row_count(course_id, cap):
+    """Content, progress and attempt rows that would go with the course, counting each kind only up to `cap`."""
+    content_ids = _course_content_ids(course_id)
+    counts = [
+        select(LearningContent.id).join(Module).where(Module.course_id == course_id),
+        select(StudentContentProgress.id).where(StudentContentProgress.content_id.in_(content_ids)),
+        select(AssessmentAttempt.id).where(AssessmentAttempt.content_id.in_(content_ids)),
+    ]
+    return db.session.scalar(select(sum(_capped_count(c, cap) for c in counts)))
+
+
+def _delete_in_batches(model, key_columns, condition, batch_size):
+    deleted = 0
+    while True:
+        batch = select(*key_columns).where(condition).limit(batch_size)
+        result = db.session.execute(delete(model).where(tuple_(*key_columns).in_(batch)))
+        db.session.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
+
+
+def purge_course(course_id, batch_size=None):
+    """Deletes a course and everything under it in short batches. Safe to re-run."""
+    batch_size = batch_size or current_app.config['COURSE_DELETE_BATCH_SIZE']
+    content_ids = _course_content_ids(course_id)
+    module_ids = select(Module.id).where(Module.course_id == course_id)
+
+    deleted = _delete_in_batches(StudentContentProgress, [StudentContentProgress.id],
+                                 StudentContentProgress.content_id.in_(content_ids), batch_size)
+    deleted += _delete_in_batches(AssessmentAttempt, [AssessmentAttempt.id, AssessmentAttempt.submitted_at],
+                                  AssessmentAttempt.content_id.in_(content_ids), batch_size)
+    deleted += _delete_in_batches(
+        AssessmentAttemptRollup,
+        [AssessmentAttemptRollup.student_id, AssessmentAttemptRollup.content_id, AssessmentAttemptRollup.month],
+        AssessmentAttemptRollup.content_id.in_(content_ids), batch_size)
+    deleted += _delete_in_batches(QuizBestScore, [QuizBestScore.content_id, QuizBestScore.student_id],
+                                  QuizBestScore.content_id.in_(content_ids), batch_size)
+    deleted += _delete_in_batches(CourseScoreTotal, [CourseScoreTotal.course_id, CourseScoreTotal.student_id],
+                                  CourseScoreTotal.course_id == course_id, batch_size)
+    deleted += _delete_in_batches(LearningContent, [LearningContent.id], LearningContent.module_id.in_(module_ids), batch_size)
+    deleted += _delete_in_batches(Module, [Module.id], Module.course_id == course_id, batch_size)
+    db.session.execute(delete(Course).where(Course.id == course_id))
+    db.session.commit()
+    return deleted
+
+
+def _purge_in_background(app, course_id):
+    with app.app_context():
+        try:
+            deleted = purge_course(course_id)
+            logger.info("Deleted course %s with %d dependent rows", course_id, deleted)
+        except Exception:
+            db.session.rollback()
+            logger.exception("Background deletion of course %s failed; purge_deleted_courses.py will retry it", course_id)
+        finally:
+            db.session.remove()
+
+
+def delete_course(course):
+    """
+    Deletes small courses immediately and hands large ones to the background thread.
+    Returns True if the course is already gone, False if deletion was scheduled.
+    """
+    if course.deletion_requested_at is None:
+        limit = current_app.config['COURSE_DELETE_SYNC_LIMIT']
+        if dependent_row_count(course.id, cap=limit) < limit:
+            db.session.execute(delete(Course).where(Course.id == course.id))
+            db.session.commit()
+            return True
+        course.deletion_requested_at = datetime.datetime.utcnow()
+        db.session.commit()
+    # Re-submitting a course that's already marked is harmless: purge_course is idempotent
+    _executor.submit(_purge_in_background, current_app._get_current_object(), course.id)
+    return False
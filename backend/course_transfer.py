@@ -0,0 +1,203 @@
+import json
+import uuid
+import datetime
+from sqlalchemy import insert, null
+from models import db, Course, Module, LearningContent
+from content_bodies import body_columns
+from grading import validate_quiz_data
+
+# Whole-course export/import
+# The document looks like:
+# {
+#   "format": "ailearning.course", "version": 1,
+#   "course": {"id": ..., "title": ..., "description": ...},
+#   "modules": [{"id": ..., "title": ..., "description": ..., "order": 1,
+#                "learning_contents": [{"id": ..., "type": "quiz", "title": ..., "url": ...,
+#                                       "body": ..., "order": 1, "quiz_data": {...}, "tags": "a,b"}]}]
+# }
+# Ids in the document are only used to report the old -> new id mapping on import.
+EXPORT_FORMAT = "ailearning.course"
+EXPORT_VERSION = 1
+CONTENT_TYPES = LearningContent.__table__.c.type.type.enums
+
+
+def _content_to_dict(content):
+    return {
+        "id": str(content.id),
+        "type": content.type,
+        "title": content.title,
+        "url": content.content_url,
+        "body": content.content_body,
+        "order": content.content_order,
+        "quiz_data": content.quiz_data,
+        "tags": content.tags
+    }
+
+
+def _module_header(module):
+    """The module object with its content list left open, so items can be streamed into it."""
+    module_data = {"id": str(module.id), "title": module.title, "description": module.description, "order": module.module_order}
+    return json.dumps(module_data)[:-1] + ', "learning_contents": ['
+
+
+def stream_course_export(course):
+    """
+    Generator that yields the course document as JSON text chunks.
+    Modules come from one query and content from one server-side cursor, so memory
+    stays flat no matter how large the course is.
+    """
+    course_data = {"id": str(course.id), "title": course.title, "description": course.description}
+    yield f'{{"format": "{EXPORT_FORMAT}", "version": {EXPORT_VERSION}, "course": {json.dumps(course_data)}, "modules": ['
+
+    modules = Module.query.filter_by(course_id=course.id).order_by(Module.module_order, Module.id).all()
+    contents = (
+        LearningContent.query
+        .join(Module)
+        .filter(Module.course_id == course.id)
+        .order_by(Module.module_order, Module.id, LearningContent.content_order)
+        .execution_options(yield_per=200)
+    )
+
+    # Both queries use the same module ordering, so we can walk them in step
+    module_index = -1
+    first_content = True
+    for content in contents:
+        while module_index < 0 or modules[module_index].id != content.module_id:
+            if module_index >= 0:
+                yield ']}'
+            module_index += 1
+            yield (', ' if module_index else '') + _module_header(modules[module_index])
+            first_content = True
+        yield ('' if first_content else ', ') + json.dumps(_content_to_dict(content))
+        first_content = False
+
+    # Close the last open module and emit any trailing modules without content
+    if module_index >= 0:
+        yield ']}'
+    for i in range(module_index + 1, len(modules)):
+        yield (', ' if i else '') + _module_header(modules[i]) + ']}'
+    yield ']}'
+
+
+class CourseImportError(ValueError):
+    """Raised when an import document fails validation. Carries every problem found."""
+
+    def __init__(self, errors):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def _require_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def validate_course_document(doc):
+    """Checks the whole document up front so a bad import never writes anything."""
+    errors = []
+    if not isinstance(doc, dict):
+        raise CourseImportError(["Document must be a JSON object."])
+    if doc.get('format', EXPORT_FORMAT) != EXPORT_FORMAT:
+        errors.append(f"Unsupported format '{doc.get('format')}'.")
+    if doc.get('version', EXPORT_VERSION) != EXPORT_VERSION:
+        errors.append(f"Unsupported version '{doc.get('version')}'.")
+
+    course = doc.get('course')
+    if not isinstance(course, dict) or not course.get('title'):
+        errors.append("course.title is required.")
+
+    modules = doc.get('modules', [])
+    if not isinstance(modules, list):
+        errors.append("modules must be a list.")
+        modules = []
+
+    for m_index, module in enumerate(modules):
+        where = f"modules[{m_index}]"
+        if not isinstance(module, dict):
+            errors.append(f"{where} must be an object.")
+            continue
+        if not module.get('title'):
+            errors.append(f"{where}.title is required.")
+        if not _require_int(module.get('order')):
+            errors.append(f"{where}.order must be an integer.")
+
+        contents = module.get('learning_contents', [])
+        if not isinstance(contents, list):
+            errors.append(f"{where}.learning_contents must be a list.")
+            continue
+        for c_index, content in enumerate(contents):
+            c_where = f"{where}.learning_contents[{c_index}]"
+            if not isinstance(content, dict):
+                errors.append(f"{c_where} must be an object.")
+                continue
+            if not content.get('title'):
+                errors.append(f"{c_where}.title is required.")
+            if content.get('type') not in CONTENT_TYPES:
+                errors.append(f"{c_where}.type must be one of: {', '.join(CONTENT_TYPES)}.")
+            if not _require_int(content.get('order')):
+                errors.append(f"{c_where}.order must be an integer.")
+            if content.get('quiz_data') is not None and not isinstance(content['quiz_data'], dict):
+                errors.append(f"{c_where}.quiz_data must be an object.")
+            elif content.get('type') == 'quiz' and content.get('quiz_data') is not None:
+                errors.extend(f"{c_where}.{error}" for error in validate_quiz_data(content['quiz_data']))
+            if content.get('tags') is not None and not isinstance(content['tags'], str):
+                errors.append(f"{c_where}.tags must be a comma separated string.")
+
+    if errors:
+        raise CourseImportError(errors)
+
+
+def import_course_document(doc, teacher_id=None, title=None):
+    """
+    Creates the whole course tree with one bulk INSERT per table in a single transaction.
+    Returns the new course id and the old -> new id mapping for modules and content.
+    The caller is responsible for committing.
+    """
+    validate_course_document(doc)
+    now = datetime.datetime.utcnow()
+
+    course = Course(
+        id=uuid.uuid4(),
+        title=title or doc['course']['title'],
+        description=doc['course'].get('description', ''),
+        created_by_teacher_id=teacher_id,
+        created_at=now
+    )
+    db.session.add(course)
+    db.session.flush()
+
+    module_rows, content_rows = [], []
+    module_ids, content_ids = {}, {}
+    for m_index, module in enumerate(doc.get('modules', [])):
+        new_module_id = uuid.uuid4()
+        module_ids[str(module.get('id', m_index))] = str(new_module_id)
+        module_rows.append({
+            "id": new_module_id,
+            "course_id": course.id,
+            "title": module['title'],
+            "description": module.get('description', ''),
+            "module_order": module['order'],
+            "created_at": now
+        })
+        for c_index, content in enumerate(module.get('learning_contents', [])):
+            new_content_id = uuid.uuid4()
+            content_ids[str(content.get('id', f"{m_index}.{c_index}"))] = str(new_content_id)
+            content_rows.append({
+                "id": new_content_id,
+                "module_id": new_module_id,
+                "type": content['type'],
+                "title": content['title'],
+                "content_url": content.get('url'),
+                **body_columns(content.get('body')),
+                "content_order": content['order'],
+                # SQL NULL, like content created through the API; a plain None would be stored as JSON null
+                "quiz_data": content['quiz_data'] if content.get('quiz_data') is not None else null(),
+                "tags": content.get('tags'),
+                "created_at": now
+            })
+
+    if module_rows:
+        db.session.execute(insert(Module), module_rows)
+    if content_rows:
+        db.session.execute(insert(LearningContent), content_rows)
+
+    return {"course_id": str(course.id), "modules": module_ids, "learning_contents": content_ids}
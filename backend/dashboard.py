@@ -0,0 +1,83 @@
+from sqlalchemy import select, func, and_
+from models import db, Teacher, Course, Module, LearningContent, StudentContentProgress, AssessmentAttempt
+from recommendations import recommend_content
+
+# Student dashboard
+# Everything the dashboard page shows, in a fixed number of queries no matter how
+# many courses there are: the course list, per-course completion, recent quiz scores
+# and recommendations.
+RECENT_SCORES = 5
+
+
+def _courses():
+    return db.session.execute(
+        select(Course.id, Course.title, Course.description, Teacher.first_name, Teacher.last_name)
+        .outerjoin(Teacher, Course.created_by_teacher_id == Teacher.id)
+        .where(Course.deletion_requested_at.is_(None))
+        .order_by(Course.title)
+    ).all()
+
+
+def _completion(student_id):
+    """{course_id: (total items, items completed by the student)} for the courses the student has started."""
+    started = (
+        select(Module.course_id)
+        .join(LearningContent, LearningContent.module_id == Module.id)
+        .join(StudentContentProgress, StudentContentProgress.content_id == LearningContent.id)
+        .where(StudentContentProgress.student_id == student_id)
+    )
+    rows = db.session.execute(
+        select(Module.course_id, func.count(LearningContent.id), func.count(StudentContentProgress.id))
+        .join(LearningContent, LearningContent.module_id == Module.id)
+        .outerjoin(StudentContentProgress, and_(
+            StudentContentProgress.content_id == LearningContent.id,
+            StudentContentProgress.student_id == student_id,
+            StudentContentProgress.status == 'completed'
+        ))
+        .where(Module.course_id.in_(started))
+        .group_by(Module.course_id)
+    ).all()
+    return {course_id: (total, completed) for course_id, total, completed in rows}
+
+
+def _recent_scores(student_id):
+    rows = db.session.execute(
+        select(AssessmentAttempt.content_id, LearningContent.title, Course.id, Course.title,
+               AssessmentAttempt.score, AssessmentAttempt.attempt_number, AssessmentAttempt.submitted_at)
+        .join(LearningContent, AssessmentAttempt.content_id == LearningContent.id)
+        .join(Module, LearningContent.module_id == Module.id)
+        .join(Course, Module.course_id == Course.id)
+        .where(AssessmentAttempt.student_id == student_id, Course.deletion_requested_at.is_(None))
+        .order_by(AssessmentAttempt.submitted_at.desc())
+        .limit(RECENT_SCORES)
+    ).all()
+    return [{
+        "quiz_id": str(quiz_id),
+        "quiz_title": quiz_title,
+        "course_id": str(course_id),
+        "course_title": course_title,
+        "score": float(score),
+        "attempt_number": attempt_number,
+        "submitted_at": submitted_at.isoformat()
+    } for quiz_id, quiz_title, course_id, course_title, score, attempt_number, submitted_at in rows]
+
+
+def student_dashboard(student):
+    completion = _completion(student.id)
+    courses = []
+    for course_id, title, description, first_name, last_name in _courses():
+        total, completed = completion.get(course_id, (0, 0))
+        courses.append({
+            "id": str(course_id),
+            "title": title,
+            "description": description,
+            "author": f"{first_name} {last_name}" if first_name is not None else "N/A",
+            "total_items": total,
+            "completed_items": completed,
+            "percentage": round(completed / total * 100, 2) if total else 0
+        })
+    return {
+        "courses": courses,
+        "recent_scores": _recent_scores(student.id),
+        "recommendations": recommend_content(student.id)
+    }
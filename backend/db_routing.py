@@ -0,0 +1,103 @@
+import math
+import time
+from functools import wraps
+from flask import current_app, g, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import event
+
+# Read-replica routing
+# Set REPLICA_DATABASE_URL to add a second bind called 'replica'. Routes decorated
+# with @read_replica send their SELECTs there; everything else (and every flush)
+# stays on the primary. Without a replica configured the decorator is a no-op.
+#
+# Read-your-writes: a request that commits a write sets a signed cookie with the time
+# of the write, and @read_replica routes stay on the primary for REPLICA_STICKY_SECONDS
+# after it. The cookie travels with the browser, so it works whichever worker or host
+# serves the next request. Keep the window a little longer than the replica's usual lag.
+#
+# To try it locally, run two Postgres instances (e.g. ports 5432 and 5433 with
+# streaming replication) and point DATABASE_URL / REPLICA_DATABASE_URL at them.
+REPLICA_BIND = 'replica'
+STICKY_COOKIE = 'last_write'
+
+
+class RoutingSession(Session):
+    """Session that picks the replica engine while a @read_replica route is running."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_app_context() and g.get('_use_replica'):
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _serializer():
+    return URLSafeSerializer(current_app.config['JWT_SECRET_KEY'], salt='read-your-writes')
+
+
+def recently_wrote():
+    """True if this browser committed a write within the sticky window."""
+    cookie = request.cookies.get(STICKY_COOKIE)
+    if not cookie:
+        return False
+    try:
+        wrote_at = float(_serializer().loads(cookie))
+    except (BadSignature, TypeError, ValueError):
+        return False
+    return time.time() - wrote_at < current_app.config.get('REPLICA_STICKY_SECONDS', 5)
+
+
+def _set_sticky_cookie(response):
+    wrote_at = g.pop('_wrote_at', None)
+    if wrote_at is not None:
+        response.set_cookie(STICKY_COOKIE, _serializer().dumps(wrote_at), path='/api',
+                            max_age=math.ceil(current_app.config.get('REPLICA_STICKY_SECONDS', 5)),
+                            secure=request.is_secure, httponly=True, samesite='Lax')
+    return response
+
+
+def init_app(app):
+    if REPLICA_BIND in app.config.get('SQLALCHEMY_BINDS', {}):
+        app.after_request(_set_sticky_cookie)
+
+
+def read_replica(fn):
+    """Route decorator: run this read-only view against the replica when it is safe to."""
+    @wraps(fn)
+    def decorator(*args, **kwargs):
+        if REPLICA_BIND not in current_app.config.get('SQLALCHEMY_BINDS', {}):
+            return fn(*args, **kwargs)
+        if recently_wrote():
+            return fn(*args, **kwargs)
+        g._use_replica = True
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            g._use_replica = False
+    return decorator
+
+
+# Write tracking for read-your-writes. Registered on the class so it covers every db.session.
+@event.listens_for(RoutingSession, 'after_flush')
+def _after_flush(session, flush_context):
+    session.info['has_writes'] = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _after_bulk_statement(orm_execute_state):
+    # Bulk insert()/update()/delete() statements skip the flush, so catch them here
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['has_writes'] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _after_commit(session):
+    if session.info.pop('has_writes', False) and has_request_context():
+        g._wrote_at = time.time()
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _after_rollback(session):
+    session.info.pop('has_writes', None)
@@ -0,0 +1,38 @@
+from functools import wraps
+from flask import jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models import User, UserRole
+
+# CUSTOM DECORATOR: Admin-Only Routes
+def admin_required():
+    def wrapper(fn):
+        @wraps(fn)
+        @jwt_required()
+        def decorator(*args, **kwargs):
+            current_user_id = get_jwt_identity()
+            # Find users roles from database
+            user_roles = UserRole.query.filter_by(user_id=current_user_id).all()
+            roles = [role.role for role in user_roles]
+            # error handling
+            if 'administrator' not in roles:
+                return jsonify({"error": "Admins only!"}), 403
+            return fn(*args, **kwargs)
+        return decorator
+    return wrapper
+
+# This decorator is more flexible for routes that teachers OR admins can access.
+def roles_required(*roles):
+    """Decorator to ensure user has at least one of the specified roles."""
+    def wrapper(fn):
+        @wraps(fn)
+        @jwt_required()
+        def decorator(*args, **kwargs):
+            current_user_id = get_jwt_identity()
+            user = User.query.get(current_user_id)
+            user_roles = {r.role for r in user.roles}
+            
+            if not user_roles.intersection(roles):
+                return jsonify({"error": "Access forbidden: insufficient permissions"}), 403
+            return fn(*args, **kwargs)
+        return decorator
+    return wrapper
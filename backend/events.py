@@ -0,0 +1,255 @@
+import json
+import time
+import queue
+import select
+import logging
+import datetime
+import threading
+from collections import defaultdict
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import NullPool
+from db_routing import RoutingSession
+from metrics import registry
+from models import db
+
+# Course change feed
+# publish() queues a small event on the session; it goes out when the session commits
+# (never on rollback) and GET /api/courses/<id>/events streams it to teacher dashboards
+# as Server-Sent Events. Each worker's broker keeps a bounded queue per dashboard, and a
+# dashboard that falls behind gets a "resync" instead of its backlog.
+#
+# EVENTS_BACKEND: 'memory' reaches dashboards on the same worker only; 'postgres' sends
+# NOTIFY with the commit and every worker LISTENs on one connection. In-process consumers
+# (the adaptive engine) use broker.add_listener(); listeners must not block.
+logger = logging.getLogger('events')
+
+CHANNEL = 'course_events'
+RESYNC = {"type": "resync"}
+RETRY_MS = 3000  # how long browsers wait before reconnecting
+_PENDING = 'pending_events'
+_POLL_SECONDS = 5
+_RECONNECT_SECONDS = 2
+
+EVENTS_PUBLISHED = registry.counter('course_events_published_total', 'Course events published.', labels=('type',))
+EVENTS_OVERFLOWED = registry.counter(
+    'course_events_overflowed_total', 'Times a slow dashboard\'s backlog was dropped and replaced by a resync.')
+
+
+class InProcessBackend:
+    """Delivers committed events to subscribers in this process only."""
+
+    def __init__(self, broker):
+        self.broker = broker
+
+    def start(self):
+        pass
+
+    def send(self, session, events):
+        pass
+
+    def deliver(self, events):
+        for course_event in events:
+            self.broker.dispatch(course_event)
+
+
+class PostgresBackend:
+    """NOTIFY as part of the commit; a LISTEN thread per process hands events to the broker."""
+
+    def __init__(self, broker, url):
+        self.broker, self.url = broker, url
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        # Started by the first subscriber, so CLI scripts and idle workers don't hold a connection
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._listen, name='course-events-listener', daemon=True)
+                self._thread.start()
+
+    def send(self, session, events):
+        for course_event in events:
+            session.execute(text("SELECT pg_notify(:channel, :payload)"),
+                            {"channel": CHANNEL, "payload": json.dumps(course_event)})
+
+    def deliver(self, events):
+        pass  # they come back through LISTEN, to this worker and every other one
+
+    def _listen(self):
+        engine = create_engine(self.url, poolclass=NullPool)
+        while True:
+            try:
+                connection = engine.raw_connection()
+                try:
+                    listener = connection.driver_connection
+                    listener.autocommit = True
+                    listener.cursor().execute(f"LISTEN {CHANNEL}")
+                    while True:
+                        if select.select([listener], [], [], _POLL_SECONDS) == ([], [], []):
+                            continue
+                        listener.poll()
+                        while listener.notifies:
+                            self.broker.dispatch(json.loads(listener.notifies.pop(0).payload))
+                finally:
+                    connection.close()
+            except Exception:
+                logger.exception("Lost the %s listener connection, reconnecting", CHANNEL)
+                # Anything sent while we were disconnected is gone
+                self.broker.resync_all()
+                time.sleep(_RECONNECT_SECONDS)
+
+
+class EventBroker:
+    def __init__(self):
+        self.backend = InProcessBackend(self)
+        self.queue_size = 100
+        self.max_streams = None
+        self._subscribers = defaultdict(set)
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        name = app.config['EVENTS_BACKEND']
+        if name == 'memory':
+            self.backend = InProcessBackend(self)
+        elif name == 'postgres':
+            self.backend = PostgresBackend(self, app.config['SQLALCHEMY_DATABASE_URI'])
+        else:
+            raise RuntimeError(f"FATAL ERROR: unknown EVENTS_BACKEND {name!r} (use 'memory' or 'postgres').")
+        self.queue_size = app.config['EVENTS_QUEUE_SIZE']
+        self.max_streams = app.config['EVENTS_MAX_STREAMS']
+        app.extensions['events'] = self
+
+    def subscribe(self, course_id):
+        """A queue of the course's events, or None if max_streams are open on this worker already."""
+        subscription = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            # Counted and taken under one lock, so concurrent connects can't overshoot the cap
+            if self.max_streams is not None and self._stream_count() >= self.max_streams:
+                return None
+            self._subscribers[str(course_id)].add(subscription)
+        self.backend.start()
+        return subscription
+
+    def unsubscribe(self, course_id, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(str(course_id))
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[str(course_id)]
+
+    def add_listener(self, callback):
+        """Calls `callback(event)` for every event, whichever course it belongs to."""
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def start(self):
+        """Makes sure events from other workers arrive here too (a no-op for the memory backend)."""
+        self.backend.start()
+
+    def stream_count(self):
+        with self._lock:
+            return self._stream_count()
+
+    def _stream_count(self):
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def _offer(self, subscription, course_event):
+        try:
+            subscription.put_nowait(course_event)
+        except queue.Full:
+            with subscription.mutex:
+                subscription.queue.clear()
+            try:
+                subscription.put_nowait(RESYNC)
+            except queue.Full:
+                pass  # another publisher refilled it in between; the client is resyncing anyway
+            EVENTS_OVERFLOWED.inc()
+
+    def dispatch(self, course_event):
+        with self._lock:
+            listeners = list(self._listeners)
+            subscribers = list(self._subscribers.get(course_event["course_id"], ()))
+        for callback in listeners:
+            try:
+                callback(course_event)
+            except Exception:
+                logger.exception("Course event listener %r failed on %s", callback, course_event["type"])
+        for subscription in subscribers:
+            self._offer(subscription, course_event)
+
+    def resync_all(self):
+        with self._lock:
+            subscribers = [s for course in self._subscribers.values() for s in course]
+        for subscription in subscribers:
+            self._offer(subscription, RESYNC)
+
+
+broker = EventBroker()
+
+
+def publish(event_type, course_id, **fields):
+    """Queues an event for `course_id`'s dashboards; it goes out when db.session commits."""
+    course_event = {"type": event_type, "course_id": str(course_id), **fields,
+                    "at": datetime.datetime.utcnow().isoformat()}
+    db.session.info.setdefault(_PENDING, []).append(course_event)
+
+
+def _token_serializer():
+    return URLSafeTimedSerializer(current_app.config['JWT_SECRET_KEY'], salt='course-events')
+
+
+def stream_token(course_id, user_id):
+    """A short-lived token that only opens `course_id`'s event stream (EventSource can't send headers)."""
+    return _token_serializer().dumps({"course_id": str(course_id), "user_id": user_id})
+
+
+def check_stream_token(token, course_id):
+    """True if `token` is an unexpired stream token for this course."""
+    try:
+        claims = _token_serializer().loads(token, max_age=current_app.config['EVENTS_TOKEN_SECONDS'])
+    except BadSignature:
+        return False
+    return claims.get("course_id") == str(course_id)
+
+
+def event_stream(subscription, heartbeat_seconds):
+    """
+    SSE body for one dashboard: events as they arrive, comments as heartbeats. The caller
+    subscribes first and unsubscribes when the response closes (even if it never started).
+    """
+    yield f"retry: {RETRY_MS}\n\n"
+    while True:
+        try:
+            course_event = subscription.get(timeout=heartbeat_seconds)
+        except queue.Empty:
+            # Keeps proxies from closing an idle connection and lets us notice the client left
+            yield ": keep-alive\n\n"
+            continue
+        yield f"event: {course_event['type']}\ndata: {json.dumps(course_event)}\n\n"
+
+
+# Registered on the session class, like the write tracking in db_routing.py
+@event.listens_for(RoutingSession, 'before_commit')
+def _send_pending(session):
+    pending = session.info.get(_PENDING)
+    if pending:
+        broker.backend.send(session, pending)
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _deliver_pending(session):
+    pending = session.info.pop(_PENDING, None)
+    if pending:
+        for course_event in pending:
+            EVENTS_PUBLISHED.inc(course_event["type"])
+        broker.backend.deliver(pending)
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _discard_pending(session):
+    session.info.pop(_PENDING, None)
@@ -0,0 +1,11 @@
+from flask_bcrypt import Bcrypt
+from flask_cors import CORS
+from flask_jwt_extended import JWTManager
+from flask_migrate import Migrate
+
+# Extensions are created unbound here and attached to the app in create_app(),
+# so any module can import them without importing the app itself.
+bcrypt = Bcrypt()
+jwt = JWTManager()
+cors = CORS()
+migrate = Migrate()
@@ -0,0 +1,332 @@
+import re
+import json
+import hashlib
+import logging
+import functools
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from sqlalchemy import select, text, func, and_, case, cast, literal, tuple_, Float, Numeric
+from sqlalchemy.dialects.postgresql import JSONB
+from models import db, LearningContent, AssessmentAttempt
+import leaderboards
+
+# Quiz grading
+# quiz_data = {"questions": [...]}; every question has an "id" (numbers are read as their
+# string form, like JSON answer keys) and optionally a "type" and a "weight" (default 1):
+#   single_choice   "options": [...], "correct_answer_index": 1   (the default type)
+#   multi_select    "options": [...], "correct_answer_indexes": [0, 2], "partial_credit": true
+#                   (partial credit: (right picks - wrong picks) / correct options, at least 0)
+#   numeric         "answer": 9.81, "tolerance": 0.05
+# The score is the weighted share of credit, in percent to the cent. compile_quiz() returns
+# a cached Grader whose version hashes the answer key; regrade_quiz() re-scores stored
+# attempts graded under another version in batches, with numpy (imported only there).
+# Attempts in archived months aren't re-graded; their rollups keep the old scores.
+logger = logging.getLogger('grading')
+
+QUESTION_TYPES = ('single_choice', 'multi_select', 'numeric')
+ENGINE_VERSION = 1  # bump when the scoring rules themselves change
+REGRADE_BATCH = 20000
+_NUMBER = re.compile(r'-?[0-9]+(\.[0-9]+)?([eE][-+]?[0-9]{1,3})?')
+_NUMBER_MAX_CHARS = 1000  # so the SQL side can always read it as numeric
+# Outside these, float8 refuses a value where Python gives inf (never within tolerance) or about 0
+_FLOAT_MAX, _FLOAT_MIN = 1e308, 1e-307
+_TOLERANCE_SLACK = 1e-9  # so 0.1 + 0.2 is within 0.3 +/- 0
+
+Question = namedtuple('Question', 'id type weight key options tolerance partial_credit')
+
+
+class QuizFormatError(ValueError):
+    """Raised when quiz_data can't be compiled. Carries every problem found."""
+
+    def __init__(self, errors):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_index(value, options):
+    return isinstance(value, int) and not isinstance(value, bool) and 0 <= value < options
+
+
+def _as_number(value):
+    if _is_number(value):
+        try:
+            return float(value)
+        except OverflowError:  # an integer past float range
+            return None
+    if isinstance(value, str) and len(value) <= _NUMBER_MAX_CHARS and _NUMBER.fullmatch(value):
+        return float(value)
+    return None
+
+
+def _picked(value, index):
+    return any((_is_number(v) and v == index) or v == str(index) for v in value)
+
+
+def _percent(points, total):
+    # The same float operations as the numpy path, so both round identically
+    return round(points / total * 100 * 100) / 100
+
+
+class Grader:
+    def __init__(self, questions, version):
+        self.questions = questions
+        self.version = version
+        self.total_weight = sum(q.weight for q in questions)
+
+    # --- One submission ---
+
+    def credit(self, question, answer):
+        if question.type == 'multi_select':
+            if not isinstance(answer, list):
+                return 0.0
+            picked = [i for i in range(question.options) if _picked(answer, i)]
+            right = sum(1 for i in picked if i in question.key)
+            wrong = len(picked) - right
+            if question.partial_credit:
+                return max(right - wrong, 0) / len(question.key)
+            return 1.0 if right == len(question.key) and wrong == 0 else 0.0
+        value = _as_number(answer)
+        return 1.0 if value is not None and abs(value - question.key) <= question.tolerance else 0.0
+
+    def grade(self, answers):
+        """Returns (score in percent, {question id: credit between 0 and 1})."""
+        if not isinstance(answers, dict):
+            answers = {}
+        credits, points = {}, 0.0
+        for question in self.questions:
+            credits[question.id] = self.credit(question, answers.get(question.id))
+            points += question.weight * credits[question.id]
+        return _percent(points, self.total_weight), credits
+
+    def answer_key(self):
+        """What the results page shows as correct, per question id."""
+        key = {}
+        for q in self.questions:
+            if q.type == 'single_choice':
+                key[q.id] = int(q.key)
+            elif q.type == 'multi_select':
+                key[q.id] = sorted(q.key)
+            else:
+                key[q.id] = {"answer": q.key, "tolerance": round(q.tolerance - _TOLERANCE_SLACK, 9)}
+        return key
+
+    # --- Many stored submissions ---
+
+    def answer_columns(self, answers):
+        """SQL expressions extracting the answers from the JSON column, in grade_columns() order."""
+        columns = []
+        for q in self.questions:
+            value = answers[q.id]
+            if q.type == 'multi_select':
+                is_list = func.jsonb_typeof(value) == 'array'
+                for i in range(q.options):
+                    picked = value.bool_op('@>')(cast(literal(json.dumps([i])), JSONB)) | \
+                        value.bool_op('@>')(cast(literal(json.dumps([str(i)])), JSONB))
+                    columns.append(func.coalesce(and_(is_list, picked), False))
+            else:
+                # The SQL side of _as_number(): float8 if it looks like a number, else NULL. Read
+                # as numeric first, so an answer past float8 range can't fail the whole batch
+                raw = value.astext
+                number = cast(raw, Numeric)
+                columns.append(case(
+                    (~raw.bool_op('~')(f'^{_NUMBER.pattern}$') | (func.length(raw) > _NUMBER_MAX_CHARS), None),
+                    (func.abs(number) > cast(_FLOAT_MAX, Numeric), None),
+                    (func.abs(number) < cast(_FLOAT_MIN, Numeric), 0.0),
+                    else_=cast(number, Float)
+                ))
+        return columns
+
+    def grade_columns(self, columns):
+        """Scores a batch from the extracted answer columns: a numpy array of percents."""
+        import numpy as np
+
+        columns = iter(columns)
+        points = None
+        for q in self.questions:
+            if q.type == 'multi_select':
+                picked = np.array([next(columns) for _ in range(q.options)], dtype=bool)
+                right = picked[sorted(q.key)].sum(axis=0)
+                wrong = picked.sum(axis=0) - right
+                if q.partial_credit:
+                    credit = np.maximum(right - wrong, 0) / len(q.key)
+                else:
+                    credit = ((right == len(q.key)) & (wrong == 0)).astype(float)
+            else:
+                values = np.array(next(columns), dtype=float)  # None (unanswered) becomes nan, which never matches
+                with np.errstate(invalid='ignore'):
+                    credit = (np.abs(values - q.key) <= q.tolerance).astype(float)
+            points = q.weight * credit if points is None else points + q.weight * credit
+        return np.rint(points / self.total_weight * 100 * 100) / 100
+
+
+def _compile_question(q, where, errors):
+    if not isinstance(q, dict):
+        errors.append(f"{where} must be an object.")
+        return None
+    question_type = q.get('type', 'single_choice')
+    if question_type not in QUESTION_TYPES:
+        errors.append(f"{where}.type must be one of: {', '.join(QUESTION_TYPES)}.")
+        return None
+    weight = q.get('weight', 1)
+    if not _is_number(weight) or weight <= 0:
+        errors.append(f"{where}.weight must be a positive number.")
+
+    options = q.get('options')
+    if question_type != 'numeric' and (not isinstance(options, list) or len(options) < 2):
+        errors.append(f"{where}.options must be a list of at least two options.")
+        return None
+
+    key, tolerance, partial_credit = None, _TOLERANCE_SLACK, False
+    if question_type == 'single_choice':
+        key = q.get('correct_answer_index')
+        if not _is_index(key, len(options)):
+            errors.append(f"{where}.correct_answer_index must be the index of one of the options.")
+        key = float(key) if _is_index(key, len(options)) else None
+    elif question_type == 'multi_select':
+        indexes = q.get('correct_answer_indexes')
+        if (not isinstance(indexes, list) or not indexes or len(set(indexes)) != len(indexes)
+                or not all(_is_index(i, len(options)) for i in indexes)):
+            errors.append(f"{where}.correct_answer_indexes must be a non-empty list of distinct option indexes.")
+        else:
+            key = frozenset(indexes)
+        partial_credit = q.get('partial_credit', True)
+        if not isinstance(partial_credit, bool):
+            errors.append(f"{where}.partial_credit must be true or false.")
+    else:
+        key = q.get('answer')
+        if not _is_number(key):
+            errors.append(f"{where}.answer must be a number.")
+        tolerance = q.get('tolerance', 0)
+        if not _is_number(tolerance) or tolerance < 0:
+            errors.append(f"{where}.tolerance must be a number of at least 0.")
+        else:
+            tolerance += _TOLERANCE_SLACK
+        key = float(key) if _is_number(key) else None
+    question_id = q.get('id')
+    question_id = str(question_id) if question_id is not None else ''
+    return Question(question_id, question_type, weight, key, len(options or ()), tolerance, partial_credit)
+
+
+@functools.lru_cache(maxsize=512)
+def _compile(canonical):
+    quiz_data = json.loads(canonical)
+    questions = quiz_data.get('questions') if isinstance(quiz_data, dict) else None
+    if not isinstance(questions, list) or not questions:
+        raise QuizFormatError(["quiz_data.questions must be a non-empty list."])
+    errors, compiled, seen = [], [], set()
+    for index, q in enumerate(questions):
+        where = f"quiz_data.questions[{index}]"
+        question = _compile_question(q, where, errors)
+        if question is None:
+            continue
+        if not question.id:
+            errors.append(f"{where}.id is required.")
+        elif question.id in seen:
+            errors.append(f"{where}.id {question.id!r} is used twice.")
+        seen.add(question.id)
+        compiled.append(question)
+    if errors:
+        raise QuizFormatError(errors)
+
+    fingerprint = json.dumps([ENGINE_VERSION] + [
+        [q.id, q.type, q.weight, sorted(q.key) if q.type == 'multi_select' else q.key, q.options, q.tolerance, q.partial_credit]
+        for q in compiled
+    ])
+    return Grader(tuple(compiled), hashlib.sha256(fingerprint.encode()).hexdigest()[:16])
+
+
+def compile_quiz(quiz_data):
+    """The Grader for quiz_data (cached), or QuizFormatError listing what's wrong with it."""
+    return _compile(json.dumps(quiz_data, sort_keys=True))
+
+
+def validate_quiz_data(quiz_data):
+    """The problems with quiz_data as a list of messages; empty if it compiles."""
+    try:
+        compile_quiz(quiz_data)
+    except QuizFormatError as e:
+        return e.errors
+    return []
+
+
+def public_questions(quiz_data):
+    """The questions as shown to students: no answer key."""
+    return [{
+        "id": str(q["id"]) if q.get("id") is not None else None,
+        "text": q.get("text"),
+        "type": q.get("type", 'single_choice'),
+        "options": q.get("options"),
+        "weight": q.get("weight", 1)
+    } for q in quiz_data.get('questions', [])]
+
+
+def regrade_quiz(content_id, quiz_data, batch_size=REGRADE_BATCH):
+    """
+    Re-scores every online attempt at a quiz not graded with the current key, one committed
+    batch at a time, so it can be interrupted and re-run. Returns (attempts re-graded,
+    scores that changed, grader version). The last batch is left for the caller to commit
+    with the leaderboard rebuild: if that fails, a re-run still finds attempts to re-grade.
+    """
+    import numpy as np
+
+    grader = compile_quiz(quiz_data)
+    columns = grader.answer_columns(AssessmentAttempt.answers)
+    position = (AssessmentAttempt.submitted_at, AssessmentAttempt.id)
+    regraded = changed = 0
+    after = None
+    while True:
+        # Keyset pages: each pass starts after the last attempt seen, so even an attempt the
+        # UPDATE misses (say, archived meanwhile) can't be selected again
+        query = (select(AssessmentAttempt.id, AssessmentAttempt.submitted_at, AssessmentAttempt.score, *columns)
+                 .where(AssessmentAttempt.content_id == content_id,
+                        AssessmentAttempt.grading_version.is_distinct_from(grader.version))
+                 .order_by(*position).limit(batch_size))
+        if after is not None:
+            query = query.where(tuple_(*position) > tuple_(*after))
+        rows = db.session.execute(query).all()
+        if not rows:
+            return regraded, changed, grader.version
+        if regraded:
+            db.session.commit()  # the previous batch
+        ids, submitted, old_scores, *answer_columns = zip(*rows)
+        scores = grader.grade_columns(answer_columns)
+        changed += int(np.count_nonzero(np.abs(np.array(old_scores, dtype=float) - scores) >= 0.005))
+
+        db.session.execute(text(
+            "UPDATE assessment_attempts a SET score = v.score, grading_version = :version "
+            "FROM unnest(CAST(:ids AS uuid[]), CAST(:submitted AS timestamptz[]), CAST(:scores AS numeric[])) "
+            "AS v(id, submitted_at, score) "
+            "WHERE a.id = v.id AND a.submitted_at = v.submitted_at"
+        ), {"version": grader.version, "ids": [str(i) for i in ids], "submitted": list(submitted),
+            "scores": scores.tolist()})
+        regraded += len(rows)
+        after = (submitted[-1], ids[-1])
+
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='quiz-regrade')
+
+
+def _regrade_in_background(app, content_id):
+    with app.app_context():
+        try:
+            quiz_data = db.session.scalar(select(LearningContent.quiz_data).where(LearningContent.id == content_id))
+            regraded, changed, version = regrade_quiz(content_id, quiz_data)
+            leaderboards.rebuild([content_id])
+            db.session.commit()
+            logger.info("Re-graded quiz %s to version %s: %d attempts, %d scores changed",
+                        content_id, version, regraded, changed)
+        except Exception:
+            db.session.rollback()
+            logger.exception("Re-grading quiz %s failed; run regrade_quizzes.py --quiz %s to finish it", content_id, content_id)
+        finally:
+            db.session.remove()
+
+
+def schedule_regrade(content_id):
+    """Re-grades a quiz (and rebuilds its leaderboards) on a background thread, like course deletion."""
+    _executor.submit(_regrade_in_background, current_app._get_current_object(), content_id)
@@ -0,0 +1,31 @@
+import argparse
+import time
+from app import create_app
+from extensions import bcrypt
+from bulk_import import UserImporter, iter_csv_rows, DEFAULT_CHUNK_SIZE
+
+def import_users(csv_path, chunk_size, workers):
+    with create_app().app_context():
+        importer = UserImporter(bcrypt, chunk_size=chunk_size, workers=workers)
+        started = time.perf_counter()
+        try:
+            with open(csv_path, newline='', encoding='utf-8-sig') as f:
+                summary = importer.run(iter_csv_rows(f))
+        except ValueError as e:
+            print(f"Error: {e}")
+            summary = importer.summary()
+        elapsed = time.perf_counter() - started
+
+        for issue in summary['issues']:
+            print(f"Row {issue['row']}: {issue['status']} - {issue['message']}")
+
+        print(f"\n✅ Created {summary['created']} users in {elapsed:.1f}s "
+              f"({summary['duplicates']} duplicates, {summary['errors']} errors).")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Bulk import users from a CSV file.")
+    parser.add_argument('csv_path', help="CSV with columns username,email,password,first_name,last_name[,role][,title]")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per transaction")
+    parser.add_argument('--workers', type=int, default=None, help="Password hashing threads (default: CPU count)")
+    args = parser.parse_args()
+    import_users(args.csv_path, args.chunk_size, args.workers)
@@ -0,0 +1,149 @@
+import re
+import time
+import logging
+from contextlib import contextmanager
+from flask import current_app, g, request, has_request_context
+from sqlalchemy import event
+from metrics import registry
+
+# Per-request SQL instrumentation
+# Counts queries and DB time per request, flags statements repeated past a threshold
+# (usually an N+1 lazy load) and logs slow requests with their top queries. Totals are
+# exported on /metrics (see routes/metrics.py).
+#
+# Config:
+#   INSTRUMENTATION_ENABLED   on by default; set to false to skip all hooks
+#   SLOW_REQUEST_MS           requests slower than this are logged (default 500)
+#   N_PLUS_ONE_THRESHOLD      same statement this many times in one request is flagged (default 10)
+#   METRICS_DIR               directory shared by the workers, to report totals for all of them (see metrics.py)
+logger = logging.getLogger('instrumentation')
+
+REQUEST_DURATION = registry.histogram(
+    'http_request_duration_seconds', 'Request latency by route.', labels=('method', 'route', 'status'))
+REQUEST_QUERIES = registry.histogram(
+    'db_queries_per_request', 'SQL statements issued per request.', labels=('route',),
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000))
+REQUEST_DB_TIME = registry.histogram(
+    'db_time_per_request_seconds', 'Time spent in SQL per request.', labels=('route',))
+SUSPECTED_N_PLUS_ONE = registry.counter(
+    'db_suspected_n_plus_one_total', 'Requests where one statement shape repeated past the threshold.', labels=('route',))
+AI_CALL_DURATION = registry.histogram(
+    'ai_call_duration_seconds', 'Latency of calls to the AI provider.', labels=('operation', 'outcome'),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0))
+
+# Expanded IN lists differ in length between calls; collapse them so they share a shape
+_IN_LIST = re.compile(r'IN \((?:%\(\w+\)s(?:, )?)+\)')
+
+
+def statement_shape(statement):
+    return _IN_LIST.sub('IN (...)', statement)
+
+
+class RequestStats:
+    __slots__ = ('started', 'query_count', 'db_time', 'shapes')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.db_time = 0.0
+        self.shapes = {}  # raw statement -> [count, total seconds]
+
+    def record(self, statement, elapsed):
+        self.query_count += 1
+        self.db_time += elapsed
+        entry = self.shapes.get(statement)
+        if entry is None:
+            self.shapes[statement] = [1, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+
+    def by_shape(self):
+        """Merges raw statements into shapes. Done once per request, not per query."""
+        merged = {}
+        for statement, (count, elapsed) in self.shapes.items():
+            entry = merged.setdefault(statement_shape(statement), [0, 0.0])
+            entry[0] += count
+            entry[1] += elapsed
+        return merged
+
+
+# The start time lives on the execution context, so a statement that fails (and never
+# reaches after_cursor_execute) leaves nothing behind on the connection
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_query_started', None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    if has_request_context():
+        stats = g.get('_sql_stats')
+        if stats is not None:
+            stats.record(statement, elapsed)
+
+
+def _start_request():
+    g._sql_stats = RequestStats()
+    directory = current_app.config.get('METRICS_DIR')
+    if directory:
+        registry.share(directory)
+
+
+def _finish_request(response):
+    stats = g.pop('_sql_stats', None)
+    if stats is None:
+        return response
+    duration = time.perf_counter() - stats.started
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+
+    REQUEST_DURATION.observe(duration, request.method, route, response.status_code)
+    REQUEST_QUERIES.observe(stats.query_count, route)
+    REQUEST_DB_TIME.observe(stats.db_time, route)
+
+    threshold = current_app.config['N_PLUS_ONE_THRESHOLD']
+    shapes = None
+    if stats.query_count >= threshold:
+        shapes = stats.by_shape()
+        repeated = [(shape, count) for shape, (count, _) in shapes.items() if count >= threshold]
+        if repeated:
+            SUSPECTED_N_PLUS_ONE.inc(route)
+            for shape, count in repeated:
+                logger.warning("Suspected N+1 on %s %s: %d x %s", request.method, route, count, ' '.join(shape.split()))
+
+    if duration * 1000 >= current_app.config['SLOW_REQUEST_MS']:
+        shapes = shapes or stats.by_shape()
+        top = sorted(shapes.items(), key=lambda item: item[1][1], reverse=True)[:5]
+        breakdown = '\n'.join(f"    {count:4d} x {elapsed * 1000:8.1f} ms  {' '.join(shape.split())[:200]}"
+                              for shape, (count, elapsed) in top)
+        logger.warning("Slow request %s %s: %.0f ms total, %d queries, %.0f ms in DB\n%s",
+                       request.method, route, duration * 1000, stats.query_count, stats.db_time * 1000, breakdown)
+    return response
+
+
+@contextmanager
+def timed_ai_call(operation):
+    """Times a call to the AI provider and records whether it succeeded."""
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'ok'
+    finally:
+        AI_CALL_DURATION.observe(time.perf_counter() - started, operation, outcome)
+
+
+def init_instrumentation(app, db):
+    if not app.config['INSTRUMENTATION_ENABLED']:
+        return
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
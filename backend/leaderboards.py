@@ -0,0 +1,249 @@
+import math
+import datetime
+from decimal import Decimal
+from collections import namedtuple
+from sqlalchemy import select, update, delete, func, literal, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from models import (db, Student, Module, LearningContent, AssessmentAttempt, AssessmentAttemptRollup,
+                    QuizBestScore, CourseScoreTotal, QuizScoreHistogram, CourseScoreHistogram)
+
+# Quiz and course leaderboards
+# Updated on every submission: best score per student and quiz, their sum per course,
+# and a histogram of students per whole-point bucket of each. Top-N reads an index;
+# rank() sums the histogram and only counts exact scores inside the score's own bucket.
+# rebuild() (rebuild_leaderboards.py) recomputes everything from attempts and rollups.
+# Deleting quizzes or students goes through rebuild_courses() and remove_student().
+Board = namedtuple('Board', 'scores board_id score histogram histogram_board_id')
+QUIZ = Board(QuizBestScore, QuizBestScore.content_id, QuizBestScore.best_score,
+             QuizScoreHistogram, QuizScoreHistogram.content_id)
+COURSE = Board(CourseScoreTotal, CourseScoreTotal.course_id, CourseScoreTotal.total_score,
+               CourseScoreHistogram, CourseScoreHistogram.course_id)
+MAX_TOP = 100
+
+
+def _bucket(score):
+    return math.floor(score)
+
+
+def _lock_or_create(board, board_id, student_id, values):
+    """Returns (locked row, False), or (None, True) if a new row was inserted from `values`."""
+    key = {board.board_id.key: board_id, 'student_id': student_id}
+    row = board.scores.query.filter_by(**key).with_for_update().first()
+    if row:
+        return row, False
+    inserted = db.session.execute(pg_insert(board.scores).values(**key, **values).on_conflict_do_nothing())
+    if inserted.rowcount:
+        return None, True
+    # A concurrent submission by the same student created it first
+    return board.scores.query.filter_by(**key).with_for_update().first(), False
+
+
+def _move_in_histogram(board, board_id, old_score, new_score):
+    if old_score is not None and _bucket(old_score) == _bucket(new_score):
+        return
+    histogram = board.histogram
+    if old_score is not None:
+        db.session.execute(
+            update(histogram)
+            .where(board.histogram_board_id == board_id, histogram.bucket == _bucket(old_score))
+            .values(students=histogram.students - 1)
+        )
+    statement = pg_insert(histogram).values({board.histogram_board_id.key: board_id, 'bucket': _bucket(new_score), 'students': 1})
+    db.session.execute(statement.on_conflict_do_update(
+        index_elements=[board.histogram_board_id.key, 'bucket'],
+        set_={'students': histogram.students + 1}
+    ))
+
+
+def record_quiz_score(student_id, content_id, course_id, score):
+    """Folds one graded attempt into the quiz and course leaderboards. The caller commits."""
+    score = Decimal(str(score))
+    now = datetime.datetime.utcnow()
+
+    best, created = _lock_or_create(QUIZ, content_id, student_id,
+                                    {'best_score': score, 'attempt_count': 1, 'updated_at': now})
+    old_best = None
+    if not created:
+        best.attempt_count += 1
+        if score <= best.best_score:
+            return
+        old_best = best.best_score
+        best.best_score = score
+        best.updated_at = now
+    _move_in_histogram(QUIZ, content_id, old_best, score)
+
+    gained = score - (old_best or 0)
+    total, created = _lock_or_create(COURSE, course_id, student_id,
+                                     {'total_score': gained, 'quizzes_taken': 1, 'updated_at': now})
+    if created:
+        _move_in_histogram(COURSE, course_id, None, gained)
+        return
+    old_total = total.total_score
+    total.total_score = old_total + gained
+    total.quizzes_taken += 1 if old_best is None else 0
+    total.updated_at = now
+    _move_in_histogram(COURSE, course_id, old_total, total.total_score)
+
+
+def rank(board, board_id, score):
+    """Where `score` falls on a board: rank (1 = best), percentile and 'top N%'."""
+    score = Decimal(str(score))
+    bucket = _bucket(score)
+    histogram = board.histogram
+    above, below, total = db.session.execute(
+        select(
+            func.coalesce(func.sum(histogram.students).filter(histogram.bucket > bucket), 0),
+            func.coalesce(func.sum(histogram.students).filter(histogram.bucket < bucket), 0),
+            func.coalesce(func.sum(histogram.students), 0),
+        ).where(board.histogram_board_id == board_id)
+    ).one()
+
+    # Inside the score's own bucket, count exact values with two index range scans
+    in_bucket = select(func.count()).select_from(board.scores).where(board.board_id == board_id)
+    above_in_bucket, below_in_bucket = db.session.execute(select(
+        in_bucket.where(board.score > score, board.score < bucket + 1).scalar_subquery(),
+        in_bucket.where(board.score >= bucket, board.score < score).scalar_subquery(),
+    )).one()
+    return standing(score, above + above_in_bucket, below + below_in_bucket, total)
+
+
+def standing(score, above, below, total):
+    """Rank (1 = best), percentile and 'top N%' of `score` given how many students are above and below it."""
+    if not total:
+        return {"score": float(score), "rank": 1, "out_of": 0, "percentile": None, "top_percent": None}
+    ties = max(total - above - below, 0)
+    return {
+        "score": float(score),
+        "rank": above + 1,
+        "out_of": total,
+        # Share of students below this score, counting ties as half
+        "percentile": round((below + ties / 2) / total * 100, 1),
+        "top_percent": min(100, max(1, math.ceil((above + 1) / total * 100)))
+    }
+
+
+def size(board, board_id):
+    return db.session.scalar(
+        select(func.coalesce(func.sum(board.histogram.students), 0)).where(board.histogram_board_id == board_id)
+    )
+
+
+def student_score(board, board_id, student_id):
+    return db.session.scalar(select(board.score).where(board.board_id == board_id, board.scores.student_id == student_id))
+
+
+def top(board, board_id, limit):
+    """The best `limit` students, tied scores sharing a rank (earlier achievers listed first)."""
+    rows = db.session.execute(
+        select(board.scores, Student.first_name, Student.last_name)
+        .join(Student, Student.id == board.scores.student_id)
+        .where(board.board_id == board_id)
+        .order_by(board.score.desc(), board.scores.updated_at)
+        .limit(min(limit, MAX_TOP))
+    ).all()
+    entries = []
+    for position, (row, first_name, last_name) in enumerate(rows, start=1):
+        score = getattr(row, board.score.key)
+        tied = entries and entries[-1]["score"] == float(score)
+        entries.append({
+            "rank": entries[-1]["rank"] if tied else position,
+            "student_id": str(row.student_id),
+            "student_name": f"{first_name} {last_name}",
+            "score": float(score)
+        })
+    return entries
+
+
+def _scoped(statement, column, ids):
+    return statement if ids is None else statement.where(column.in_(ids))
+
+
+def _upsert_from_select(model, keys, columns, query):
+    # A submission recorded between the DELETE and the INSERT has created its row already
+    statement = pg_insert(model).from_select(keys + columns, query)
+    return statement.on_conflict_do_update(index_elements=keys, set_={c: statement.excluded[c] for c in columns})
+
+
+def _rebuild_histogram(board, ids):
+    db.session.execute(_upsert_from_select(
+        board.histogram, [board.histogram_board_id.key, 'bucket'], ['students'],
+        _scoped(select(board.board_id, func.floor(board.score), func.count()), board.board_id, ids)
+        .group_by(board.board_id, func.floor(board.score))
+    ))
+
+
+def rebuild(quiz_ids=None):
+    """
+    Recomputes the leaderboards from attempts and archived rollups: all of them, or just
+    `quiz_ids` and the courses they belong to. Set-based, a handful of statements; safe to
+    run while students submit. The caller commits.
+    """
+    if quiz_ids is not None:
+        quiz_ids = list(quiz_ids)
+        course_ids = db.session.scalars(
+            select(Module.course_id).join(LearningContent).where(LearningContent.id.in_(quiz_ids)).distinct()
+        ).all()
+    else:
+        course_ids = None
+
+    db.session.execute(_scoped(delete(QuizScoreHistogram), QuizScoreHistogram.content_id, quiz_ids))
+    db.session.execute(_scoped(delete(QuizBestScore), QuizBestScore.content_id, quiz_ids))
+
+    history = union_all(
+        _scoped(select(AssessmentAttempt.content_id, AssessmentAttempt.student_id, AssessmentAttempt.score.label('score'),
+                       literal(1).label('attempts'), AssessmentAttempt.submitted_at.label('at')),
+                AssessmentAttempt.content_id, quiz_ids),
+        _scoped(select(AssessmentAttemptRollup.content_id, AssessmentAttemptRollup.student_id, AssessmentAttemptRollup.best_score,
+                       AssessmentAttemptRollup.attempt_count, AssessmentAttemptRollup.last_submitted_at),
+                AssessmentAttemptRollup.content_id, quiz_ids),
+    ).subquery()
+    with_best = select(
+        history,
+        func.max(history.c.score).over(partition_by=[history.c.content_id, history.c.student_id]).label('best')
+    ).subquery()
+    db.session.execute(_upsert_from_select(
+        QuizBestScore, ['content_id', 'student_id'], ['best_score', 'attempt_count', 'updated_at'],
+        select(with_best.c.content_id, with_best.c.student_id, func.max(with_best.c.score), func.sum(with_best.c.attempts),
+               # When the best score was first reached (the tie-breaker); rollups only know their last attempt
+               func.min(with_best.c.at).filter(with_best.c.score == with_best.c.best))
+        .group_by(with_best.c.content_id, with_best.c.student_id)
+    ))
+    _rebuild_histogram(QUIZ, quiz_ids)
+    rebuild_courses(course_ids)
+
+
+def rebuild_courses(course_ids=None):
+    """
+    Recomputes course totals from the quiz best scores: all of them, or just `course_ids`.
+    On its own, for when quizzes leave a course (their quiz boards go with them). The
+    caller commits.
+    """
+    if course_ids is not None:
+        course_ids = list(course_ids)
+    db.session.execute(_scoped(delete(CourseScoreHistogram), CourseScoreHistogram.course_id, course_ids))
+    db.session.execute(_scoped(delete(CourseScoreTotal), CourseScoreTotal.course_id, course_ids))
+    db.session.execute(_upsert_from_select(
+        CourseScoreTotal, ['course_id', 'student_id'], ['total_score', 'quizzes_taken', 'updated_at'],
+        _scoped(
+            select(Module.course_id, QuizBestScore.student_id, func.sum(QuizBestScore.best_score), func.count(),
+                   func.max(QuizBestScore.updated_at))
+            .join(LearningContent, QuizBestScore.content_id == LearningContent.id)
+            .join(Module, LearningContent.module_id == Module.id),
+            Module.course_id, course_ids
+        ).group_by(Module.course_id, QuizBestScore.student_id)
+    ))
+    _rebuild_histogram(COURSE, course_ids)
+
+
+def remove_student(student_id):
+    """Takes a student off every board before the student is deleted. The caller commits."""
+    for board in (QUIZ, COURSE):
+        removed = db.session.execute(
+            delete(board.scores).where(board.scores.student_id == student_id).returning(board.board_id, board.score)
+        ).all()
+        for board_id, score in removed:
+            db.session.execute(
+                update(board.histogram)
+                .where(board.histogram_board_id == board_id, board.histogram.bucket == _bucket(score))
+                .values(students=board.histogram.students - 1)
+            )
@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+
+# Minimal in-process metrics with Prometheus text exposition.
+# Values are kept per worker process. With several gunicorn workers a scrape lands on
+# one of them, so set METRICS_DIR to a directory the workers share (local, empty at
+# server start): each worker writes its values there every second and /metrics sums
+# them. Files of workers that exited stay, so their counts aren't lost.
+logger = logging.getLogger('metrics')
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + (extra or [])
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name, self.help_text, self.labels = name, help_text, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
+
+    @staticmethod
+    def combine(total, value):
+        return value if total is None else total + value
+
+    def render(self, values):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help_text, self.labels = name, help_text, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {k: list(v) for k, v in self._series.items()}
+
+    @staticmethod
+    def combine(total, series):
+        return list(series) if total is None else [a + b for a, b in zip(total, series)]
+
+    def render(self, values):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, series in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels(self.labels, label_values, [('le', bound)])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, label_values, [('le', '+Inf')])
+            lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {series[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._shared_pid = None
+        self._share_lock = threading.Lock()
+
+    def counter(self, *args, **kwargs):
+        metric = Counter(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, *args, **kwargs):
+        metric = Histogram(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def snapshot(self):
+        return {metric.name: metric.snapshot() for metric in self._metrics}
+
+    def share(self, directory, interval=1.0):
+        """Starts writing this process's values to `directory` every `interval` seconds. Once per process."""
+        if self._shared_pid == os.getpid():
+            return
+        with self._share_lock:
+            if self._shared_pid == os.getpid():
+                return
+            # A forked worker inherits the parent's pid here but not its thread
+            self._shared_pid = os.getpid()
+        os.makedirs(directory, exist_ok=True)
+
+        def write_periodically():
+            while True:
+                time.sleep(interval)
+                try:
+                    self._write_snapshot(directory)
+                except OSError:
+                    logger.exception("Could not write metrics to %s", directory)
+
+        threading.Thread(target=write_periodically, name='metrics-share', daemon=True).start()
+
+    def _write_snapshot(self, directory):
+        path = os.path.join(directory, f'{os.getpid()}.json')
+        data = {name: [[list(labels), value] for labels, value in values.items()] for name, values in self.snapshot().items()}
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump(data, f)
+        os.replace(f'{path}.tmp', path)
+
+    def _shared_snapshots(self, directory):
+        own = f'{os.getpid()}.json'
+        snapshots = []
+        for name in os.listdir(directory):
+            if not name.endswith('.json') or name == own:
+                continue
+            try:
+                with open(os.path.join(directory, name)) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            snapshots.append({metric: {tuple(labels): value for labels, value in series} for metric, series in data.items()})
+        return snapshots
+
+    def render(self, directory=None):
+        """This process's metrics, summed with every other worker's when `directory` is shared."""
+        # Our own file may be a second old; use the live values instead
+        snapshots = [self.snapshot()] + (self._shared_snapshots(directory) if directory and os.path.isdir(directory) else [])
+        lines = []
+        for metric in self._metrics:
+            merged = {}
+            for snapshot in snapshots:
+                for label_values, value in snapshot.get(metric.name, {}).items():
+                    merged[label_values] = metric.combine(merged.get(label_values), value)
+            lines.extend(metric.render(merged))
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
@@ -0,0 +1,131 @@
+"""partition assessment_attempts by month of submitted_at
+
+Rebuilds assessment_attempts as a table range partitioned by submitted_at, with
+one partition per month from the oldest attempt up to three months ahead plus a
+DEFAULT partition, and copies the existing rows over. The primary key becomes
+(id, submitted_at) because a partitioned table's unique keys must include the
+partition column. Copying locks the table and takes a while on large databases,
+so run it in a maintenance window.
+
+Also adds assessment_attempt_rollups and the archive schema used by
+partition_maintenance.py when cold months are archived.
+
+Downgrading copies the attached partitions back into a plain table; months that
+were already archived stay in the archive schema.
+
+Revision ID: 2af4d09aa6d0
+Revises: d669e83396e5
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+import datetime
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '2af4d09aa6d0'
+down_revision = 'd669e83396e5'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = 'id, content_id, student_id, score, attempt_number, max_score, answers, submitted_at'
+MONTHS_AHEAD = 3
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def _attempt_columns():
+    return [
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('content_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('learning_content.id'), nullable=False),
+        sa.Column('student_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('students.id'), nullable=False),
+        sa.Column('score', postgresql.NUMERIC(5, 2), nullable=False),
+        sa.Column('attempt_number', sa.Integer(), nullable=False),
+        sa.Column('max_score', postgresql.NUMERIC(5, 2), nullable=False),
+        sa.Column('answers', postgresql.JSONB(), nullable=False),
+    ]
+
+
+def _create_indexes():
+    op.create_index('ix_assessment_attempts_student_id_content_id', 'assessment_attempts', ['student_id', 'content_id'])
+    op.create_index('ix_assessment_attempts_content_id', 'assessment_attempts', ['content_id'])
+
+
+def upgrade():
+    op.rename_table('assessment_attempts', 'assessment_attempts_unpartitioned')
+    op.execute("ALTER TABLE assessment_attempts_unpartitioned "
+               "RENAME CONSTRAINT assessment_attempts_pkey TO assessment_attempts_unpartitioned_pkey")
+    op.drop_index('ix_assessment_attempts_student_id_content_id', table_name='assessment_attempts_unpartitioned', if_exists=True)
+    op.drop_index('ix_assessment_attempts_content_id', table_name='assessment_attempts_unpartitioned', if_exists=True)
+
+    op.create_table(
+        'assessment_attempts',
+        *_attempt_columns(),
+        sa.Column('submitted_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id', 'submitted_at', name='assessment_attempts_pkey'),
+        postgresql_partition_by='RANGE (submitted_at)',
+    )
+    op.execute("CREATE TABLE assessment_attempts_default PARTITION OF assessment_attempts DEFAULT")
+
+    bind = op.get_bind()
+    oldest = bind.exec_driver_sql("SELECT min(submitted_at) FROM assessment_attempts_unpartitioned").scalar()
+    today = datetime.datetime.utcnow()
+    month = datetime.date((oldest or today).year, (oldest or today).month, 1)
+    last = _add_months(datetime.date(today.year, today.month, 1), MONTHS_AHEAD)
+    while month <= last:
+        end = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE assessment_attempts_y{month.year}m{month.month:02d} PARTITION OF assessment_attempts "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{end.isoformat()} 00:00:00+00')"
+        )
+        month = end
+
+    # Rows without a timestamp predate the default; file them under the migration date
+    op.execute(
+        f"INSERT INTO assessment_attempts ({COLUMNS}) "
+        f"SELECT {COLUMNS.replace('submitted_at', 'coalesce(submitted_at, now())')} FROM assessment_attempts_unpartitioned"
+    )
+    _create_indexes()
+    op.drop_table('assessment_attempts_unpartitioned')
+
+    op.create_table(
+        'assessment_attempt_rollups',
+        sa.Column('student_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('students.id'), primary_key=True),
+        sa.Column('content_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('learning_content.id'), primary_key=True),
+        sa.Column('month', sa.Date(), primary_key=True),
+        sa.Column('attempt_count', sa.Integer(), nullable=False),
+        sa.Column('score_sum', sa.Numeric(), nullable=False),
+        sa.Column('best_score', postgresql.NUMERIC(5, 2), nullable=False),
+        sa.Column('last_attempt_number', sa.Integer(), nullable=False),
+        sa.Column('last_submitted_at', sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index('ix_assessment_attempt_rollups_content_id_month', 'assessment_attempt_rollups', ['content_id', 'month'])
+    op.execute("CREATE SCHEMA IF NOT EXISTS archive")
+
+
+def downgrade():
+    op.drop_index('ix_assessment_attempt_rollups_content_id_month', table_name='assessment_attempt_rollups')
+    op.drop_table('assessment_attempt_rollups')
+
+    op.rename_table('assessment_attempts', 'assessment_attempts_partitioned')
+    op.execute("ALTER TABLE assessment_attempts_partitioned "
+               "RENAME CONSTRAINT assessment_attempts_pkey TO assessment_attempts_partitioned_pkey")
+    op.drop_index('ix_assessment_attempts_student_id_content_id', table_name='assessment_attempts_partitioned')
+    op.drop_index('ix_assessment_attempts_content_id', table_name='assessment_attempts_partitioned')
+
+    op.create_table(
+        'assessment_attempts',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        *_attempt_columns()[1:],
+        sa.Column('submitted_at', sa.DateTime(timezone=True)),
+    )
+    op.execute(f"INSERT INTO assessment_attempts ({COLUMNS}) SELECT {COLUMNS} FROM assessment_attempts_partitioned")
+    _create_indexes()
+    # Dropping the parent drops every attached partition with it
+    op.drop_table('assessment_attempts_partitioned')
@@ -0,0 +1,46 @@
+"""indexes for hot query paths
+
+Every index is built with CREATE INDEX CONCURRENTLY so it can be applied to a
+live database without blocking writes. CONCURRENTLY cannot run inside a
+transaction, hence the autocommit blocks.
+
+user_roles(user_id) is intentionally not added: the (user_id, role) primary
+key already serves lookups by user_id.
+
+Revision ID: 3e2bea18eb81
+Revises: 578ad0a03ade
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e2bea18eb81'
+down_revision = '578ad0a03ade'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    # (index name, table, columns)
+    ('ix_student_content_progress_student_content_status', 'student_content_progress', ['student_id', 'content_id', 'status']),
+    ('ix_student_content_progress_content_id_status', 'student_content_progress', ['content_id', 'status']),
+    ('ix_assessment_attempts_student_id_content_id', 'assessment_attempts', ['student_id', 'content_id']),
+    ('ix_assessment_attempts_content_id', 'assessment_attempts', ['content_id']),
+    ('ix_modules_course_id_module_order', 'modules', ['course_id', 'module_order']),
+    ('ix_learning_content_module_id_content_order', 'learning_content', ['module_id', 'content_order']),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
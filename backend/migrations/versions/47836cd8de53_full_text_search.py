@@ -0,0 +1,55 @@
+"""full-text search columns for courses and learning content
+
+Adds generated tsvector columns (Postgres keeps them current on every
+INSERT/UPDATE) and GIN indexes over them. Adding a stored generated column
+rewrites the table, so run this outside peak hours on large databases; the
+indexes themselves are built concurrently.
+
+Revision ID: 47836cd8de53
+Revises: 3e2bea18eb81
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '47836cd8de53'
+down_revision = '3e2bea18eb81'
+branch_labels = None
+depends_on = None
+
+
+COURSE_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+CONTENT_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', replace(coalesce(tags, ''), ',', ' ')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(content_body, '')), 'C')"
+)
+
+
+def upgrade():
+    op.add_column('courses', sa.Column('search_vector', postgresql.TSVECTOR(),
+                                       sa.Computed(COURSE_SEARCH_DOCUMENT, persisted=True)))
+    op.add_column('learning_content', sa.Column('search_vector', postgresql.TSVECTOR(),
+                                                sa.Computed(CONTENT_SEARCH_DOCUMENT, persisted=True)))
+    with op.get_context().autocommit_block():
+        op.create_index('ix_courses_search_vector', 'courses', ['search_vector'],
+                        postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_learning_content_search_vector', 'learning_content', ['search_vector'],
+                        postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_learning_content_search_vector', table_name='learning_content',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_courses_search_vector', table_name='courses',
+                      postgresql_concurrently=True, if_exists=True)
+    op.drop_column('learning_content', 'search_vector')
+    op.drop_column('courses', 'search_vector')
@@ -0,0 +1,134 @@
+"""initial schema
+
+Baseline that matches the tables as they existed before migrations were added.
+Databases created by hand from the original schema should be marked as already
+at this revision with `flask db stamp 578ad0a03ade` instead of upgrading.
+
+Revision ID: 578ad0a03ade
+Revises:
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '578ad0a03ade'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+role_name = postgresql.ENUM('student', 'teacher', 'administrator', name='role_name', create_type=False)
+content_type = postgresql.ENUM('video', 'article', 'quiz', 'exercise', 'assignment', name='content_type', create_type=False)
+progress_status = postgresql.ENUM('not_started', 'in_progress', 'completed', 'skipped', name='progress_status', create_type=False)
+
+
+def upgrade():
+    bind = op.get_bind()
+    role_name.create(bind, checkfirst=True)
+    content_type.create(bind, checkfirst=True)
+    progress_status.create(bind, checkfirst=True)
+
+    op.create_table(
+        'users',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('username', sa.String(80), nullable=False, unique=True),
+        sa.Column('email', sa.String(120), nullable=False, unique=True),
+        sa.Column('password_hash', sa.String(255), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True)),
+        sa.Column('updated_at', sa.DateTime(timezone=True)),
+    )
+    op.create_table(
+        'user_roles',
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id'), primary_key=True),
+        sa.Column('role', role_name, primary_key=True),
+        sa.Column('granted_at', sa.DateTime(timezone=True)),
+    )
+    op.create_table(
+        'students',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False, unique=True),
+        sa.Column('first_name', sa.String(100), nullable=False),
+        sa.Column('last_name', sa.String(100), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True)),
+    )
+    op.create_table(
+        'teachers',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=False, unique=True),
+        sa.Column('first_name', sa.String(100), nullable=False),
+        sa.Column('last_name', sa.String(100), nullable=False),
+        sa.Column('title', sa.String(100)),
+        sa.Column('created_at', sa.DateTime(timezone=True)),
+    )
+    op.create_table(
+        'courses',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('title', sa.String(255), nullable=False),
+        sa.Column('description', sa.Text()),
+        sa.Column('created_by_teacher_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('teachers.id'), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True)),
+    )
+    op.create_table(
+        'modules',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('course_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('courses.id'), nullable=False),
+        sa.Column('title', sa.String(255), nullable=False),
+        sa.Column('description', sa.Text()),
+        sa.Column('module_order', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True)),
+    )
+    op.create_table(
+        'learning_content',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('module_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('modules.id'), nullable=False),
+        sa.Column('type', content_type, nullable=False),
+        sa.Column('title', sa.String(255), nullable=False),
+        sa.Column('content_url', sa.Text()),
+        sa.Column('content_body', sa.Text()),
+        sa.Column('content_order', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True)),
+        sa.Column('quiz_data', postgresql.JSONB(), nullable=True),
+        sa.Column('tags', sa.String(255), nullable=True),
+    )
+    op.create_table(
+        'assessment_attempts',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('content_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('learning_content.id'), nullable=False),
+        sa.Column('student_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('students.id'), nullable=False),
+        sa.Column('score', postgresql.NUMERIC(5, 2), nullable=False),
+        sa.Column('attempt_number', sa.Integer(), nullable=False),
+        sa.Column('max_score', postgresql.NUMERIC(5, 2), nullable=False),
+        sa.Column('answers', postgresql.JSONB(), nullable=False),
+        sa.Column('submitted_at', sa.DateTime(timezone=True)),
+    )
+    op.create_table(
+        'student_content_progress',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('student_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('students.id'), nullable=False),
+        sa.Column('content_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('learning_content.id'), nullable=False),
+        sa.Column('status', progress_status, nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True)),
+        sa.Column('completed_at', sa.DateTime(timezone=True)),
+        sa.Column('last_accessed_at', sa.DateTime(timezone=True)),
+    )
+
+
+def downgrade():
+    op.drop_table('student_content_progress')
+    op.drop_table('assessment_attempts')
+    op.drop_table('learning_content')
+    op.drop_table('modules')
+    op.drop_table('courses')
+    op.drop_table('teachers')
+    op.drop_table('students')
+    op.drop_table('user_roles')
+    op.drop_table('users')
+
+    bind = op.get_bind()
+    progress_status.drop(bind, checkfirst=True)
+    content_type.drop(bind, checkfirst=True)
+    role_name.drop(bind, checkfirst=True)
@@ -0,0 +1,29 @@
+"""assessment_attempts.grading_version
+
+Records which compiled answer key scored each attempt, so grading.regrade_quiz()
+only touches attempts scored under an older key. Existing attempts are left
+NULL and are re-scored the first time their quiz is re-graded. Adding a
+nullable column is a catalog-only change, even on the partitioned table.
+
+Revision ID: 5c2f8e91d3a7
+Revises: b41d7e0c95fa
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c2f8e91d3a7'
+down_revision = 'b41d7e0c95fa'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('assessment_attempts', sa.Column('grading_version', sa.String(length=16), nullable=True))
+
+
+def downgrade():
+    op.drop_column('assessment_attempts', 'grading_version')
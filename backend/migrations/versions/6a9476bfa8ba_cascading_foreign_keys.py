@@ -0,0 +1,88 @@
+"""ON DELETE CASCADE foreign keys and background course deletion
+
+Recreates the foreign keys so the database removes dependent rows itself:
+users -> roles / student and teacher profiles, courses -> modules -> learning
+content -> progress, attempts and rollups, and students -> their progress,
+attempts and rollups. A teacher's courses are kept with created_by_teacher_id
+set to NULL.
+
+Each key is swapped in a single ALTER and added NOT VALID, then validated
+separately so existing rows are checked without blocking writes. Partitioned
+tables (assessment_attempts) don't support NOT VALID, so their keys are
+validated on the spot.
+
+Archived attempt partitions only keep their primary key, so their foreign keys
+are dropped here rather than cascaded.
+
+Also adds courses.deletion_requested_at, which course_deletion.py uses.
+
+Revision ID: 6a9476bfa8ba
+Revises: 9873a37fd0dd
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6a9476bfa8ba'
+down_revision = '9873a37fd0dd'
+branch_labels = None
+depends_on = None
+
+
+FOREIGN_KEYS = [
+    # (table, column, referenced table, ON DELETE action)
+    ('user_roles', 'user_id', 'users', 'CASCADE'),
+    ('students', 'user_id', 'users', 'CASCADE'),
+    ('teachers', 'user_id', 'users', 'CASCADE'),
+    ('courses', 'created_by_teacher_id', 'teachers', 'SET NULL'),
+    ('modules', 'course_id', 'courses', 'CASCADE'),
+    ('learning_content', 'module_id', 'modules', 'CASCADE'),
+    ('student_content_progress', 'student_id', 'students', 'CASCADE'),
+    ('student_content_progress', 'content_id', 'learning_content', 'CASCADE'),
+    ('assessment_attempts', 'student_id', 'students', 'CASCADE'),
+    ('assessment_attempts', 'content_id', 'learning_content', 'CASCADE'),
+    ('assessment_attempt_rollups', 'student_id', 'students', 'CASCADE'),
+    ('assessment_attempt_rollups', 'content_id', 'learning_content', 'CASCADE'),
+]
+PARTITIONED = {'assessment_attempts'}
+
+
+def _replace_foreign_keys(on_delete):
+    for table, column, referenced, action in FOREIGN_KEYS:
+        name = f"{table}_{column}_fkey"
+        action = on_delete or action
+        not_valid = '' if table in PARTITIONED else ' NOT VALID'
+        op.execute(
+            f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}, "
+            f"ADD CONSTRAINT {name} FOREIGN KEY ({column}) REFERENCES {referenced} (id) ON DELETE {action}{not_valid}"
+        )
+    # Validating outside the migration's transaction so the ALTERs' locks are already released
+    with op.get_context().autocommit_block():
+        for table, column, _, _ in FOREIGN_KEYS:
+            if table not in PARTITIONED:
+                op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {table}_{column}_fkey")
+
+
+def upgrade():
+    op.add_column('courses', sa.Column('deletion_requested_at', sa.DateTime(timezone=True), nullable=True))
+    _replace_foreign_keys(None)
+    op.execute("""
+        DO $$
+        DECLARE fk record;
+        BEGIN
+            FOR fk IN SELECT c.conrelid::regclass AS tbl, c.conname FROM pg_constraint c
+                      JOIN pg_namespace n ON n.oid = c.connamespace
+                      WHERE n.nspname = 'archive' AND c.contype = 'f'
+            LOOP
+                EXECUTE format('ALTER TABLE %s DROP CONSTRAINT %I', fk.tbl, fk.conname);
+            END LOOP;
+        END $$
+    """)
+
+
+def downgrade():
+    _replace_foreign_keys('NO ACTION')
+    op.drop_column('courses', 'deletion_requested_at')
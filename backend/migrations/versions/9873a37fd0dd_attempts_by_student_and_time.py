@@ -0,0 +1,30 @@
+"""index assessment_attempts on (student_id, submitted_at)
+
+Serves the dashboard's "most recent quiz scores" query: each monthly partition
+can return a student's latest attempts in order instead of sorting all of them.
+CONCURRENTLY isn't available for partitioned tables, so this briefly blocks
+writes to assessment_attempts while the partition indexes are built.
+
+Revision ID: 9873a37fd0dd
+Revises: 2af4d09aa6d0
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9873a37fd0dd'
+down_revision = '2af4d09aa6d0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_assessment_attempts_student_id_submitted_at', 'assessment_attempts',
+                    ['student_id', 'submitted_at'], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_assessment_attempts_student_id_submitted_at', table_name='assessment_attempts', if_exists=True)
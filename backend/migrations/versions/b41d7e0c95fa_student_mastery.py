@@ -0,0 +1,36 @@
+"""student_mastery: snapshots of the adaptive engine's per-tag mastery estimates
+
+adaptive.py keeps the estimates in memory and writes them here periodically;
+students without rows are seeded from their quiz and progress history the
+first time the engine sees them, so no backfill is needed.
+
+Revision ID: b41d7e0c95fa
+Revises: e768f7786e6d
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b41d7e0c95fa'
+down_revision = 'e768f7786e6d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'student_mastery',
+        sa.Column('student_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('students.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('tag', sa.String(length=255), primary_key=True),
+        sa.Column('mastery', postgresql.NUMERIC(5, 4), nullable=False),
+        sa.Column('evidence', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table('student_mastery')
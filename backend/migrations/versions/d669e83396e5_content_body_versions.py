@@ -0,0 +1,36 @@
+"""content body version hash and precompressed copy
+
+Adds learning_content.content_body_etag (sha256 of the body, served as the
+ETag / body_version) and content_body_gzip (gzip of bodies above
+PRECOMPRESS_BODY_BYTES). Existing rows get their hash backfilled here; their
+bodies are compressed on the fly when served until they are next written.
+
+Revision ID: d669e83396e5
+Revises: 47836cd8de53
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd669e83396e5'
+down_revision = '47836cd8de53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('learning_content', sa.Column('content_body_etag', sa.String(length=64), nullable=True))
+    op.add_column('learning_content', sa.Column('content_body_gzip', sa.LargeBinary(), nullable=True))
+    op.execute(
+        "UPDATE learning_content "
+        "SET content_body_etag = encode(sha256(convert_to(content_body, 'UTF8')), 'hex') "
+        "WHERE content_body IS NOT NULL"
+    )
+
+
+def downgrade():
+    op.drop_column('learning_content', 'content_body_gzip')
+    op.drop_column('learning_content', 'content_body_etag')
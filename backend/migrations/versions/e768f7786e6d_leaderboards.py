@@ -0,0 +1,97 @@
+"""leaderboard tables: best scores, course totals and score histograms
+
+Creates the tables leaderboards.py keeps current on every quiz submission and
+fills them from the existing attempts and archived rollups (the same
+computation as `python rebuild_leaderboards.py`).
+
+Revision ID: e768f7786e6d
+Revises: 6a9476bfa8ba
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e768f7786e6d'
+down_revision = '6a9476bfa8ba'
+branch_labels = None
+depends_on = None
+
+
+def _fk(table):
+    return sa.ForeignKey(f'{table}.id', ondelete='CASCADE')
+
+
+def upgrade():
+    op.create_table(
+        'quiz_best_scores',
+        sa.Column('content_id', postgresql.UUID(as_uuid=True), _fk('learning_content'), primary_key=True),
+        sa.Column('student_id', postgresql.UUID(as_uuid=True), _fk('students'), primary_key=True),
+        sa.Column('best_score', postgresql.NUMERIC(5, 2), nullable=False),
+        sa.Column('attempt_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_table(
+        'course_score_totals',
+        sa.Column('course_id', postgresql.UUID(as_uuid=True), _fk('courses'), primary_key=True),
+        sa.Column('student_id', postgresql.UUID(as_uuid=True), _fk('students'), primary_key=True),
+        sa.Column('total_score', postgresql.NUMERIC(10, 2), nullable=False),
+        sa.Column('quizzes_taken', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_table(
+        'quiz_score_histograms',
+        sa.Column('content_id', postgresql.UUID(as_uuid=True), _fk('learning_content'), primary_key=True),
+        sa.Column('bucket', sa.Integer(), primary_key=True),
+        sa.Column('students', sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        'course_score_histograms',
+        sa.Column('course_id', postgresql.UUID(as_uuid=True), _fk('courses'), primary_key=True),
+        sa.Column('bucket', sa.Integer(), primary_key=True),
+        sa.Column('students', sa.Integer(), nullable=False),
+    )
+
+    op.execute("""
+        INSERT INTO quiz_best_scores (content_id, student_id, best_score, attempt_count, updated_at)
+        SELECT content_id, student_id, max(score), sum(attempts), min(at) FILTER (WHERE score = best)
+        FROM (
+            SELECT *, max(score) OVER (PARTITION BY content_id, student_id) AS best
+            FROM (
+                SELECT content_id, student_id, score, 1 AS attempts, submitted_at AS at FROM assessment_attempts
+                UNION ALL
+                SELECT content_id, student_id, best_score, attempt_count, last_submitted_at FROM assessment_attempt_rollups
+            ) history
+        ) ranked
+        GROUP BY content_id, student_id
+    """)
+    op.execute("""
+        INSERT INTO course_score_totals (course_id, student_id, total_score, quizzes_taken, updated_at)
+        SELECT m.course_id, b.student_id, sum(b.best_score), count(*), max(b.updated_at)
+        FROM quiz_best_scores b
+        JOIN learning_content lc ON lc.id = b.content_id
+        JOIN modules m ON m.id = lc.module_id
+        GROUP BY m.course_id, b.student_id
+    """)
+    op.execute("INSERT INTO quiz_score_histograms (content_id, bucket, students) "
+               "SELECT content_id, floor(best_score), count(*) FROM quiz_best_scores GROUP BY 1, 2")
+    op.execute("INSERT INTO course_score_histograms (course_id, bucket, students) "
+               "SELECT course_id, floor(total_score), count(*) FROM course_score_totals GROUP BY 1, 2")
+
+    # Indexes after the backfill so it isn't slowed down maintaining them
+    op.create_index('ix_quiz_best_scores_content_id_best_score', 'quiz_best_scores',
+                    ['content_id', sa.text('best_score DESC'), 'updated_at'])
+    op.create_index('ix_course_score_totals_course_id_total_score', 'course_score_totals',
+                    ['course_id', sa.text('total_score DESC'), 'updated_at'])
+
+
+def downgrade():
+    op.drop_table('course_score_histograms')
+    op.drop_table('quiz_score_histograms')
+    op.drop_index('ix_course_score_totals_course_id_total_score', table_name='course_score_totals')
+    op.drop_table('course_score_totals')
+    op.drop_index('ix_quiz_best_scores_content_id_best_score', table_name='quiz_best_scores')
+    op.drop_table('quiz_best_scores')
@@ -1,14 +1,28 @@
 from flask_sqlalchemy import SQLAlchemy
 import uuid
-from sqlalchemy.dialects.postgresql import UUID, ENUM, JSONB, NUMERIC 
+from sqlalchemy import event, DDL
+from sqlalchemy.dialects.postgresql import UUID, ENUM, JSONB, NUMERIC, TSVECTOR
 import datetime
+from db_routing import RoutingSession
 
-db = SQLAlchemy()
+# Full-text search documents, kept up to date by Postgres itself (generated columns).
+# Weights: A = title, B = description/tags, C = body. See search.py.
+COURSE_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+CONTENT_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', replace(coalesce(tags, ''), ',', ' ')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(content_body, '')), 'C')"
+)
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 # roles: user join table from the schema
 class UserRole(db.Model):
     __tablename__ = 'user_roles'
-    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'), primary_key=True)
+    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
     role = db.Column(ENUM('student', 'teacher', 'administrator', name='role_name'), primary_key=True)
     granted_at = db.Column(db.DateTime(timezone=True), default=datetime.datetime.utcnow)
 
@@ -23,9 +37,10 @@ class User(db.Model):
     updated_at = db.Column(db.DateTime(timezone=True), default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
 
     # define relationships
-    roles = db.relationship('UserRole', backref='user', lazy=True, cascade="all, delete-orphan")
-    student_profile = db.relationship('Student', backref='user', uselist=False, cascade="all, delete-orphan")
-    teacher_profile = db.relationship('Teacher', backref='user', uselist=False, cascade="all, delete-orphan")
+    # The database cascades deletes (ON DELETE CASCADE); passive_deletes stops the ORM loading children to delete them itself
+    roles = db.relationship('UserRole', backref='user', lazy=True, cascade="all, delete-orphan", passive_deletes=True)
+    student_profile = db.relationship('Student', backref='user', uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+    teacher_profile = db.relationship('Teacher', backref='user', uselist=False, cascade="all, delete-orphan", passive_deletes=True)
 
     def __repr__(self):
         return f'<User {self.username}>'
@@ -34,7 +49,7 @@ class User(db.Model):
 class Student(db.Model):
     __tablename__ = 'students'
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'), unique=True, nullable=False)
+    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id', ondelete='CASCADE'), unique=True, nullable=False)
     first_name = db.Column(db.String(100), nullable=False)
     last_name = db.Column(db.String(100), nullable=False)
     created_at = db.Column(db.DateTime(timezone=True), default=datetime.datetime.utcnow)
@@ -46,7 +61,7 @@ class Student(db.Model):
 class Teacher(db.Model):
     __tablename__ = 'teachers'
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id'), unique=True, nullable=False)
+    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id', ondelete='CASCADE'), unique=True, nullable=False)
     first_name = db.Column(db.String(100), nullable=False)
     last_name = db.Column(db.String(100), nullable=False)
     title = db.Column(db.String(100)) # e.g., "Professor", "Instructor"
@@ -58,45 +73,63 @@ class Teacher(db.Model):
 
 class Course(db.Model):
     __tablename__ = 'courses'
+    __table_args__ = (
+        db.Index('ix_courses_search_vector', 'search_vector', postgresql_using='gin'),
+    )
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text)
-    created_by_teacher_id = db.Column(UUID(as_uuid=True), db.ForeignKey('teachers.id'), nullable=True)
+    created_by_teacher_id = db.Column(UUID(as_uuid=True), db.ForeignKey('teachers.id', ondelete='SET NULL'), nullable=True)
     created_at = db.Column(db.DateTime(timezone=True), default=datetime.datetime.utcnow)
+    # Set while a large course is being deleted in the background (see course_deletion.py); hidden from listings
+    deletion_requested_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    # Deferred so normal course queries don't load it
+    search_vector = db.deferred(db.Column(TSVECTOR, db.Computed(COURSE_SEARCH_DOCUMENT, persisted=True)))
 
     # Relationships
-    modules = db.relationship('Module', backref='course', lazy=True, cascade="all, delete-orphan")
-    teacher = db.relationship('Teacher', backref='courses')
+    modules = db.relationship('Module', backref='course', lazy=True, cascade="all, delete-orphan", passive_deletes=True)
+    teacher = db.relationship('Teacher', backref=db.backref('courses', passive_deletes=True))
     def __repr__(self):
         return f'<Course {self.title}>'
 
 class Module(db.Model):
     __tablename__ = 'modules'
+    __table_args__ = (
+        db.Index('ix_modules_course_id_module_order', 'course_id', 'module_order'),
+    )
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    course_id = db.Column(UUID(as_uuid=True), db.ForeignKey('courses.id'), nullable=False)
+    course_id = db.Column(UUID(as_uuid=True), db.ForeignKey('courses.id', ondelete='CASCADE'), nullable=False)
     title = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text)
     module_order = db.Column(db.Integer, nullable=False)
     created_at = db.Column(db.DateTime(timezone=True), default=datetime.datetime.utcnow)
 
     # Relationships
-    learning_contents = db.relationship('LearningContent', backref='module', lazy=True, cascade="all, delete-orphan")
+    learning_contents = db.relationship('LearningContent', backref='module', lazy=True, cascade="all, delete-orphan", passive_deletes=True)
 
     def __repr__(self):
         return f'<Module {self.title}>'
 
 class LearningContent(db.Model):
     __tablename__ = 'learning_content'
+    __table_args__ = (
+        db.Index('ix_learning_content_module_id_content_order', 'module_id', 'content_order'),
+        db.Index('ix_learning_content_search_vector', 'search_vector', postgresql_using='gin'),
+    )
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    module_id = db.Column(UUID(as_uuid=True), db.ForeignKey('modules.id'), nullable=False)
+    module_id = db.Column(UUID(as_uuid=True), db.ForeignKey('modules.id', ondelete='CASCADE'), nullable=False)
     type = db.Column(ENUM('video', 'article', 'quiz', 'exercise', 'assignment', name='content_type'), nullable=False)
     title = db.Column(db.String(255), nullable=False)
     content_url = db.Column(db.Text) # For videos, external links
     content_body = db.Column(db.Text) # For articles, text
+    # Set together with content_body via content_bodies.body_columns()
+    content_body_etag = db.Column(db.String(64)) # sha256 of the body, used as its version
+    content_body_gzip = db.deferred(db.Column(db.LargeBinary)) # precompressed copy of large bodies
     content_order = db.Column(db.Integer, nullable=False)
     created_at = db.Column(db.DateTime(timezone=True), default=datetime.datetime.utcnow)
     quiz_data = db.Column(JSONB, nullable=True)
     tags = db.Column(db.String(255), nullable=True) # e.g., "algebra,calculus,intro"
+    search_vector = db.deferred(db.Column(TSVECTOR, db.Computed(CONTENT_SEARCH_DOCUMENT, persisted=True)))
     def __repr__(self):
         return f'<LearningContent {self.title}>'
 
@@ -107,9 +140,16 @@ class LearningContent(db.Model):
 
 class AssessmentAttempt(db.Model):
     __tablename__ = 'assessment_attempts'
+    # Range partitioned by month of submitted_at (see partitions.py), so submitted_at is part of the key
+    __table_args__ = (
+        db.Index('ix_assessment_attempts_student_id_content_id', 'student_id', 'content_id'),
+        db.Index('ix_assessment_attempts_content_id', 'content_id'),
+        db.Index('ix_assessment_attempts_student_id_submitted_at', 'student_id', 'submitted_at'),
+        {'postgresql_partition_by': 'RANGE (submitted_at)'},
+    )
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    content_id = db.Column(UUID(as_uuid=True), db.ForeignKey('learning_content.id'), nullable=False)
-    student_id = db.Column(UUID(as_uuid=True), db.ForeignKey('students.id'), nullable=False)
+    content_id = db.Column(UUID(as_uuid=True), db.ForeignKey('learning_content.id', ondelete='CASCADE'), nullable=False)
+    student_id = db.Column(UUID(as_uuid=True), db.ForeignKey('students.id', ondelete='CASCADE'), nullable=False)
     score = db.Column(NUMERIC(5, 2), nullable=False)
     attempt_number = db.Column(db.Integer, nullable=False, default=1)
     # --- THIS IS THE CRITICAL LINE ---
@@ -117,31 +157,101 @@ class AssessmentAttempt(db.Model):
     max_score = db.Column(NUMERIC(5, 2), nullable=False)
     
     answers = db.Column(JSONB, nullable=False)
-    submitted_at = db.Column(db.DateTime(timezone=True), default=datetime.datetime.utcnow)
+    grading_version = db.Column(db.String(16)) # version of the grader that scored it (see grading.py); NULL before versioning
+    submitted_at = db.Column(db.DateTime(timezone=True), primary_key=True, default=datetime.datetime.utcnow)
 
     # Relationships
-    student = db.relationship('Student', backref='quiz_attempts')
-    quiz = db.relationship('LearningContent', backref='attempts')
+    # passive_deletes='all': leave attempts to the database cascade instead of nulling their keys
+    student = db.relationship('Student', backref=db.backref('quiz_attempts', passive_deletes='all'))
+    quiz = db.relationship('LearningContent', backref=db.backref('attempts', passive_deletes='all'))
 
     def __repr__(self):
         return f'<AssessmentAttempt student={self.student_id} quiz={self.content_id} score={self.score}>'
+
+# create_all() only makes the partitioned parent; the default partition makes it writable right away
+event.listen(AssessmentAttempt.__table__, 'after_create', DDL(
+    "CREATE TABLE IF NOT EXISTS assessment_attempts_default PARTITION OF assessment_attempts DEFAULT"
+).execute_if(dialect='postgresql'))
+
+class AssessmentAttemptRollup(db.Model):
+    """Per student, quiz and month totals of attempts whose partition has been archived."""
+    __tablename__ = 'assessment_attempt_rollups'
+    __table_args__ = (
+        db.Index('ix_assessment_attempt_rollups_content_id_month', 'content_id', 'month'),
+    )
+    student_id = db.Column(UUID(as_uuid=True), db.ForeignKey('students.id', ondelete='CASCADE'), primary_key=True)
+    content_id = db.Column(UUID(as_uuid=True), db.ForeignKey('learning_content.id', ondelete='CASCADE'), primary_key=True)
+    month = db.Column(db.Date, primary_key=True)
+    attempt_count = db.Column(db.Integer, nullable=False)
+    score_sum = db.Column(db.Numeric, nullable=False)
+    best_score = db.Column(NUMERIC(5, 2), nullable=False)
+    last_attempt_number = db.Column(db.Integer, nullable=False)
+    last_submitted_at = db.Column(db.DateTime(timezone=True), nullable=False)
 # backend/models.py
 # ... (all existing imports and models are unchanged) ...
 
 class StudentContentProgress(db.Model):
     __tablename__ = 'student_content_progress'
+    __table_args__ = (
+        db.Index('ix_student_content_progress_student_content_status', 'student_id', 'content_id', 'status'),
+        db.Index('ix_student_content_progress_content_id_status', 'content_id', 'status'),
+    )
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    student_id = db.Column(UUID(as_uuid=True), db.ForeignKey('students.id'), nullable=False)
-    content_id = db.Column(UUID(as_uuid=True), db.ForeignKey('learning_content.id'), nullable=False)
+    student_id = db.Column(UUID(as_uuid=True), db.ForeignKey('students.id', ondelete='CASCADE'), nullable=False)
+    content_id = db.Column(UUID(as_uuid=True), db.ForeignKey('learning_content.id', ondelete='CASCADE'), nullable=False)
     status = db.Column(ENUM('not_started', 'in_progress', 'completed', 'skipped', name='progress_status'), nullable=False, default='not_started')
     started_at = db.Column(db.DateTime(timezone=True))
     completed_at = db.Column(db.DateTime(timezone=True))
     last_accessed_at = db.Column(db.DateTime(timezone=True), default=datetime.datetime.utcnow)
 
     # Relationships for easy access
-    student = db.relationship('Student', backref='progress_records')
-    learning_content = db.relationship('LearningContent', backref='progress_records')
+    student = db.relationship('Student', backref=db.backref('progress_records', passive_deletes='all'))
+    learning_content = db.relationship('LearningContent', backref=db.backref('progress_records', passive_deletes='all'))
 
     def __repr__(self):
         return f'<Progress student={self.student_id} content={self.content_id} status={self.status}>'
-    
\ No newline at end of file
+    
+# Leaderboards (see leaderboards.py): each student's best score per quiz and their
+# course total, plus how many students sit in each whole-point score bucket
+class QuizBestScore(db.Model):
+    __tablename__ = 'quiz_best_scores'
+    __table_args__ = (
+        db.Index('ix_quiz_best_scores_content_id_best_score', 'content_id', db.text('best_score DESC'), 'updated_at'),
+    )
+    content_id = db.Column(UUID(as_uuid=True), db.ForeignKey('learning_content.id', ondelete='CASCADE'), primary_key=True)
+    student_id = db.Column(UUID(as_uuid=True), db.ForeignKey('students.id', ondelete='CASCADE'), primary_key=True)
+    best_score = db.Column(NUMERIC(5, 2), nullable=False)
+    attempt_count = db.Column(db.Integer, nullable=False)
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False)
+
+class CourseScoreTotal(db.Model):
+    __tablename__ = 'course_score_totals'
+    __table_args__ = (
+        db.Index('ix_course_score_totals_course_id_total_score', 'course_id', db.text('total_score DESC'), 'updated_at'),
+    )
+    course_id = db.Column(UUID(as_uuid=True), db.ForeignKey('courses.id', ondelete='CASCADE'), primary_key=True)
+    student_id = db.Column(UUID(as_uuid=True), db.ForeignKey('students.id', ondelete='CASCADE'), primary_key=True)
+    total_score = db.Column(NUMERIC(10, 2), nullable=False) # sum of best scores over the course's quizzes
+    quizzes_taken = db.Column(db.Integer, nullable=False)
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False)
+
+class QuizScoreHistogram(db.Model):
+    __tablename__ = 'quiz_score_histograms'
+    content_id = db.Column(UUID(as_uuid=True), db.ForeignKey('learning_content.id', ondelete='CASCADE'), primary_key=True)
+    bucket = db.Column(db.Integer, primary_key=True) # floor(best_score)
+    students = db.Column(db.Integer, nullable=False)
+
+class CourseScoreHistogram(db.Model):
+    __tablename__ = 'course_score_histograms'
+    course_id = db.Column(UUID(as_uuid=True), db.ForeignKey('courses.id', ondelete='CASCADE'), primary_key=True)
+    bucket = db.Column(db.Integer, primary_key=True) # floor(total_score)
+    students = db.Column(db.Integer, nullable=False)
+
+# Adaptive engine snapshots (see adaptive.py): each student's estimated mastery per tag
+class StudentMastery(db.Model):
+    __tablename__ = 'student_mastery'
+    student_id = db.Column(UUID(as_uuid=True), db.ForeignKey('students.id', ondelete='CASCADE'), primary_key=True)
+    tag = db.Column(db.String(255), primary_key=True)
+    mastery = db.Column(NUMERIC(5, 4), nullable=False) # 0 to 1
+    evidence = db.Column(db.Integer, nullable=False) # quiz results folded into the estimate
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False)
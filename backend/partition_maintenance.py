@@ -0,0 +1,40 @@
+import argparse
+from app import create_app
+from models import db
+from partitions import ensure_partitions, cold_partitions, archive_partition, compact, MONTHS_AHEAD
+
+# Monthly maintenance for the assessment_attempts partitions (see partitions.py).
+# Usage (from backend/, e.g. monthly from cron):
+#   python partition_maintenance.py                          # create upcoming months
+#   python partition_maintenance.py --archive-after 24       # ...and archive months older than two years
+#   python partition_maintenance.py --archive-after 24 --tablespace cold_storage
+
+def maintain(months_ahead, archive_after, tablespace, dry_run):
+    with create_app().app_context():
+        created = ensure_partitions(db.session, months_ahead=months_ahead)
+        db.session.commit()
+        for name in created:
+            print(f"Created partition {name}")
+
+        if archive_after is None:
+            return
+        for month, name in cold_partitions(db.session, archive_after):
+            if dry_run:
+                print(f"Would archive {name}")
+                continue
+            archived = archive_partition(db.session, month, name, tablespace=tablespace)
+            db.session.commit()
+            # SET TABLESPACE already rewrote the table compactly
+            if not tablespace:
+                compact(archived)
+            print(f"Archived {name} -> {archived}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Create upcoming assessment_attempts partitions and archive cold ones.")
+    parser.add_argument('--months-ahead', type=int, default=MONTHS_AHEAD, help="Months of partitions to keep ready")
+    parser.add_argument('--archive-after', type=int, default=None,
+                        help="Archive months that ended more than this many months ago (default: don't archive)")
+    parser.add_argument('--tablespace', help="Move archived partitions to this tablespace")
+    parser.add_argument('--dry-run', action='store_true', help="Only list the partitions that would be archived")
+    args = parser.parse_args()
+    maintain(args.months_ahead, args.archive_after, args.tablespace, args.dry_run)
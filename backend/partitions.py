@@ -0,0 +1,137 @@
+import re
+import datetime
+from sqlalchemy import text
+from models import db
+
+# Monthly partitions for assessment_attempts
+# Range partitioned by submitted_at: one partition per UTC month (assessment_attempts_y2026m10)
+# plus a DEFAULT partition so inserts never fail. partition_maintenance.py, run monthly from
+# cron, creates months ahead (ensure_partitions) and rolls cold months up into
+# assessment_attempt_rollups before moving them to the archive schema (archive_partitions).
+PARENT = 'assessment_attempts'
+DEFAULT_PARTITION = 'assessment_attempts_default'
+ARCHIVE_SCHEMA = 'archive'
+MONTHS_AHEAD = 3
+_PARTITION_NAME = re.compile(rf'^{PARENT}_y(\d{{4}})m(\d{{2}})$')
+
+
+def month_start(value):
+    return datetime.date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{PARENT}_y{month.year}m{month.month:02d}"
+
+
+def _bound(month):
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+
+def attached_partitions(session):
+    """Monthly partitions currently attached to the parent, as {month: table name}."""
+    names = session.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST(:parent AS regclass)"
+    ), {"parent": PARENT}).scalars()
+    partitions = {}
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions[datetime.date(int(match[1]), int(match[2]), 1)] = name
+    return partitions
+
+
+def create_partition(session, month):
+    """
+    Adds the partition for one month. Rows for that month that already landed in the
+    default partition are moved into it first, otherwise ATTACH would refuse.
+    """
+    name, start, end = partition_name(month), month, add_months(month, 1)
+    session.execute(text(f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    session.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+        f"WHERE submitted_at >= {_bound(start)} AND submitted_at < {_bound(end)} RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ))
+    # Attaching builds the partition's copies of the parent's indexes
+    session.execute(text(f"ALTER TABLE {PARENT} ATTACH PARTITION {name} FOR VALUES FROM ({_bound(start)}) TO ({_bound(end)})"))
+    return name
+
+
+def ensure_partitions(session, since=None, months_ahead=MONTHS_AHEAD):
+    """
+    Creates any missing monthly partitions from `since` (default: this month) up to
+    `months_ahead` months from now. Returns the names created. The caller commits.
+    """
+    this_month = month_start(datetime.datetime.utcnow())
+    month = month_start(since) if since else this_month
+    last = add_months(this_month, months_ahead)
+    existing = attached_partitions(session)
+
+    created = []
+    while month <= last:
+        if month not in existing:
+            created.append(create_partition(session, month))
+        month = add_months(month, 1)
+    return created
+
+
+def _roll_up(session, name, month):
+    session.execute(text(
+        "INSERT INTO assessment_attempt_rollups "
+        "(student_id, content_id, month, attempt_count, score_sum, best_score, last_attempt_number, last_submitted_at) "
+        "SELECT student_id, content_id, :month, count(*), sum(score), max(score), max(attempt_number), max(submitted_at) "
+        f"FROM {name} GROUP BY student_id, content_id "
+        "ON CONFLICT (student_id, content_id, month) DO UPDATE SET "
+        "attempt_count = assessment_attempt_rollups.attempt_count + EXCLUDED.attempt_count, "
+        "score_sum = assessment_attempt_rollups.score_sum + EXCLUDED.score_sum, "
+        "best_score = GREATEST(assessment_attempt_rollups.best_score, EXCLUDED.best_score), "
+        "last_attempt_number = GREATEST(assessment_attempt_rollups.last_attempt_number, EXCLUDED.last_attempt_number), "
+        "last_submitted_at = GREATEST(assessment_attempt_rollups.last_submitted_at, EXCLUDED.last_submitted_at)"
+    ), {"month": month})
+
+
+def archive_partition(session, month, name, tablespace=None):
+    """
+    Rolls one month up, detaches it and moves it to the archive schema without its
+    secondary indexes or foreign keys (only the primary key stays, for audits), so
+    deleting a student or quiz later doesn't have to touch it. With `tablespace` the
+    table is also rewritten onto it, e.g. cheaper storage. Runs as one transaction so
+    a failure leaves the month attached and un-rolled; the caller commits.
+    """
+    _roll_up(session, name, month)
+    session.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+    session.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+
+    indexes = session.execute(text(
+        "SELECT i.relname FROM pg_index x JOIN pg_class i ON i.oid = x.indexrelid "
+        "WHERE x.indrelid = CAST(:table AS regclass) AND NOT x.indisprimary"
+    ), {"table": f"{ARCHIVE_SCHEMA}.{name}"}).scalars().all()
+    for index in indexes:
+        session.execute(text(f"DROP INDEX {ARCHIVE_SCHEMA}.{index}"))
+    foreign_keys = session.execute(text(
+        "SELECT conname FROM pg_constraint WHERE conrelid = CAST(:table AS regclass) AND contype = 'f'"
+    ), {"table": f"{ARCHIVE_SCHEMA}.{name}"}).scalars().all()
+    for constraint in foreign_keys:
+        session.execute(text(f"ALTER TABLE {ARCHIVE_SCHEMA}.{name} DROP CONSTRAINT {constraint}"))
+
+    if tablespace:
+        session.execute(text(f"ALTER TABLE {ARCHIVE_SCHEMA}.{name} SET TABLESPACE {tablespace}"))
+    return f"{ARCHIVE_SCHEMA}.{name}"
+
+
+def cold_partitions(session, keep_months):
+    """Attached months that ended more than `keep_months` months ago, oldest first."""
+    cutoff = add_months(month_start(datetime.datetime.utcnow()), -keep_months)
+    return sorted((month, name) for month, name in attached_partitions(session).items() if month < cutoff)
+
+
+def compact(table):
+    """VACUUM FULL rewrites the table without dead space. It can't run inside a transaction."""
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        connection.exec_driver_sql(f"VACUUM FULL {table}")
@@ -0,0 +1,25 @@
+import argparse
+from app import create_app
+from models import db, Course
+from course_deletion import purge_course
+
+# Finishes deleting courses marked with deletion_requested_at. The background thread
+# that normally does it doesn't survive a restart, so run this from cron (e.g. every
+# 10 minutes); it is what guarantees a requested deletion completes.
+# Usage (from backend/): python purge_deleted_courses.py [--batch-size 2000]
+
+def purge_deleted_courses(batch_size):
+    with create_app().app_context():
+        pending = db.session.execute(
+            db.select(Course.id, Course.title).where(Course.deletion_requested_at.isnot(None))
+        ).all()
+        for course_id, title in pending:
+            deleted = purge_course(course_id, batch_size=batch_size)
+            print(f"Deleted course '{title}' ({deleted} dependent rows)")
+        print(f"\n✅ Purged {len(pending)} courses.")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Finish deleting courses that are marked for deletion.")
+    parser.add_argument('--batch-size', type=int, default=None, help="Rows per transaction (default: COURSE_DELETE_BATCH_SIZE)")
+    args = parser.parse_args()
+    purge_deleted_courses(args.batch_size)
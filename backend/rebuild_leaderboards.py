@@ -0,0 +1,25 @@
+import argparse
+import time
+import uuid
+from app import create_app
+from models import db
+from leaderboards import rebuild
+
+# Recomputes quiz and course leaderboards from attempts (see leaderboards.py).
+# Use after a backfill or bulk change to attempts, or to drop deleted students from the counts.
+# Usage (from backend/): python rebuild_leaderboards.py [--quiz <content id> ...]
+
+def rebuild_leaderboards(quiz_ids):
+    with create_app().app_context():
+        started = time.perf_counter()
+        rebuild(quiz_ids)
+        db.session.commit()
+        scope = f"{len(quiz_ids)} quizzes" if quiz_ids else "all quizzes"
+        print(f"✅ Rebuilt leaderboards for {scope} in {time.perf_counter() - started:.1f}s.")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Rebuild quiz and course leaderboards from quiz attempts.")
+    parser.add_argument('--quiz', dest='quiz_ids', type=uuid.UUID, action='append',
+                        help="Only rebuild this quiz (and its course); repeatable")
+    args = parser.parse_args()
+    rebuild_leaderboards(args.quiz_ids)
@@ -0,0 +1,56 @@
+from collections import Counter
+from sqlalchemy import select, exists, func, cast, Text
+from sqlalchemy.dialects.postgresql import ARRAY
+from models import db, Course, Module, LearningContent, StudentContentProgress
+
+# Tag-based content recommendations
+# A student's "strong topics" are the most frequent tags on the content they have
+# completed; we recommend uncompleted content sharing one of those tags.
+# Two queries regardless of how much the student has done.
+TOP_TAGS = 3
+
+
+def _tag_array(column):
+    # 'Algebra, Intro' -> {algebra,intro}, matching how tags are split in Python
+    return func.regexp_split_to_array(func.lower(func.trim(column)), r'\s*,\s*')
+
+
+def _completed_by(student_id):
+    return exists().where(
+        StudentContentProgress.content_id == LearningContent.id,
+        StudentContentProgress.student_id == student_id,
+        StudentContentProgress.status == 'completed'
+    )
+
+
+def recommend_content(student_id, limit=5):
+    """Returns up to `limit` recommendations as dicts ready for JSON."""
+    completed_tags = db.session.scalars(
+        select(LearningContent.tags).where(LearningContent.tags.isnot(None), _completed_by(student_id))
+    ).all()
+    tag_counts = Counter(tag.strip().lower() for tags in completed_tags for tag in tags.split(',') if tag.strip())
+    if not tag_counts:
+        return []
+    top_tags = [tag for tag, _ in tag_counts.most_common(TOP_TAGS)]
+
+    rows = db.session.execute(
+        select(LearningContent.id, LearningContent.title, LearningContent.type, Module.title, Course.title, Course.id)
+        .join(Module, LearningContent.module_id == Module.id)
+        .join(Course, Module.course_id == Course.id)
+        .where(
+            LearningContent.tags.isnot(None),
+            _tag_array(LearningContent.tags).op('&&')(cast(top_tags, ARRAY(Text))),
+            ~_completed_by(student_id),
+            Course.deletion_requested_at.is_(None)
+        )
+        .limit(limit)
+    ).all()
+    return [{
+        "id": str(content_id),
+        "title": title,
+        "type": content_type,
+        # Add context for the UI
+        "module_title": module_title,
+        "course_title": course_title,
+        "course_id": str(course_id)
+    } for content_id, title, content_type, module_title, course_title, course_id in rows]
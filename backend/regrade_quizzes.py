@@ -0,0 +1,53 @@
+import argparse
+import time
+import uuid
+from app import create_app
+from models import db, LearningContent
+from grading import regrade_quiz, QuizFormatError, REGRADE_BATCH
+from leaderboards import rebuild
+
+# Re-scores quiz attempts with each quiz's current answer key (see grading.py) and
+# rebuilds the affected leaderboards, quiz by quiz. Only attempts scored under another
+# key are touched, so it is cheap to re-run and safe to interrupt. Quizzes named with
+# --quiz always get their leaderboards rebuilt, even with nothing to re-grade.
+# Usage (from backend/): python regrade_quizzes.py [--quiz <content id> ...] [--batch-size N]
+
+def regrade_quizzes(quiz_ids, batch_size):
+    with create_app().app_context():
+        query = LearningContent.query.filter(LearningContent.type == 'quiz', LearningContent.quiz_data.isnot(None))
+        if quiz_ids:
+            query = query.filter(LearningContent.id.in_(quiz_ids))
+        quizzes = [(quiz.id, quiz.title, quiz.quiz_data) for quiz in query]
+        db.session.commit()
+
+        regraded_quizzes = 0
+        for quiz_id, title, quiz_data in quizzes:
+            started = time.perf_counter()
+            try:
+                regraded, changed, version = regrade_quiz(quiz_id, quiz_data, batch_size)
+                # Committed with the last batch (see regrade_quiz)
+                if regraded or quiz_ids:
+                    rebuild([quiz_id])
+                db.session.commit()
+            except QuizFormatError as e:
+                print(f"⚠️  Skipped '{title}' ({quiz_id}): {e}")
+                continue
+            except Exception as e:
+                # Batches already committed stay re-graded; the last one is re-graded on the next run
+                db.session.rollback()
+                print(f"❌ Failed '{title}' ({quiz_id}): {e}")
+                continue
+            if regraded:
+                regraded_quizzes += 1
+                print(f"Re-graded '{title}': {regraded} attempts, {changed} scores changed, "
+                      f"version {version}, {time.perf_counter() - started:.1f}s")
+
+        print(f"✅ {regraded_quizzes} of {len(quizzes)} quizzes needed re-grading.")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Re-score quiz attempts with the current answer keys.")
+    parser.add_argument('--quiz', dest='quiz_ids', type=uuid.UUID, action='append',
+                        help="Only re-grade this quiz; repeatable")
+    parser.add_argument('--batch-size', type=int, default=REGRADE_BATCH, help="Attempts scored and updated per transaction")
+    args = parser.parse_args()
+    regrade_quizzes(args.quiz_ids, args.batch_size)
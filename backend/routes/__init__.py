@@ -0,0 +1,15 @@
+from routes.auth import auth_bp
+from routes.admin import admin_bp
+from routes.courses import courses_bp
+from routes.progress import progress_bp
+from routes.analytics import analytics_bp
+from routes.ai import ai_bp
+from routes.search import search_bp
+from routes.metrics import metrics_bp
+
+BLUEPRINTS = [auth_bp, admin_bp, courses_bp, progress_bp, analytics_bp, ai_bp, search_bp, metrics_bp]
+
+
+def register_blueprints(app):
+    for blueprint in BLUEPRINTS:
+        app.register_blueprint(blueprint)
@@ -0,0 +1,107 @@
+import codecs
+from itertools import islice
+from flask import Blueprint, current_app, request, jsonify
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy.exc import IntegrityError
+from extensions import bcrypt
+from decorators import admin_required
+from db_routing import read_replica
+from leaderboards import remove_student
+from bulk_import import UserImporter, iter_csv_rows, DEFAULT_CHUNK_SIZE
+from models import db, User, UserRole, Teacher
+
+admin_bp = Blueprint('admin', __name__)
+
+# ADMIN USER MANAGEMENT API
+@admin_bp.route('/api/admin/users', methods=['GET'])
+@admin_required()
+@read_replica
+def get_all_users():
+    "Admin only: Returns a list of all users."
+    users = User.query.all()
+    output = []
+    for user in users:
+        user_data = {'id': str(user.id), 'username': user.username, 'email': user.email, 'roles': [r.role for r in user.roles]}
+        if user.student_profile:
+            user_data['first_name'] = user.student_profile.first_name
+            user_data['last_name'] = user.student_profile.last_name
+        elif user.teacher_profile:
+            user_data['first_name'] = user.teacher_profile.first_name
+            user_data['last_name'] = user.teacher_profile.last_name
+        output.append(user_data)
+    return jsonify(output), 200
+
+@admin_bp.route('/api/admin/users', methods=['POST'])
+@admin_required()
+def create_user_by_admin():
+    "Admin only: Creates a new user (teacher or admin)."
+    data = request.get_json()
+    required_fields = ['firstName', 'lastName', 'username', 'email', 'password', 'role']
+    if not all(field in data for field in required_fields):
+        return jsonify({"error": "Missing required fields"}), 400
+    role = data['role']
+    if role not in ['teacher', 'administrator']:
+        return jsonify({"error": "Invalid role specified."}), 400
+    try:
+        hashed_password = bcrypt.generate_password_hash(data['password']).decode('utf-8')
+        new_user = User(username=data['username'], email=data['email'], password_hash=hashed_password)
+        db.session.add(new_user)
+        db.session.flush()
+        new_profile = Teacher(user_id=new_user.id, first_name=data['firstName'], last_name=data['lastName'], title=role.capitalize())
+        db.session.add(new_profile)
+        new_role = UserRole(user_id=new_user.id, role=role)
+        db.session.add(new_role)
+        db.session.commit()
+        return jsonify({"message": f"{role.capitalize()} '{new_user.username}' created successfully."}), 201
+    except IntegrityError as e:
+        db.session.rollback()
+        if 'users_username_key' in str(e.orig): return jsonify({"error": "Username already exists"}), 409
+        if 'users_email_key' in str(e.orig): return jsonify({"error": "Email already exists"}), 409
+        return jsonify({"error": "Database error"}), 500
+
+@admin_bp.route('/api/admin/users/import', methods=['POST'])
+@admin_required()
+def import_users_csv():
+    """
+    Admin only: Bulk-creates users from a CSV file of at most USER_IMPORT_MAX_ROWS rows
+    (bigger files: import_users.py). Accepts a multipart upload in the 'file' field or a
+    raw text/csv body. Optional query params: chunk_size (rows per transaction).
+    """
+    upload = request.files.get('file')
+    raw_stream = upload.stream if upload else request.stream
+    # utf-8-sig strips the BOM that Excel puts at the start of exported CSVs. A stream reader
+    # rather than TextIOWrapper, which needs a readable() the upload stream lacks before Python 3.11
+    text_stream = codecs.getreader('utf-8-sig')(raw_stream)
+    chunk_size = request.args.get('chunk_size', DEFAULT_CHUNK_SIZE, type=int)
+
+    max_rows = current_app.config['USER_IMPORT_MAX_ROWS']
+
+    importer = UserImporter(bcrypt, chunk_size=max(1, min(chunk_size, 5000)))
+    try:
+        # Read (but don't hash) one row past the limit first, so an oversized file is refused before anything is written
+        rows = list(islice(iter_csv_rows(text_stream), max_rows + 1))
+        if len(rows) > max_rows:
+            return jsonify({"error": f"The CSV has more than {max_rows} rows. "
+                                     "Import large files with import_users.py on the server."}), 413
+        summary = importer.run(rows)
+    except (ValueError, UnicodeDecodeError) as e:
+        db.session.rollback()
+        # Chunks committed before the bad row are kept, so report them too
+        return jsonify({"error": f"Could not read CSV: {e}", **importer.summary()}), 400
+    return jsonify(summary), 200
+
+@admin_bp.route('/api/admin/users/<uuid:user_id>', methods=['DELETE'])
+@admin_required()
+def delete_user(user_id):
+    "Admin only. Deletes a user by their ID."
+    current_user_id = get_jwt_identity()
+    if str(user_id) == current_user_id:
+        return jsonify({"error": "You cannot delete your own account."}), 403
+    user_to_delete = User.query.get(user_id)
+    if not user_to_delete:
+        return jsonify({"error": "User not found."}), 404
+    if user_to_delete.student_profile:
+        remove_student(user_to_delete.student_profile.id)
+    db.session.delete(user_to_delete)
+    db.session.commit()
+    return jsonify({"message": f"User '{user_to_delete.username}' has been deleted."}), 200
@@ -0,0 +1,129 @@
+import json
+from flask import Blueprint, request, jsonify
+from decorators import roles_required
+from ai_client import ai_configured, get_openai_client
+from instrumentation import timed_ai_call
+
+ai_bp = Blueprint('ai', __name__)
+
+# AI API (quiz generation and chatbot)
+@ai_bp.route('/api/ai/generate-quiz', methods=['POST'])
+@roles_required('teacher', 'administrator')
+def generate_quiz_from_article():
+    """
+    Uses OpenAI's GPT to generate a quiz from a piece of text (article body).
+    Accessible by teachers and admins.
+    """
+    if not ai_configured():
+        return jsonify({"error": "AI service is not configured on the server."}), 503 # 503 Service Unavailable
+
+    data = request.get_json()
+    article_text = data.get('text')
+
+    if not article_text or len(article_text) < 100:
+        return jsonify({"error": "Article text must be at least 100 characters long to generate a quiz."}), 400
+
+    # This is the "prompt" we send to the AI. It's carefully engineered to ask for a specific JSON format.
+    prompt_messages = [
+        {
+            "role": "system",
+            "content": "You are an expert educator and quiz creator. Your task is to generate a structured JSON object for a quiz based on the provided text. The quiz should contain exactly 3 multiple-choice questions. Each question must have a unique 'id', the question 'text', an array of three string 'options', and the 'correct_answer_index' (0, 1, or 2)."
+        },
+        {
+            "role": "user",
+            "content": f"Here is the article text: ```{article_text}```"
+        }
+    ]
+
+    try:
+        # Make the API call to OpenAI
+        with timed_ai_call('generate_quiz'):
+            completion = get_openai_client().chat.completions.create(
+                model="gpt-3.5-turbo-1106",  # A model that is good with JSON format
+                messages=prompt_messages,
+                response_format={ "type": "json_object" }, # Enforce JSON output
+                temperature=0.5 # A bit of creativity, but not too much
+            )
+        
+        # Extract the JSON string from the response
+        response_content = completion.choices[0].message.content
+        # Parse the JSON string into a Python dictionary
+        quiz_data = json.loads(response_content)
+
+        # Basic validation of the AI's output
+        if 'questions' not in quiz_data or not isinstance(quiz_data['questions'], list):
+            raise ValueError("AI response did not contain a valid 'questions' list.")
+        # The model sometimes numbers the ids, repeats them or leaves them out; grading needs unique string ids
+        seen_ids = set()
+        for i, question in enumerate(quiz_data['questions']):
+            if isinstance(question, dict):
+                question_id = str(question.get('id') or f"q{i + 1}")
+                question['id'] = question_id if question_id not in seen_ids else f"q{i + 1}"
+                seen_ids.add(question['id'])
+
+        # Return the structured quiz_data, ready for our frontend
+        return jsonify(quiz_data)
+
+    except json.JSONDecodeError:
+        return jsonify({"error": "AI generated an invalid JSON format. Please try again."}), 500
+    except Exception as e:
+        print(f"An error occurred with the OpenAI API: {e}")
+        return jsonify({"error": f"An error occurred while generating the quiz: {e}"}), 500
+
+@ai_bp.route('/api/ai/chatbot', methods=['POST'])
+@roles_required('student')
+def handle_chatbot_query():
+    """
+    Handles a student's question by sending it to OpenAI's GPT with context from an article.
+    """
+    if not ai_configured():
+        return jsonify({"error": "AI service is not configured on the server."}), 503
+
+    data = request.get_json()
+    question = data.get('question')
+    article_text = data.get('context') # The text of the article the student is reading
+
+    if not question:
+        return jsonify({"error": "A question is required."}), 400
+    if not article_text:
+        return jsonify({"error": "Context (the article text) is required."}), 400
+
+    # This is the "prompt engineering" part. We give the AI a persona and strict instructions.
+    # This is a simple form of Retrieval-Augmented Generation (RAG).
+    system_prompt = (
+        "You are a friendly and encouraging tutor named StudyBot. Your role is to help a student "
+        "understand an article they are currently reading. Your answers must be based ONLY on the "
+        "information provided in the article text. If the answer cannot be found in the article, "
+        "you must politely state that you can only answer questions about the provided text. "
+        "Do not make up information or answer general knowledge questions."
+    )
+    
+    user_prompt = (
+        f"Here is the article text the student is reading:\n--- ARTICLE START ---\n"
+        f"{article_text}\n--- ARTICLE END ---\n\n"
+        f"Here is the student's question: \"{question}\""
+    )
+
+    prompt_messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+    try:
+        # Make the API call to OpenAI
+        with timed_ai_call('chatbot'):
+            completion = get_openai_client().chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=prompt_messages,
+                temperature=0.3, # Low temperature for more factual, less creative answers
+                max_tokens=200  # Limit the length of the response
+            )
+        
+        # Extract the text response from the AI
+        ai_response = completion.choices[0].message.content
+
+        return jsonify({"answer": ai_response})
+
+    except Exception as e:
+        print(f"An error occurred with the OpenAI API (Chatbot): {e}")
+        return jsonify({"error": f"An error occurred while communicating with the AI tutor."}), 500
@@ -0,0 +1,337 @@
+import datetime
+from flask import Blueprint, Response, current_app, request, jsonify
+from sqlalchemy import select, exists, func
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from decorators import roles_required
+from db_routing import read_replica
+from dashboard import student_dashboard
+import leaderboards
+import adaptive
+from events import broker, event_stream, stream_token, check_stream_token
+from recommendations import recommend_content
+from course_deletion import live_content_or_404
+from models import db, User, Student, Course, Module, LearningContent, StudentContentProgress, AssessmentAttempt, AssessmentAttemptRollup
+
+analytics_bp = Blueprint('analytics', __name__)
+
+def _parse_date(value):
+    return datetime.date.fromisoformat(value) if value else None
+
+# TEACHER ANALYTICS AND RECOMMENDATIONS API
+@analytics_bp.route('/api/courses/<uuid:course_id>/progress', methods=['GET'])
+@roles_required('teacher', 'administrator')
+@read_replica
+def get_course_progress(course_id):
+    """
+    For a given course, calculates the progress of every student who has started it.
+    Accessible by teachers and admins.
+    """
+    course = Course.query.filter_by(id=course_id, deletion_requested_at=None).first_or_404()
+    
+    # 1. Get all content IDs for this course to define the scope
+    course_content_ids = db.session.query(LearningContent.id).join(Module).filter(Module.course_id == course.id).all()
+    # Flatten the list of tuples into a simple list of IDs
+    content_ids = [c_id[0] for c_id in course_content_ids]
+    
+    if not content_ids:
+        return jsonify([]) # Return empty list if course has no content
+
+    total_items = len(content_ids)
+
+    # 2. Find all progress records for this course's content
+    progress_records = StudentContentProgress.query.filter(
+        StudentContentProgress.content_id.in_(content_ids),
+        StudentContentProgress.status == 'completed'
+    ).all()
+
+    # 3. Aggregate progress by student
+    student_progress = {}
+    for record in progress_records:
+        student_id = record.student_id
+        if student_id not in student_progress:
+            # Initialize student if not seen before
+            student_profile = Student.query.get(student_id)
+            student_progress[student_id] = {
+                "student_id": str(student_id),
+                "student_name": f"{student_profile.first_name} {student_profile.last_name}",
+                "completed_count": 0
+            }
+        student_progress[student_id]["completed_count"] += 1
+
+    # 4. Format the final output with percentages
+    output = []
+    for student_id, data in student_progress.items():
+        data['total_items'] = total_items
+        data['percentage'] = round((data['completed_count'] / total_items) * 100, 2)
+        output.append(data)
+        
+    # Sort by student name for a consistent view
+    output.sort(key=lambda x: x['student_name'])
+    
+    return jsonify(output)
+
+@analytics_bp.route('/api/courses/<uuid:course_id>/performance', methods=['GET'])
+@roles_required('teacher', 'administrator')
+@read_replica
+def get_course_performance(course_id):
+    """
+    For a given course, aggregates all student quiz scores and attempts.
+    Optional ?from=YYYY-MM-DD&to=YYYY-MM-DD (inclusive) limits it to attempts submitted
+    in that range, which lets Postgres skip the monthly partitions outside it.
+    Accessible by teachers and admins.
+    """
+    course = Course.query.filter_by(id=course_id, deletion_requested_at=None).first_or_404()
+    try:
+        date_from = _parse_date(request.args.get('from'))
+        date_to = _parse_date(request.args.get('to'))
+    except ValueError:
+        return jsonify({"error": "from and to must be dates in YYYY-MM-DD format."}), 400
+    
+    # 1. Find all content items in this course that are quizzes
+    course_quiz_ids = [
+        content.id for module in course.modules 
+        for content in module.learning_contents if content.type == 'quiz'
+    ]
+
+    if not course_quiz_ids:
+        return jsonify([]) # No quizzes in this course, return empty list
+
+    # 2. Find all assessment attempts for these quizzes
+    attempts_query = AssessmentAttempt.query.filter(
+        AssessmentAttempt.content_id.in_(course_quiz_ids)
+    )
+    if date_from:
+        attempts_query = attempts_query.filter(AssessmentAttempt.submitted_at >= date_from)
+    if date_to:
+        attempts_query = attempts_query.filter(AssessmentAttempt.submitted_at < date_to + datetime.timedelta(days=1))
+    all_attempts = attempts_query.all()
+
+    # 3. Aggregate the data by student for a clean, structured response
+    performance_data = {}
+    for attempt in all_attempts:
+        student_id = attempt.student_id
+        
+        # If this is the first time we've seen this student, initialize their record
+        if student_id not in performance_data:
+            performance_data[student_id] = {
+                "student_id": str(student_id),
+                "student_name": f"{attempt.student.first_name} {attempt.student.last_name}",
+                "attempts": [],
+                "archived_attempt_count": 0,
+                "total_score": 0,
+                "attempt_count": 0
+            }
+        
+        # Add the current attempt's details
+        performance_data[student_id]['attempts'].append({
+            "quiz_id": str(attempt.content_id),
+            "quiz_title": attempt.quiz.title,
+            "attempt_number": attempt.attempt_number,
+            "score": float(attempt.score) # Ensure score is a float
+        })
+        performance_data[student_id]['total_score'] += attempt.score
+        performance_data[student_id]['attempt_count'] += 1
+
+    # 4. Attempts in archived months only survive as monthly rollups; they count
+    #    towards the average but aren't listed individually
+    rollups_query = db.session.query(
+        AssessmentAttemptRollup.student_id,
+        func.sum(AssessmentAttemptRollup.attempt_count),
+        func.sum(AssessmentAttemptRollup.score_sum)
+    ).filter(AssessmentAttemptRollup.content_id.in_(course_quiz_ids))
+    if date_from:
+        rollups_query = rollups_query.filter(AssessmentAttemptRollup.month >= date_from.replace(day=1))
+    if date_to:
+        rollups_query = rollups_query.filter(AssessmentAttemptRollup.month <= date_to)
+    archived = rollups_query.group_by(AssessmentAttemptRollup.student_id).all()
+
+    archived_only = [student_id for student_id, _, _ in archived if student_id not in performance_data]
+    students = {s.id: s for s in Student.query.filter(Student.id.in_(archived_only))} if archived_only else {}
+    for student_id, attempt_count, score_sum in archived:
+        if student_id not in performance_data:
+            student = students[student_id]
+            performance_data[student_id] = {
+                "student_id": str(student_id),
+                "student_name": f"{student.first_name} {student.last_name}",
+                "attempts": [],
+                "archived_attempt_count": 0,
+                "total_score": 0,
+                "attempt_count": 0
+            }
+        performance_data[student_id]['archived_attempt_count'] = attempt_count
+        performance_data[student_id]['total_score'] += score_sum
+        performance_data[student_id]['attempt_count'] += attempt_count
+        
+    # 5. Calculate average scores and format the final list
+    output = []
+    for student_id, data in performance_data.items():
+        data['average_score'] = round(data['total_score'] / data['attempt_count'], 2)
+        # Sort attempts by quiz title and then attempt number
+        data['attempts'].sort(key=lambda x: (x['quiz_title'], x['attempt_number']))
+        del data['total_score'] # Clean up temporary fields
+        del data['attempt_count']
+        output.append(data)
+
+    # Sort the final output by student name
+    output.sort(key=lambda x: x['student_name'])
+    
+    return jsonify(output)
+
+@analytics_bp.route('/api/courses/<uuid:course_id>/events/token', methods=['POST'])
+@roles_required('teacher', 'administrator')
+def create_course_events_token(course_id):
+    """Mints a short-lived token for opening the course's event stream (EventSource can't send headers)."""
+    Course.query.filter_by(id=course_id, deletion_requested_at=None).first_or_404()
+    return jsonify({"token": stream_token(course_id, get_jwt_identity()),
+                    "expires_in": current_app.config['EVENTS_TOKEN_SECONDS']})
+
+# Each open stream holds a worker thread (or greenlet) until the dashboard closes, so run
+# gunicorn with gthread or gevent workers (see wsgi.py); EVENTS_MAX_STREAMS caps them per worker.
+@analytics_bp.route('/api/courses/<uuid:course_id>/events', methods=['GET'])
+def stream_course_events(course_id):
+    """
+    Server-Sent Events feed of a course's progress and quiz submissions, so an open
+    dashboard can patch its reports. Pass ?token= from POST .../events/token.
+    """
+    if not check_stream_token(request.args.get('token', ''), course_id):
+        return jsonify({"error": "A valid stream token is required."}), 401
+    Course.query.filter_by(id=course_id, deletion_requested_at=None).first_or_404()
+    subscription = broker.subscribe(course_id)
+    if subscription is None:
+        response = jsonify({"error": "Too many open live streams, try again shortly."})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+    # The stream is produced after the app context (and its DB session) is torn down,
+    # so an open dashboard doesn't hold a pooled connection
+    response = Response(event_stream(subscription, current_app.config['EVENTS_HEARTBEAT_SECONDS']),
+                        mimetype='text/event-stream')
+    response.call_on_close(lambda: broker.unsubscribe(course_id, subscription))
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # stop nginx from buffering the stream
+    return response
+
+@analytics_bp.route('/api/students/me/recommendations', methods=['GET'])
+@roles_required('student')
+@read_replica
+def get_recommendations():
+    """Generates personalized content recommendations for the logged-in student."""
+    # 1. Get the student's profile
+    student = Student.query.filter_by(user_id=get_jwt_identity()).first()
+    if not student:
+        return jsonify([]) # Return empty list if no student profile
+
+    # 2. Recommend uncompleted content sharing the student's most frequent tags
+    return jsonify(recommend_content(student.id))
+
+@analytics_bp.route('/api/students/me/next-items', methods=['GET'])
+@roles_required('student')
+def get_next_items():
+    """
+    What the student should do next according to the adaptive engine (see adaptive.py):
+    unfinished items that exercise their weakest tags. Optional ?limit= (max 20).
+    """
+    student = Student.query.filter_by(user_id=get_jwt_identity()).first()
+    if not student:
+        return jsonify({"error": "Student profile not found."}), 404
+    limit = min(max(request.args.get('limit', 5, type=int), 1), 20)
+    return jsonify(adaptive.next_items(student.id, limit))
+
+@analytics_bp.route('/api/students/me/dashboard', methods=['GET'])
+@roles_required('student')
+@read_replica
+def get_student_dashboard():
+    """Courses with the student's completion, recent quiz scores and recommendations in one response."""
+    student = Student.query.filter_by(user_id=get_jwt_identity()).first()
+    if not student:
+        return jsonify({"error": "Student profile not found for this user."}), 404
+    return jsonify(student_dashboard(student))
+
+# LEADERBOARDS API (see leaderboards.py)
+# Teachers and admins see full boards. Students only see boards of courses they take,
+# with everyone else's entries reduced to rank and score.
+def _viewer():
+    """(is teacher or admin, the caller's Student profile or None)"""
+    user = User.query.get(get_jwt_identity())
+    staff = bool({r.role for r in user.roles} & {'teacher', 'administrator'})
+    return staff, Student.query.filter_by(user_id=user.id).first()
+
+def _takes_course(student, course_id):
+    """Progress in the course or a quiz score in it, the same notion of enrolled as the dashboard's."""
+    if leaderboards.student_score(leaderboards.COURSE, course_id, student.id) is not None:
+        return True
+    return db.session.scalar(select(exists().where(
+        StudentContentProgress.student_id == student.id,
+        StudentContentProgress.content_id == LearningContent.id,
+        LearningContent.module_id == Module.id,
+        Module.course_id == course_id
+    )))
+
+def _board_viewer(course_id):
+    """The caller's (staff flag, student), or an error response if they may not see this course's boards."""
+    staff, student = _viewer()
+    if not staff and (student is None or not _takes_course(student, course_id)):
+        return None, (jsonify({"error": "Leaderboards are only visible to students taking the course."}), 403)
+    return (staff, student), None
+
+def _leaderboard_response(board, board_id, course_id):
+    """Top N (?limit=, default 10) plus the caller's own standing if they are a student on the board."""
+    viewer, error = _board_viewer(course_id)
+    if error:
+        return error
+    staff, student = viewer
+    limit = request.args.get('limit', 10, type=int)
+    entries = leaderboards.top(board, board_id, max(limit, 1))
+    if not staff:
+        entries = [{"rank": e["rank"], "score": e["score"], "is_me": e["student_id"] == str(student.id)} for e in entries]
+    response = {"top": entries, "me": None}
+    score = leaderboards.student_score(board, board_id, student.id) if student else None
+    if score is not None:
+        response["me"] = leaderboards.rank(board, board_id, score)
+        response["students"] = response["me"]["out_of"]
+    else:
+        response["students"] = leaderboards.size(board, board_id)
+    return jsonify(response)
+
+def _rank_response(board, board_id, course_id):
+    """Where ?score= falls on the board."""
+    _, error = _board_viewer(course_id)
+    if error:
+        return error
+    score = request.args.get('score', type=float)
+    if score is None:
+        return jsonify({"error": "A numeric score parameter is required."}), 400
+    return jsonify(leaderboards.rank(board, board_id, score))
+
+@analytics_bp.route('/api/quizzes/<uuid:content_id>/leaderboard', methods=['GET'])
+@jwt_required()
+@read_replica
+def get_quiz_leaderboard(content_id):
+    """Best score per student on a quiz, highest first. Names only for teachers and admins."""
+    content = live_content_or_404(content_id)
+    if content.type != 'quiz':
+        return jsonify({"error": "This is not a valid quiz."}), 404
+    return _leaderboard_response(leaderboards.QUIZ, content_id, content.module.course_id)
+
+@analytics_bp.route('/api/quizzes/<uuid:content_id>/rank', methods=['GET'])
+@jwt_required()
+@read_replica
+def get_quiz_rank(content_id):
+    """Rank, percentile and "top N%" of a score on a quiz."""
+    content = live_content_or_404(content_id)
+    return _rank_response(leaderboards.QUIZ, content_id, content.module.course_id)
+
+@analytics_bp.route('/api/courses/<uuid:course_id>/leaderboard', methods=['GET'])
+@jwt_required()
+@read_replica
+def get_course_leaderboard(course_id):
+    """Sum of each student's best quiz scores across the course, highest first. Names only for teachers and admins."""
+    Course.query.filter_by(id=course_id, deletion_requested_at=None).first_or_404()
+    return _leaderboard_response(leaderboards.COURSE, course_id, course_id)
+
+@analytics_bp.route('/api/courses/<uuid:course_id>/rank', methods=['GET'])
+@jwt_required()
+@read_replica
+def get_course_rank(course_id):
+    """Rank, percentile and "top N%" of a course total."""
+    Course.query.filter_by(id=course_id, deletion_requested_at=None).first_or_404()
+    return _rank_response(leaderboards.COURSE, course_id, course_id)
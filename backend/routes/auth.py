@@ -0,0 +1,61 @@
+import uuid
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from sqlalchemy.exc import IntegrityError
+from extensions import bcrypt
+from models import db, User, UserRole, Student
+
+auth_bp = Blueprint('auth', __name__)
+
+# AUTHENTICATION ROUTES
+@auth_bp.route('/')
+def home():
+    return "AI-Powered Learning System Backend is running!"
+
+@auth_bp.route('/api/auth/register', methods=['POST'])
+def register_user():
+    data = request.get_json()
+    required_fields = ['username', 'email', 'password', 'firstName', 'lastName']
+    if not all(field in data and data[field] for field in required_fields):
+        return jsonify({"error": "All fields are required and cannot be empty"}), 400
+
+    try:
+        hashed_password = bcrypt.generate_password_hash(data['password']).decode('utf-8')
+        new_user = User(username=data['username'], email=data['email'], password_hash=hashed_password)
+        db.session.add(new_user)
+        db.session.flush()
+        new_student = Student(user_id=new_user.id, first_name=data['firstName'], last_name=data['lastName'])
+        db.session.add(new_student)
+        new_role = UserRole(user_id=new_user.id, role='student')
+        db.session.add(new_role)
+        db.session.commit()
+        return jsonify({"message": f"User '{new_user.username}' registered successfully!"}), 201
+    except IntegrityError as e:
+        db.session.rollback()
+        if 'users_username_key' in str(e.orig): return jsonify({"error": "Username already exists"}), 409
+        elif 'users_email_key' in str(e.orig): return jsonify({"error": "Email already exists"}), 409
+        else: return jsonify({"error": "A database error occurred. Please try again."}), 500
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "An unexpected server error occurred."}), 500
+
+@auth_bp.route('/api/auth/login', methods=['POST'])
+def login_user():
+    data = request.get_json()
+    if not data or not data.get('email') or not data.get('password'):
+        return jsonify({"error": "Email and password are required"}), 400
+
+    user = User.query.filter_by(email=data['email']).first()
+    if user and bcrypt.check_password_hash(user.password_hash, data['password']):
+        access_token = create_access_token(identity=str(user.id))
+        return jsonify(access_token=access_token)
+    return jsonify({"error": "Invalid credentials"}), 401
+
+@auth_bp.route('/api/profile', methods=['GET'])
+@jwt_required()
+def get_profile():
+    current_user_id_str = get_jwt_identity()
+    current_user_id = uuid.UUID(current_user_id_str)
+    user = User.query.get(current_user_id)
+    if not user: return jsonify({"error": "User not found"}), 404
+    return jsonify({"id": str(user.id), "username": user.username, "email": user.email, "roles": [r.role for r in user.roles]}), 200
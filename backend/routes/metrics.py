@@ -0,0 +1,17 @@
+import hmac
+from flask import Blueprint, Response, current_app, request, jsonify
+from metrics import registry
+
+metrics_bp = Blueprint('metrics', __name__)
+
+# PROMETHEUS METRICS
+@metrics_bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Request, SQL and AI-call metrics in Prometheus text format, for all workers when METRICS_DIR is set."""
+    token = current_app.config.get('METRICS_TOKEN')
+    if not token and not current_app.debug:
+        # Route names and traffic are not for the public: outside debug mode a token is required
+        return jsonify({"error": "Metrics are disabled. Set METRICS_TOKEN to enable them."}), 403
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {token}"):
+        return jsonify({"error": "Invalid metrics token"}), 401
+    return Response(registry.render(current_app.config.get('METRICS_DIR')), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,125 @@
+import datetime
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import select, func
+from decorators import roles_required
+from leaderboards import record_quiz_score
+from events import publish
+from grading import compile_quiz, QuizFormatError
+from course_deletion import live_content_or_404
+from models import db, Student, Course, Module, LearningContent, StudentContentProgress, AssessmentAttempt, AssessmentAttemptRollup
+
+progress_bp = Blueprint('progress', __name__)
+
+# STUDENT PROGRESS AND QUIZ SUBMISSION API
+@progress_bp.route('/api/progress/<uuid:content_id>/complete', methods=['POST'])
+@jwt_required()
+def mark_content_complete(content_id):
+    """Marks a piece of learning content as complete for the logged-in student."""
+    current_user_id = get_jwt_identity()
+    student = Student.query.filter_by(user_id=current_user_id).first()
+    
+    if not student:
+        return jsonify({"error": "Student profile not found for this user."}), 404
+    course_id = db.session.scalar(
+        select(Module.course_id).join(LearningContent).join(Course)
+        .where(LearningContent.id == content_id, Course.deletion_requested_at.is_(None))
+    )
+    if course_id is None:
+        return jsonify({"error": "Content not found."}), 404
+        
+    # Find if a progress record already exists
+    progress_record = StudentContentProgress.query.filter_by(
+        student_id=student.id,
+        content_id=content_id
+    ).first()
+    
+    newly_completed = not progress_record or progress_record.status != 'completed'
+    if progress_record:
+        # Update existing record
+        progress_record.status = 'completed'
+        progress_record.completed_at = datetime.datetime.utcnow()
+        progress_record.last_accessed_at = datetime.datetime.utcnow()
+    else:
+        # Create a new record
+        progress_record = StudentContentProgress(
+            student_id=student.id,
+            content_id=content_id,
+            status='completed',
+            completed_at=datetime.datetime.utcnow()
+        )
+        db.session.add(progress_record)
+
+    # Tell the course's live dashboards (sent on commit)
+    if newly_completed:
+        publish('content_completed', course_id, student_id=str(student.id),
+                student_name=f"{student.first_name} {student.last_name}", content_id=str(content_id))
+    db.session.commit()
+    return jsonify({"message": "Progress updated successfully", "status": "completed"})
+
+@progress_bp.route('/api/quizzes/<uuid:content_id>/submit', methods=['POST'])
+@roles_required('student')
+def submit_quiz(content_id):
+    """
+    Receives student answers, grades them, saves the attempt with a correct attempt number, 
+    and returns results.
+    """
+    content = live_content_or_404(content_id)
+    if content.type != 'quiz' or not content.quiz_data:
+        return jsonify({"error": "This is not a valid quiz."}), 404
+
+    student = Student.query.filter_by(user_id=get_jwt_identity()).first()
+    if not student:
+        return jsonify({"error": "Student profile required to submit."}), 403
+
+    student_answers = request.get_json().get('answers', {})
+    # Grade with the quiz's compiled answer key (see grading.py)
+    try:
+        grader = compile_quiz(content.quiz_data)
+    except QuizFormatError:
+        return jsonify({"error": "This quiz can't be graded: its answer key is invalid."}), 409
+    percentage, question_results = grader.grade(student_answers)
+    total_questions = len(grader.questions)
+
+    # --- THIS IS THE FIX ---
+    # 1. Count previous attempts for this specific quiz by this student,
+    #    including those in archived months (only their rollups are left).
+    online_attempts = select(func.count()).select_from(AssessmentAttempt).where(
+        AssessmentAttempt.student_id == student.id,
+        AssessmentAttempt.content_id == content_id
+    ).scalar_subquery()
+    archived_attempts = select(func.coalesce(func.sum(AssessmentAttemptRollup.attempt_count), 0)).where(
+        AssessmentAttemptRollup.student_id == student.id,
+        AssessmentAttemptRollup.content_id == content_id
+    ).scalar_subquery()
+    previous_attempts = db.session.scalar(select(online_attempts + archived_attempts))
+
+    # 2. The new attempt number is the count of previous attempts + 1.
+    new_attempt_number = previous_attempts + 1
+
+    # 3. Save the new attempt with the correct attempt number.
+    new_attempt = AssessmentAttempt(
+        content_id=content_id,
+        student_id=student.id,
+        attempt_number=new_attempt_number, # <-- Use the calculated number
+        score=percentage,
+        max_score=100.00,
+        answers=student_answers,
+        grading_version=grader.version
+    )
+    db.session.add(new_attempt)
+    # 4. Update the student's standing on the quiz and course leaderboards in the same transaction
+    record_quiz_score(student.id, content_id, content.module.course_id, percentage)
+    publish('quiz_submitted', content.module.course_id, student_id=str(student.id),
+            student_name=f"{student.first_name} {student.last_name}", quiz_id=str(content_id),
+            quiz_title=content.title, attempt_number=new_attempt_number, score=float(percentage))
+    db.session.commit()
+
+    return jsonify({
+        "message": "Quiz submitted successfully!",
+        "score": percentage,
+        "total_questions": total_questions,
+        "question_results": question_results, # credit per question, 0 to 1
+        "correct_answers": grader.answer_key(),
+        "student_answers": student_answers
+    })
@@ -0,0 +1,29 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from db_routing import read_replica
+from search import search_catalog
+
+search_bp = Blueprint('search', __name__)
+
+# CATALOG SEARCH API
+@search_bp.route('/api/search', methods=['GET'])
+@jwt_required()
+@read_replica
+def search():
+    """
+    Full-text search over course titles/descriptions and content titles/bodies/tags.
+    Query params: q (required), type ('course' or 'content'), page, per_page (max 50).
+    """
+    query_text = (request.args.get('q') or '').strip()
+    if not query_text:
+        return jsonify({"error": "A search query 'q' is required."}), 400
+    if len(query_text) > 200:
+        return jsonify({"error": "Search query is too long."}), 400
+
+    kind = request.args.get('type')
+    if kind not in (None, 'course', 'content'):
+        return jsonify({"error": "type must be 'course' or 'content'."}), 400
+
+    page = max(1, request.args.get('page', 1, type=int))
+    per_page = min(50, max(1, request.args.get('per_page', 20, type=int)))
+    return jsonify(search_catalog(query_text, page=page, per_page=per_page, kind=kind))
@@ -0,0 +1,113 @@
+import html
+from sqlalchemy import select, func, literal, cast, null, union_all, Text
+from models import db, Course, Module, LearningContent
+
+# Full-text search over courses and learning content
+# Backed by the generated `search_vector` columns (GIN indexed). Matching and ranking
+# happen in Postgres; snippets are built only for the rows on the requested page.
+SEARCH_CONFIG = 'english'
+# ts_headline marks matches with these; they are swapped for <mark> after HTML-escaping the text.
+# Control characters, which _headline() strips from the documents, so no text can fake a mark.
+_MARK_START, _MARK_STOP = '\x02', '\x03'
+HEADLINE_OPTIONS = (f'StartSel="{_MARK_START}", StopSel="{_MARK_STOP}", MaxWords=30, MinWords=10, '
+                    'MaxFragments=2, FragmentDelimiter=" ... "')
+
+
+def _headline(document, tsquery):
+    return func.ts_headline(SEARCH_CONFIG, func.translate(document, _MARK_START + _MARK_STOP, ''), tsquery, HEADLINE_OPTIONS)
+
+
+def _render_snippet(text):
+    if not text:
+        return ''
+    return html.escape(text).replace(_MARK_START, '<mark>').replace(_MARK_STOP, '</mark>')
+
+
+def _hits(tsquery, kind):
+    """One SELECT per searchable table, shaped alike so they can be UNIONed."""
+    queries = []
+    if kind in (None, 'course'):
+        queries.append(
+            select(
+                literal('course').label('kind'),
+                Course.id.label('id'),
+                Course.title.label('title'),
+                Course.id.label('course_id'),
+                cast(null(), Text).label('content_type'),
+                func.ts_rank_cd(Course.search_vector, tsquery).label('rank'),
+            ).where(Course.search_vector.bool_op('@@')(tsquery), Course.deletion_requested_at.is_(None))
+        )
+    if kind in (None, 'content'):
+        queries.append(
+            select(
+                literal('content').label('kind'),
+                LearningContent.id.label('id'),
+                LearningContent.title.label('title'),
+                Module.course_id.label('course_id'),
+                cast(LearningContent.type, Text).label('content_type'),
+                func.ts_rank_cd(LearningContent.search_vector, tsquery).label('rank'),
+            ).join(Module, LearningContent.module_id == Module.id)
+            .join(Course, Module.course_id == Course.id)
+            .where(LearningContent.search_vector.bool_op('@@')(tsquery), Course.deletion_requested_at.is_(None))
+        )
+    return queries[0] if len(queries) == 1 else union_all(*queries)
+
+
+def _snippets(tsquery, course_ids, content_ids):
+    """Headlines and display context for the page's rows only (ts_headline is the expensive part)."""
+    snippets = {}
+    if course_ids:
+        rows = db.session.execute(
+            select(Course.id, _headline(func.coalesce(Course.description, ''), tsquery))
+            .where(Course.id.in_(course_ids))
+        ).all()
+        snippets.update({course_id: {"snippet": _render_snippet(headline)} for course_id, headline in rows})
+    if content_ids:
+        document = func.coalesce(LearningContent.content_body, LearningContent.title)
+        rows = db.session.execute(
+            select(LearningContent.id, _headline(document, tsquery),
+                   Module.title, Course.title)
+            .join(Module, LearningContent.module_id == Module.id)
+            .join(Course, Module.course_id == Course.id)
+            .where(LearningContent.id.in_(content_ids))
+        ).all()
+        snippets.update({
+            content_id: {"snippet": _render_snippet(headline), "module_title": module_title, "course_title": course_title}
+            for content_id, headline, module_title, course_title in rows
+        })
+    return snippets
+
+
+def search_catalog(query_text, page=1, per_page=20, kind=None):
+    """
+    Ranked, paginated search. `kind` limits results to 'course' or 'content'.
+    Accepts web-search syntax: quoted phrases, OR, and -excluded words.
+    """
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, query_text)
+    hits = _hits(tsquery, kind).subquery()
+
+    total = db.session.scalar(select(func.count()).select_from(hits))
+    rows = db.session.execute(
+        select(hits).order_by(hits.c.rank.desc(), hits.c.id).limit(per_page).offset((page - 1) * per_page)
+    ).all()
+
+    snippets = _snippets(
+        tsquery,
+        [r.id for r in rows if r.kind == 'course'],
+        [r.id for r in rows if r.kind == 'content'],
+    )
+    results = []
+    for r in rows:
+        result = {
+            "kind": r.kind,
+            "id": str(r.id),
+            "title": r.title,
+            "course_id": str(r.course_id),
+            "rank": round(float(r.rank), 4),
+            **snippets.get(r.id, {"snippet": ""})
+        }
+        if r.kind == 'content':
+            result["type"] = r.content_type
+        results.append(result)
+
+    return {"query": query_text, "page": page, "per_page": per_page, "total": total, "results": results}
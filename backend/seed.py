@@ -1,11 +1,12 @@
 import os
 from getpass import getpass
-from app import app, db, bcrypt
-from models import User, Teacher, UserRole
+from app import create_app
+from extensions import bcrypt
+from models import db, User, Teacher, UserRole
 from sqlalchemy.exc import IntegrityError
 
 def create_admin():
-    with app.app_context():
+    with create_app().app_context():
         try:
             username = input("Enter admin username: ")
             email = input("Enter admin email: ")
@@ -0,0 +1,106 @@
+import datetime
+from unittest import mock
+import pytest
+import adaptive
+from adaptive import AdaptiveEngine, Catalog, Item, PRIOR
+
+
+def _engine(max_students=10):
+    engine = AdaptiveEngine(max_students=max_students)
+    engine.catalog = Catalog([
+        Item('a', 'c1', 0, ('algebra',), 'article', 'A', 'M1', 'C1'),
+        Item('b', 'c1', 1, ('geometry',), 'article', 'B', 'M1', 'C1'),
+        Item('q', 'c1', 2, ('algebra',), 'quiz', 'Q', 'M2', 'C1'),
+        Item('x', 'c2', 3, ('algebra',), 'article', 'X', 'M1', 'C2'),
+    ], version=1)
+    return engine
+
+
+def _ids(engine, student_id, limit=10):
+    return [item.id for item, *_ in engine.next_items(student_id, limit)]
+
+
+def test_unknown_students_are_not_served():
+    assert _engine().next_items('nobody', 5) is None
+
+
+def test_equal_need_goes_in_course_order():
+    engine = _engine()
+    engine.add_student('s', courses=['c1'])
+    assert _ids(engine, 's') == ['a', 'b', 'q']  # c2 hasn't been started
+    assert _ids(engine, 's', limit=2) == ['a', 'b']
+    assert _ids(engine, 's') == ['a', 'b', 'q']  # reading doesn't consume the heap
+
+
+def test_a_good_quiz_score_lowers_its_tags_priority():
+    engine = _engine()
+    engine.add_student('s', courses=['c1'])
+    engine.record_quiz('s', 'q', 100)
+    assert engine.mastery('s')['algebra'] == pytest.approx(1.0)
+    assert _ids(engine, 's') == ['b', 'a']  # geometry is now the weakest; the passed quiz is done
+
+
+def test_a_failed_quiz_stays_a_candidate():
+    engine = _engine()
+    engine.add_student('s', courses=['c1'])
+    engine.record_quiz('s', 'q', 0)
+    item, need, tag, mastery = engine.next_items('s', 1)[0]
+    assert item.id == 'a'
+    assert (tag, mastery) == ('algebra', pytest.approx(0.0))
+    assert 'q' in _ids(engine, 's')
+
+
+def test_completing_content_joins_its_course():
+    engine = _engine()
+    engine.add_student('s')
+    engine.record_completion('s', 'x')
+    assert _ids(engine, 's') == []  # the only item of c2 is done
+    assert engine.mastery('s')['algebra'] > PRIOR
+
+
+def test_a_new_catalog_rebuilds_priorities():
+    engine = _engine()
+    engine.add_student('s', courses=['c1'])
+    engine.catalog = Catalog([Item('b', 'c1', 0, ('geometry',), 'article', 'B', 'M1', 'C1')], version=2)
+    assert _ids(engine, 's') == ['b']
+
+
+def test_trim_drops_least_recently_used_clean_students():
+    engine = _engine(max_students=1)
+    engine.add_student('old', courses=['c1'])
+    engine.add_student('unsaved', courses=['c1'])
+    engine.record_quiz('unsaved', 'q', 50)
+    engine.add_student('new', courses=['c1'])
+    engine.trim()
+    assert engine.next_items('old', 1) is None
+    assert engine.next_items('unsaved', 1) is not None  # dirty until the next snapshot
+    assert engine.next_items('new', 1) is not None
+
+
+def test_activity_after_the_snapshot_is_replayed_on_top_of_it():
+    engine = _engine()
+    engine.add_student('s', courses=['c1'], mastery={'algebra': 0.5}, evidence={'algebra': 4},
+                       history=[('q', 100.0), ('b', None)])
+    mastery = engine.mastery('s')
+    assert mastery['algebra'] == pytest.approx(0.5 + 0.2 * 0.5)  # rate 1/5 after four results
+    assert mastery['geometry'] > PRIOR
+    assert engine.take_dirty()  # the replayed state gets snapshotted again
+
+
+def test_load_student_replays_what_its_snapshot_missed():
+    taken = datetime.datetime(2026, 10, 1, 12, 0)
+    session = mock.Mock()
+    session.execute.return_value.all.side_effect = [
+        [('algebra', 0.5, 4, taken - datetime.timedelta(minutes=1)), ('geometry', 0.3, 0, taken)],  # snapshot
+        [],  # progress
+        [],  # best scores
+        [('q', 100, taken + datetime.timedelta(minutes=5))],  # attempts since
+        [('a', taken + datetime.timedelta(minutes=1))],  # completions since
+    ]
+    engine = _engine()
+    with mock.patch.object(adaptive, 'engine', engine), mock.patch.object(adaptive.db, 'session', session):
+        adaptive.load_student('s')
+    attempts_query = session.execute.call_args_list[3].args[0]
+    assert attempts_query.compile().params['submitted_at_1'] == taken
+    # The completion (at +1 min) is replayed before the quiz (at +5)
+    assert engine.mastery('s')['algebra'] == pytest.approx(0.51 + 0.2 * (1 - 0.51))  # 0.6 the other way round
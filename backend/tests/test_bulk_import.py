@@ -0,0 +1,49 @@
+import io
+import codecs
+import pytest
+from bulk_import import UserImporter, iter_csv_rows, _chunks
+
+HEADER = "username,email,password,first_name,last_name,role\r\n"
+
+
+def _rows(body):
+    # The same reader the import route wraps the upload stream in
+    stream = codecs.getreader('utf-8-sig')(io.BytesIO(codecs.BOM_UTF8 + (HEADER + body).encode('utf-8')))
+    return list(iter_csv_rows(stream))
+
+
+def test_rows_are_numbered_like_a_spreadsheet():
+    rows = _rows("ada,ada@example.com,pw,Ada, Lovelace ,teacher\r\nalan,alan@example.com,pw,Alan,Turing,\r\n")
+    assert [n for n, _ in rows] == [2, 3]
+    assert rows[0][1]['username'] == 'ada'  # the BOM is not part of the first column name
+    assert rows[0][1]['last_name'] == 'Lovelace'
+    assert rows[1][1]['role'] == ''
+
+
+def test_quoted_newlines_stay_in_their_field():
+    rows = _rows('ada,ada@example.com,pw,"Ada\r\nAugusta",Lovelace,\r\n')
+    assert len(rows) == 1
+    assert rows[0][1]['first_name'] == 'Ada\r\nAugusta'
+
+
+def test_missing_columns_are_rejected():
+    stream = codecs.getreader('utf-8')(io.BytesIO(b"username,email\r\nada,ada@example.com\r\n"))
+    with pytest.raises(ValueError, match="password, first_name, last_name"):
+        list(iter_csv_rows(stream))
+
+
+def test_chunks_keep_order_and_size():
+    assert list(_chunks(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(_chunks([], 3)) == []
+
+
+def test_validate_reports_bad_rows_and_duplicates_across_chunks():
+    importer = UserImporter(bcrypt=None, chunk_size=2)
+    row = {"username": 'ada', "email": 'ada@example.com', "password": 'pw', "first_name": 'Ada', "last_name": 'L'}
+    first = importer._validate([(2, dict(row)), (3, dict(row, username='bob', role='wizard'))])
+    second = importer._validate([(4, dict(row, email='other@example.com')), (5, dict(row, first_name=''))])
+
+    assert [n for n, _ in first] == [2]
+    assert first[0][1]['role'] == 'student'
+    assert second == []
+    assert [(i['row'], i['status']) for i in importer.issues] == [(3, 'error'), (4, 'duplicate'), (5, 'error')]
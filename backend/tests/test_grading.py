@@ -0,0 +1,114 @@
+import random
+import datetime
+from unittest import mock
+import pytest
+import grading
+from sqlalchemy.dialects import postgresql
+from grading import QuizFormatError, compile_quiz, public_questions, validate_quiz_data
+
+QUIZ = {"questions": [
+    {"id": 'capital', "text": "Capital of France?", "options": ['Lyon', 'Paris', 'Nice'], "correct_answer_index": 1},
+    {"id": 'primes', "type": 'multi_select', "options": ['2', '4', '5', '9'], "correct_answer_indexes": [0, 2], "weight": 2},
+    {"id": 'g', "type": 'numeric', "answer": 9.81, "tolerance": 0.05},
+]}
+
+
+def test_grade_weighs_credit_per_question():
+    grader = compile_quiz(QUIZ)
+    score, credits = grader.grade({"capital": 1, "primes": [0, 1, 2], "g": '9.8'})
+    # primes: 2 right, 1 wrong out of 2 correct = 0.5 credit, weighted 2
+    assert credits == {"capital": 1.0, "primes": 0.5, "g": 1.0}
+    assert score == 75.0
+    assert grader.grade("not a dict")[0] == 0.0
+
+
+def test_numeric_ids_are_read_as_strings():
+    grader = compile_quiz({"questions": [{"id": 1, "options": ['a', 'b'], "correct_answer_index": 0}]})
+    assert grader.questions[0].id == '1'
+    assert grader.grade({"1": 0}) == (100.0, {"1": 1.0})  # JSON answer keys are always strings
+    assert public_questions({"questions": [{"id": 1, "options": ['a', 'b']}]})[0]["id"] == '1'
+
+
+def test_every_problem_is_reported():
+    errors = validate_quiz_data({"questions": [
+        {"options": ['a', 'b'], "correct_answer_index": 5},
+        {"id": 'x', "type": 'essay'},
+        {"id": 'y', "type": 'numeric', "answer": 'ten', "tolerance": -1},
+        {"id": 'y', "type": 'numeric', "answer": 1},
+    ]})
+    assert errors == [
+        "quiz_data.questions[0].correct_answer_index must be the index of one of the options.",
+        "quiz_data.questions[0].id is required.",
+        "quiz_data.questions[1].type must be one of: single_choice, multi_select, numeric.",
+        "quiz_data.questions[2].answer must be a number.",
+        "quiz_data.questions[2].tolerance must be a number of at least 0.",
+        "quiz_data.questions[3].id 'y' is used twice.",
+    ]
+    with pytest.raises(QuizFormatError):
+        compile_quiz({"questions": []})
+
+
+def test_version_follows_the_key_not_the_wording():
+    reworded = {"questions": [dict(QUIZ["questions"][0], text="Which city is France's capital?")] + QUIZ["questions"][1:]}
+    rekeyed = {"questions": [dict(QUIZ["questions"][0], correct_answer_index=2)] + QUIZ["questions"][1:]}
+    assert compile_quiz(reworded).version == compile_quiz(QUIZ).version
+    assert compile_quiz(rekeyed).version != compile_quiz(QUIZ).version
+
+
+def _columns(grader, submissions):
+    """What answer_columns() gets out of Postgres, computed in Python: one list per column."""
+    columns = []
+    for q in grader.questions:
+        answers = [s.get(q.id) for s in submissions]
+        if q.type == 'multi_select':
+            columns.extend([isinstance(a, list) and grading._picked(a, i) for a in answers] for i in range(q.options))
+        else:
+            columns.append([grading._as_number(a) for a in answers])
+    return columns
+
+
+def test_batch_grading_matches_one_at_a_time():
+    pytest.importorskip('numpy')
+    grader = compile_quiz(QUIZ)
+    rng = random.Random(7)
+    choices = {
+        "capital": [0, 1, 2, '1', None, 'Paris'],
+        "primes": [[0, 2], [0], [2, '0'], [1, 3], [], 'x', None],
+        "g": [9.81, 9.86, 9.9, '9.77', 'abc', None, True],
+    }
+    submissions = [{qid: rng.choice(options) for qid, options in choices.items()} for _ in range(500)]
+    batch = grader.grade_columns(_columns(grader, submissions))
+    assert list(batch) == [grader.grade(s)[0] for s in submissions]
+
+
+def test_regrade_pages_past_every_batch():
+    pytest.importorskip('numpy')
+    grader = compile_quiz(QUIZ)
+    at = datetime.datetime(2026, 1, 1)
+    answer = _columns(grader, [{"capital": 1, "primes": [0, 2], "g": 9.81}])
+    row = lambda n, score: (f"id{n}", at + datetime.timedelta(minutes=n), score, *(c[0] for c in answer))
+    pages = [[row(1, 100), row(2, 0)], [row(3, 100)], []]
+    session = mock.Mock()
+    session.execute.return_value.all.side_effect = pages
+    with mock.patch.object(grading.db, 'session', session):
+        # A batch the UPDATE doesn't fully match must not be selected forever
+        assert grading.regrade_quiz('quiz', QUIZ, batch_size=2) == (3, 1, grader.version)
+    selects = [c.args[0] for c in session.execute.call_args_list if hasattr(c.args[0], 'whereclause')]
+    assert len(selects) == 3
+    assert 'submitted_at, assessment_attempts.id) >' in str(selects[1])
+
+
+def test_answers_past_float_range_get_no_credit():
+    grader = compile_quiz({"questions": [{"id": 'g', "type": 'numeric', "answer": 1, "tolerance": 0}]})
+    for answer in ['1e999', 10 ** 400, '1' * 400, '1e9999', '9' * 2000]:
+        assert grader.grade({"g": answer}) == (0.0, {"g": 0.0})
+    assert grader.grade({"g": '1e-999'})[1] == {"g": 0.0}
+
+
+def test_sql_answers_are_range_checked_before_float8():
+    grader = compile_quiz({"questions": [{"id": 'g', "type": 'numeric', "answer": 1, "tolerance": 0}]})
+    column = grader.answer_columns(grading.AssessmentAttempt.answers)[0]
+    sql = str(column.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    # float8 overflows on these, and one bad answer would fail the whole regrade batch
+    assert "[0-9]{1,3})?$'" in sql and "> 1000" in sql
+    assert sql.index("AS NUMERIC)) > CAST(1e+308 AS NUMERIC)") < sql.index("ELSE CAST(CAST(")
@@ -0,0 +1,81 @@
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+import leaderboards
+from sqlalchemy.dialects import postgresql
+from leaderboards import QUIZ, standing
+
+
+def test_standing_counts_ties_as_half_below():
+    # 10 students: 2 above, 5 below, so 3 share this score
+    result = standing(70, above=2, below=5, total=10)
+    assert result == {"score": 70.0, "rank": 3, "out_of": 10, "percentile": 65.0, "top_percent": 30}
+
+
+def test_standing_of_the_best_and_worst_scores():
+    # 10 students tied on the top score
+    assert standing(100, above=0, below=990, total=1000)["top_percent"] == 1
+    assert standing(100, above=0, below=990, total=1000)["percentile"] == 99.5
+    assert standing(0, above=9, below=0, total=10)["top_percent"] == 100
+    assert standing(0, above=9, below=0, total=10)["percentile"] == 5.0
+
+
+def test_standing_on_an_empty_board():
+    assert standing(55.5, above=0, below=0, total=0) == {
+        "score": 55.5, "rank": 1, "out_of": 0, "percentile": None, "top_percent": None}
+
+
+def _session(*results):
+    session = mock.Mock()
+    session.execute.return_value.one.side_effect = results
+    return session
+
+
+def test_rank_adds_exact_counts_from_the_score_bucket():
+    # Histogram: 4 students in buckets above 72, 3 below; 72.5 sits in bucket 72 with 1 higher and 1 lower
+    with mock.patch.object(leaderboards.db, 'session', _session((4, 3, 10), (1, 1))):
+        result = leaderboards.rank(QUIZ, 'quiz', 72.5)
+    assert result["rank"] == 6
+    assert result["out_of"] == 10
+    assert result["percentile"] == 45.0  # 4 below plus half of itself
+
+
+def test_top_gives_tied_scores_the_same_rank():
+    rows = [(SimpleNamespace(student_id=f"s{i}", best_score=score), 'First', f"Last{i}")
+            for i, score in enumerate([98, 91, 91, 90])]
+    session = mock.Mock()
+    session.execute.return_value.all.return_value = rows
+    with mock.patch.object(leaderboards.db, 'session', session):
+        entries = leaderboards.top(QUIZ, 'quiz', 10)
+    assert [e["rank"] for e in entries] == [1, 2, 2, 4]
+    assert entries[1]["student_name"] == 'First Last1'
+
+
+def test_rebuild_upserts_rows_a_concurrent_submission_created():
+    session = mock.Mock()
+    with mock.patch.object(leaderboards.db, 'session', session):
+        leaderboards.rebuild()
+    inserts = [str(c.args[0].compile(dialect=postgresql.dialect())) for c in session.execute.call_args_list
+               if str(c.args[0]).startswith('INSERT')]
+    assert len(inserts) == 4
+    assert all(' ON CONFLICT ' in sql and ' DO UPDATE SET ' in sql for sql in inserts)
+
+
+def test_rebuild_courses_only_touches_those_courses():
+    session = mock.Mock()
+    with mock.patch.object(leaderboards.db, 'session', session):
+        leaderboards.rebuild_courses(['course'])
+    statements = [str(c.args[0]) for c in session.execute.call_args_list]
+    assert [s.split()[0] for s in statements] == ['DELETE', 'DELETE', 'INSERT', 'INSERT']
+    assert all('course_id IN (__[POSTCOMPILE_course_id_1])' in s for s in statements)
+    assert 'quiz_best_scores' not in statements[0] + statements[1]
+
+
+def test_remove_student_takes_them_out_of_each_histogram():
+    session = mock.Mock()
+    session.execute.return_value.all.side_effect = [[('quiz', Decimal('72.5'))], [('course', Decimal('310'))]]
+    with mock.patch.object(leaderboards.db, 'session', session):
+        leaderboards.remove_student('student')
+    updates = [c.args[0] for c in session.execute.call_args_list if str(c.args[0]).startswith('UPDATE')]
+    assert [u.table.name for u in updates] == ['quiz_score_histograms', 'course_score_histograms']
+    assert [u.compile().params['bucket_1'] for u in updates] == [72, 310]
@@ -0,0 +1,35 @@
+import os
+from metrics import Registry
+
+
+def _registry():
+    registry = Registry()
+    return registry, registry.counter('hits_total', 'Hits.', labels=('route',)), \
+        registry.histogram('latency_seconds', 'Latency.', labels=('route',), buckets=(1, 2))
+
+
+def test_render_sums_the_values_other_workers_shared(tmp_path):
+    other, hits, latency = _registry()
+    hits.inc('/a', amount=3)
+    latency.observe(1.5, '/a')
+    other._write_snapshot(tmp_path)
+    # Pretend that file came from another worker
+    os.rename(tmp_path / f'{os.getpid()}.json', tmp_path / '1.json')
+
+    registry, hits, latency = _registry()
+    hits.inc('/a')
+    hits.inc('/b')
+    latency.observe(0.5, '/a')
+    lines = registry.render(str(tmp_path)).splitlines()
+
+    assert 'hits_total{route="/a"} 4' in lines
+    assert 'hits_total{route="/b"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="2"} 2' in lines
+    assert 'latency_seconds_count{route="/a"} 2' in lines
+
+
+def test_render_without_a_directory_is_this_process_only():
+    registry, hits, _ = _registry()
+    hits.inc('/a')
+    assert 'hits_total{route="/a"} 1' in registry.render().splitlines()
@@ -0,0 +1,8 @@
+from app import create_app
+
+# Entry point for production servers, e.g. `gunicorn -w 4 --threads 32 'wsgi:app'`
+# Every open teacher dashboard keeps a live events stream (a thread) busy, so use
+# threaded or gevent workers, keep EVENTS_MAX_STREAMS below --threads, and use
+# EVENTS_BACKEND=postgres with more than one worker. Set METRICS_DIR too, so /metrics
+# reports every worker rather than whichever one answers the scrape.
+app = create_app()
@@ -2,10 +2,14 @@ import './assets/main.css'
 
 import { createApp } from 'vue'
 import { createPinia } from 'pinia'
+import axios from 'axios'
 
 import App from './App.vue'
 import router from './router'
 
+// Send cookies to the API: the backend uses one to keep a user's reads on the primary database right after they write
+axios.defaults.withCredentials = true
+
 const app = createApp(App)
 
 app.use(createPinia())